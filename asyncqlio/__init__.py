@@ -9,6 +9,8 @@ Main package for asyncqlio - a Python 3.5+ async ORM built on top of asyncio.
     db
     orm
     backends
+    sharding
+    hooks
 
     exc
     meta
@@ -20,25 +22,78 @@ __copyright__ = "Copyright (C) 2016-2018 Laura Dickinson"
 __licence__ = "MIT"
 __status__ = "Development"
 
-from pkg_resources import DistributionNotFound, get_distribution
+import importlib
+import sys
+import types
 
-try:
-    __version__ = get_distribution(__name__).version
-except DistributionNotFound:
-    # package is not installed
-    pass
-
-from asyncqlio.backends.base import BaseConnector, BaseDialect, BaseResultSet, BaseTransaction
-# import helpers
-from asyncqlio.db import DatabaseInterface
+from asyncqlio import exc as md_exc
 from asyncqlio.exc import *
-from asyncqlio.orm.inspection import get_pk, get_row_session
-# orm
-from asyncqlio.orm.schema.column import Column
-from asyncqlio.orm.schema.index import Index
-from asyncqlio.orm.schema.relationship import ForeignKey, Relationship
-from asyncqlio.orm.schema.table import Table, table_base
-# int types; misc; string types; dt types
-from asyncqlio.orm.schema.types import BigInt, BigSerial, Boolean, ColumnType, Integer, Numeric, \
-     Real, Serial, SmallInt, SmallSerial, String, Text, Timestamp
-from asyncqlio.orm.session import Session
+
+#: The public API, mapped to the module each name is imported from.
+#: These are imported the first time they are accessed, so that e.g. the ORM and the drivers are
+#: only imported by programs that use them.
+_lazy_attributes = {
+    # low-level
+    "BaseConnector": "asyncqlio.backends.base",
+    "BaseDialect": "asyncqlio.backends.base",
+    "BaseResultSet": "asyncqlio.backends.base",
+    "BaseTransaction": "asyncqlio.backends.base",
+    "DatabaseInterface": "asyncqlio.db",
+    "ShardedDatabaseInterface": "asyncqlio.sharding",
+    # orm
+    "Session": "asyncqlio.orm.session",
+    "DDLSession": "asyncqlio.orm.ddl.ddlsession",
+    "get_pk": "asyncqlio.orm.inspection",
+    "get_row_session": "asyncqlio.orm.inspection",
+    "Column": "asyncqlio.orm.schema.column",
+    "Index": "asyncqlio.orm.schema.index",
+    "ForeignKey": "asyncqlio.orm.schema.relationship",
+    "Relationship": "asyncqlio.orm.schema.relationship",
+    "Table": "asyncqlio.orm.schema.table",
+    "table_base": "asyncqlio.orm.schema.table",
+    # types
+    "ColumnType": "asyncqlio.orm.schema.types",
+    "BigInt": "asyncqlio.orm.schema.types",
+    "BigSerial": "asyncqlio.orm.schema.types",
+    "Boolean": "asyncqlio.orm.schema.types",
+    "Integer": "asyncqlio.orm.schema.types",
+    "Numeric": "asyncqlio.orm.schema.types",
+    "Real": "asyncqlio.orm.schema.types",
+    "Serial": "asyncqlio.orm.schema.types",
+    "SmallInt": "asyncqlio.orm.schema.types",
+    "SmallSerial": "asyncqlio.orm.schema.types",
+    "String": "asyncqlio.orm.schema.types",
+    "Text": "asyncqlio.orm.schema.types",
+    "Timestamp": "asyncqlio.orm.schema.types",
+}
+
+__all__ = md_exc.__all__ + list(_lazy_attributes)
+
+
+class _LazyModule(types.ModuleType):
+    """
+    The type of the ``asyncqlio`` module, which imports the public API on first access.
+    """
+
+    def __getattr__(self, item: str):
+        if item == "__version__":
+            # pkg_resources is very slow to import
+            from pkg_resources import DistributionNotFound, get_distribution
+            try:
+                value = get_distribution(self.__name__).version
+            except DistributionNotFound:
+                # package is not installed
+                raise AttributeError(item) from None
+        elif item in _lazy_attributes:
+            value = getattr(importlib.import_module(_lazy_attributes[item]), item)
+        else:
+            raise AttributeError("module '{}' has no attribute '{}'".format(self.__name__, item))
+
+        setattr(self, item, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_lazy_attributes))
+
+
+sys.modules[__name__].__class__ = _LazyModule
@@ -2,11 +2,14 @@
 The base implementation of a backend. This provides some ABC classes.
 """
 import collections
+import contextlib
+import time
 import typing
 from abc import abstractmethod
 from collections import OrderedDict
 from urllib.parse import ParseResult, parse_qs
 
+from asyncqlio import hooks as md_hooks
 from asyncqlio.meta import AsyncABC
 
 
@@ -70,6 +73,33 @@ class BaseDialect:
         """
         return False
 
+    @property
+    def has_batch_upsert(self) -> bool:
+        """
+        Returns True if this dialect can upsert multiple rows in one statement.
+
+        .. versionadded:: 0.2.0
+        """
+        return False
+
+    @property
+    def has_array_params(self) -> bool:
+        """
+        Returns True if this dialect can compare against an array param, with ``= ANY(...)``.
+
+        .. versionadded:: 0.2.0
+        """
+        return False
+
+    @property
+    def max_params(self) -> int:
+        """
+        The maximum number of bound parameters in a single statement.
+
+        .. versionadded:: 0.2.0
+        """
+        return 999
+
     @property
     def lastval_method(self):
         """
@@ -122,6 +152,52 @@ class BaseDialect:
         """
         raise NotImplementedError
 
+    def get_batch_upsert_sql(self, table_name: str, *, on_conflict_update: bool = True,
+                             conflict_target: bool = True) -> 'typing.Tuple[str, set]':
+        """
+        Get a formattable query and a set of required params to upsert multiple rows at once.
+
+        This is only used if :attr:`.BaseDialect.has_batch_upsert` is True. The ``insert`` param
+        has multiple sets of values, and the ``update`` param uses
+        :meth:`.BaseDialect.get_upsert_excluded_sql` to refer to the value of each row.
+
+        .. versionadded:: 0.2.0
+
+        :param table_name: The name of the table to upsert into.
+        :param on_conflict_update: If this is to update on conflict.
+        :param conflict_target: If the query has conflict columns. If it doesn't, the ``col`` param
+            must not be required.
+        """
+        raise NotImplementedError
+
+    def get_upsert_excluded_sql(self, column_name: str) -> str:
+        """
+        Get the SQL that refers to the value a conflicting row tried to insert into a column.
+
+        .. versionadded:: 0.2.0
+
+        :param column_name: The quoted name of the column.
+        """
+        raise NotImplementedError
+
+    def get_explain_sql(self, sql: str, *, analyze: bool = False) -> str:
+        """
+        Get a query that explains how the database will run a statement.
+
+        :param sql: The statement to explain.
+        :param analyze: If the statement should actually be run, to get real timings.
+        """
+        raise NotImplementedError
+
+    def transform_rows_to_plan(self, *rows: 'DictRow', analyze: bool = False):
+        """
+        Transform the rows returned from an EXPLAIN query to a :class:`.QueryPlan`.
+
+        :param rows: A list of :class:`.DictRow` objects returned from the database.
+        :param analyze: If the rows came from an EXPLAIN ANALYZE query.
+        """
+        raise NotImplementedError
+
     def transform_columns_to_indexes(self, *rows: 'DictRow', table_name: str):
         """
         Transform appropriate database rows to Column objects.
@@ -152,6 +228,21 @@ class BaseResultSet(collections.AsyncIterator, AsyncABC):
         - :attr:`.BaseResultSet.fetch_many`
     """
 
+    #: The :class:`.YieldTimer` of the iteration over this result set, if any.
+    #:
+    #: .. versionadded:: 0.2.0
+    timer = None  # type: md_hooks.YieldTimer
+
+    #: The :class:`.QueryEvent` of the query this result set is for, until ``after_fetch`` is
+    #: fired for it.
+    #:
+    #: .. versionadded:: 0.2.0
+    event = None  # type: md_hooks.QueryEvent
+
+    _hooks = None  # type: md_hooks.Hooks
+    _budget = None  # type: md_hooks.YieldBudget
+    _row_count = 0
+
     @property
     @abstractmethod
     def keys(self) -> typing.Iterable[str]:
@@ -181,6 +272,51 @@ class BaseResultSet(collections.AsyncIterator, AsyncABC):
         Closes this result set.
         """
 
+    @property
+    def last_row_id(self) -> typing.Any:
+        """
+        :return: The ID of the row inserted by this query, if the driver reports it, or None.
+
+        .. versionadded:: 0.2.0
+        """
+        return None
+
+    def track(self, event: 'md_hooks.QueryEvent', hooks: 'md_hooks.Hooks',
+              budget: 'md_hooks.YieldBudget' = None) -> 'BaseResultSet':
+        """
+        Counts the rows fetched from this result set, and fires ``after_fetch`` with them once it
+        is exhausted or closed.
+
+        .. versionadded:: 0.2.0
+
+        :param event: The :class:`.QueryEvent` of the query this result set is for.
+        :param hooks: The :class:`.Hooks` to fire the event with.
+        :param budget: The :class:`.YieldBudget` that :meth:`.BaseResultSet.flatten` uses by
+            default, if any.
+        :return: This result set.
+        """
+        self.event = event
+        self._hooks = hooks
+        self._budget = budget
+        return self
+
+    def _count_rows(self, rows: int, exhausted: bool):
+        # called by children classes after each fetch
+        self._row_count += rows
+        if exhausted:
+            self._finish_event()
+
+    def _finish_event(self):
+        event, self.event = self.event, None
+        if event is not None:
+            event.rows = self._row_count
+            self._hooks.fire("after_fetch", event)
+
+    def _reset_timer(self):
+        # the loop was free while the driver waited for rows
+        if self.timer is not None:
+            self.timer.reset()
+
     async def __anext__(self) -> 'DictRow':
         res = await self.fetch_row()
         if not res:
@@ -188,15 +324,30 @@ class BaseResultSet(collections.AsyncIterator, AsyncABC):
 
         return res
 
-    async def flatten(self) -> 'typing.List[DictRow]':
+    async def flatten(self, *, budget: 'md_hooks.YieldBudget' = None) -> 'typing.List[DictRow]':
         """
         Flattens this ResultSet.
 
+        .. versionchanged:: 0.2.0
+
+            Added the ``budget`` parameter.
+
+        :param budget: The :class:`.YieldBudget` to yield to the event loop with. Defaults to the
+            budget of the database, if it has one.
         :return: A list of :class:`.DictRow` objects.
         """
+        if budget is None:
+            budget = self._budget
+
         rows = []
+        timer = self.timer = budget.timer() if budget is not None else None
         async for row in self:
             rows.append(row)
+            if timer is not None:
+                await timer.tick()
+
+        if timer is not None:
+            timer.stop()
 
         return rows
 
@@ -230,6 +381,15 @@ class BaseTransaction(AsyncABC):
     These methods are not required to be implemented, but will raise :class:`NotImplementedError` if
     they are not.
 
+    :meth:`.BaseTransaction.fetch_batch` runs each statement with
+    :meth:`.BaseTransaction.cursor` by default, and can be overridden by drivers that can send
+    several statements at once.
+
+    Children classes should fire the instrumentation hooks, by running SQL inside
+    :meth:`.BaseTransaction.instrument`, acquiring connections with
+    :meth:`.BaseTransaction.acquire_connection` and calling
+    :meth:`.BaseTransaction.fire_pool_event` when a connection is released.
+
     This class takes one parameter in the constructor: the :class:`.BaseConnector` used to connect
     to the DB server.
     """
@@ -302,6 +462,95 @@ class BaseTransaction(AsyncABC):
         :return: The :class:`.BaseResultSet` returned from the query, if applicable.
         """
 
+    async def fetch_batch(self, statements: 'typing.Sequence[typing.Tuple[str, typing.Any]]') \
+            -> 'typing.List[typing.List[DictRow]]':
+        """
+        Runs several independent statements, and fetches every row of each of them.
+
+        By default, the statements are run one after another with :meth:`.BaseTransaction.cursor`.
+
+        .. versionadded:: 0.2.0
+
+        :param statements: A sequence of ``(sql, params)`` tuples.
+        :return: A list of the rows returned by each statement, in the same order.
+        """
+        results = []
+        for sql, params in statements:
+            cursor = await self.cursor(sql, params)
+            results.append(await cursor.flatten())
+            await cursor.close()
+
+        return results
+
+    @contextlib.contextmanager
+    def instrument(self, sql: str, params: typing.Union[typing.Mapping, typing.Iterable, None],
+                   connection: typing.Any = None) -> 'typing.Iterator[md_hooks.QueryEvent]':
+        """
+        A context manager that fires the query hooks around running some SQL.
+
+        .. code-block:: python3
+
+            with self.instrument(sql, params, self.connection) as event:
+                result = await self.connection.execute(sql, params)
+                event.rows = result.rowcount
+
+        :param sql: The SQL being run.
+        :param params: The params the SQL is being run with.
+        :param connection: The driver connection the SQL is being run on.
+        :return: The :class:`.QueryEvent` that will be passed to the hooks.
+        """
+        hooks = self.connector.hooks
+        event = md_hooks.QueryEvent(sql, params, id(connection))
+        hooks.fire("before_execute", event)
+        start = time.perf_counter()
+        try:
+            yield event
+        except BaseException as e:
+            event.duration = time.perf_counter() - start
+            event.error = e
+            hooks.fire("on_error", event)
+            raise
+
+        event.duration = time.perf_counter() - start
+        hooks.fire("after_execute", event)
+
+    async def acquire_connection(self, acquire: 'typing.Callable[[], typing.Awaitable]') \
+            -> typing.Any:
+        """
+        Acquires a connection from a pool, counting the wait for :meth:`.BaseConnector.pool_stats`
+        and firing the ``pool_acquire`` hook.
+
+        .. versionadded:: 0.2.0
+
+        :param acquire: A callable that returns an awaitable of the driver connection.
+        :return: The driver connection.
+        """
+        connector = self.connector
+        start = time.perf_counter()
+        connector._waiters += 1
+        try:
+            connection = await acquire()
+        finally:
+            connector._waiters -= 1
+
+        self.fire_pool_event("pool_acquire", connection, time.perf_counter() - start)
+        return connection
+
+    def fire_pool_event(self, event: str, connection: typing.Any, duration: float = None):
+        """
+        Fires a pool hook for a connection.
+
+        Acquisitions are also recorded for :meth:`.BaseConnector.pool_stats`.
+
+        :param event: Either ``pool_acquire`` or ``pool_release``.
+        :param connection: The driver connection that was acquired or released.
+        :param duration: The number of seconds spent acquiring the connection.
+        """
+        if event == "pool_acquire":
+            self.connector.record_acquisition(duration)
+
+        self.connector.hooks.fire(event, md_hooks.PoolEvent(id(connection), duration))
+
     def create_savepoint(self, name: str):
         """
         Creates a savepoint in the current transaction.
@@ -335,8 +584,14 @@ class BaseConnector(AsyncABC):
         - :meth:`.BaseConnector.emit_param`
         - :meth:`.BaseConnector.get_transaction`
         - :meth:`.BaseConnector.get_db_server_info`
+
+    Children classes should extend :meth:`.BaseConnector.pool_stats` with the size of their pool.
     """
 
+    #: The number of recent acquisition wait times used for the percentiles in
+    #: :meth:`.BaseConnector.pool_stats`.
+    wait_time_samples = 1024
+
     def __init__(self, dsn: ParseResult):
         """
         :param dsn: The :class:`urllib.parse.ParseResult` created from parsing a DSN.
@@ -350,6 +605,18 @@ class BaseConnector(AsyncABC):
         self.db = dsn.path[1:]
         self.params = {k: v[0] for k, v in parse_qs(dsn.query).items()}
 
+        #: The :class:`.Hooks` fired by transactions from this connector.
+        #: This is replaced with the hooks of the :class:`.DatabaseInterface` when it connects.
+        self.hooks = md_hooks.Hooks()
+
+        #: The :class:`.YieldBudget` result sets from this connector are flattened with, if any.
+        #: This is replaced with the budget of the :class:`.DatabaseInterface` when it connects.
+        self.yield_budget = None  # type: md_hooks.YieldBudget
+
+        self._acquisitions = 0
+        self._wait_times = collections.deque(maxlen=self.wait_time_samples)
+        self._waiters = 0
+
     @abstractmethod
     async def connect(self, **kwargs) -> 'BaseConnector':
         """
@@ -388,6 +655,49 @@ class BaseConnector(AsyncABC):
         Gets the version of the DB server running.
         """
 
+    def record_acquisition(self, wait_time: float):
+        """
+        Records a connection being acquired from the pool.
+
+        :param wait_time: The number of seconds spent waiting for the connection.
+        """
+        self._acquisitions += 1
+        self._wait_times.append(wait_time)
+
+    def pool_stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Gets statistics about the connection pool of this connector.
+
+        The dict returned has these keys:
+
+            - ``size``: The number of connections currently open.
+            - ``max_size``: The maximum number of connections the pool can open.
+            - ``idle``: The number of open connections that aren't in use.
+            - ``in_use``: The number of connections that are acquired.
+            - ``waiters``: The number of tasks waiting to acquire a connection, counted by \
+              :meth:`.BaseTransaction.acquire_connection`.
+            - ``acquisitions``: The total number of connections acquired by transactions.
+            - ``wait_time_p50``, ``wait_time_p95``, ``wait_time_p99`` and ``max_wait_time``: The \
+              percentiles of the number of seconds spent waiting for a connection, over the last \
+              :attr:`.BaseConnector.wait_time_samples` acquisitions.
+            - ``connections_opened`` and ``connections_closed``: The total number of connections \
+              opened and closed by the pool.
+
+        Values that the driver doesn't expose are None.
+        """
+        waits = sorted(self._wait_times)
+        stats = dict.fromkeys(("size", "max_size", "idle", "in_use", "waiters",
+                               "connections_opened", "connections_closed"))
+        stats["acquisitions"] = self._acquisitions
+        stats["waiters"] = self._waiters
+        for percentile in (50, 95, 99):
+            # nearest-rank percentile
+            index = min(len(waits) - 1, len(waits) * percentile // 100)
+            stats["wait_time_p{}".format(percentile)] = waits[index] if waits else 0.0
+
+        stats["max_wait_time"] = waits[-1] if waits else 0.0
+        return stats
+
 
 class DictRow(OrderedDict):
     """
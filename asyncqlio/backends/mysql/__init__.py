@@ -11,11 +11,14 @@ MySQL backends.
 
 import io
 import itertools
+import json
 import operator
+import re
 from pkgutil import extend_path
 
 from asyncqlio.backends.base import BaseDialect
 from asyncqlio.exc import DatabaseException
+from asyncqlio.orm import plan as md_plan
 from asyncqlio.orm.schema import column as md_column, index as md_index, types as md_types
 from asyncqlio.sentinels import NO_DEFAULT
 
@@ -23,6 +26,10 @@ __path__ = extend_path(__path__, __name__)
 
 DEFAULT_CONNECTOR = "aiomysql"
 
+# used to parse the tree format of EXPLAIN ANALYZE
+find_cost_expr = re.compile(r"\(cost=([0-9.]+)")
+find_scan_expr = re.compile(r"Table scan on (\S+)")
+
 
 class MysqlDialect(BaseDialect):
     """
@@ -62,6 +69,14 @@ class MysqlDialect(BaseDialect):
     def has_cascade(self):
         return True
 
+    @property
+    def has_batch_upsert(self):
+        return True
+
+    @property
+    def max_params(self):
+        return 65535
+
     def get_primary_key_index_name(self, table):
         return "PRIMARY"
 
@@ -97,6 +112,43 @@ class MysqlDialect(BaseDialect):
         sql.write(";")
         return sql.getvalue(), params
 
+    def get_batch_upsert_sql(self, table_name, *, on_conflict_update=True, conflict_target=True):
+        # ON DUPLICATE KEY UPDATE never names its conflict columns
+        return self.get_upsert_sql(table_name, on_conflict_update=on_conflict_update)
+
+    def get_upsert_excluded_sql(self, column_name):
+        return "VALUES({})".format(column_name)
+
+    def get_explain_sql(self, sql, *, analyze=False):
+        # EXPLAIN ANALYZE only has the tree format
+        if analyze:
+            return "EXPLAIN ANALYZE {}".format(sql)
+        return "EXPLAIN FORMAT=JSON {}".format(sql)
+
+    def transform_rows_to_plan(self, *rows, analyze=False):
+        if analyze:
+            tree = rows[0][0]
+            cost = find_cost_expr.search(tree)
+            return md_plan.QueryPlan(list(rows), cost=float(cost.group(1)) if cost else None,
+                                     scanned_tables=find_scan_expr.findall(tree), analyzed=True)
+
+        plan = json.loads(rows[0][0])
+        cost = plan["query_block"].get("cost_info", {}).get("query_cost")
+        # tables can be nested inside of nested_loop, ordering_operation, etc
+        scanned_tables = set()
+        nodes = [plan]
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, dict):
+                if node.get("access_type") == "ALL":
+                    scanned_tables.add(node["table_name"])
+                nodes.extend(node.values())
+            elif isinstance(node, list):
+                nodes.extend(node)
+
+        return md_plan.QueryPlan(plan, cost=float(cost) if cost is not None else None,
+                                 scanned_tables=scanned_tables)
+
     def transform_rows_to_columns(self, *rows, table_name=None):
         for row in rows:
             table_name = row['TABLE_NAME']
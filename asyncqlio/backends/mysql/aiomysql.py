@@ -3,10 +3,12 @@ The :ref:`aiomysql` connector for MySQL/MariaDB databases.
 """
 import asyncio
 import logging
+import struct
 import typing
 
 import aiomysql
 import pymysql
+from pymysql.constants import COMMAND
 
 from asyncqlio.backends.base import BaseConnector, BaseResultSet, BaseTransaction, DictRow
 from asyncqlio.exc import DatabaseException, IntegrityError
@@ -16,6 +18,10 @@ logger = logging.getLogger(__name__)
 # hijack aiomysql a bit
 aiomysql.DictCursor.dict_type = DictRow
 
+# the options of COM_SET_OPTION, from the MySQL protocol
+MYSQL_OPTION_MULTI_STATEMENTS_ON = 0
+MYSQL_OPTION_MULTI_STATEMENTS_OFF = 1
+
 
 class AiomysqlResultSet(BaseResultSet):
     """
@@ -31,7 +37,13 @@ class AiomysqlResultSet(BaseResultSet):
     def keys(self):
         return self._keys
 
+    @property
+    def last_row_id(self) -> typing.Optional[int]:
+        # for a multi-row INSERT, this is the ID of the first row
+        return self.cursor.lastrowid
+
     async def close(self):
+        self._finish_event()
         return await self.cursor.close()
 
     async def fetch_row(self) -> typing.Dict[typing.Any, typing.Any]:
@@ -42,19 +54,24 @@ class AiomysqlResultSet(BaseResultSet):
         if self._keys is None and row is not None:
             self._keys = row.keys()
 
+        self._count_rows(row is not None, exhausted=row is None)
         return row
 
     async def fetch_many(self, n: int):
         """
         Fetches the next N rows.
         """
-        return await self.cursor.fetchmany(size=n)
+        rows = await self.cursor.fetchmany(size=n)
+        self._count_rows(len(rows), exhausted=len(rows) < n)
+        return rows
 
     async def fetch_all(self):
         """
         Fetches ALL the rows.
         """
-        return await self.cursor.fetchall()
+        rows = await self.cursor.fetchall()
+        self._count_rows(len(rows), exhausted=True)
+        return rows
 
 
 class AiomysqlTransaction(BaseTransaction):
@@ -76,12 +93,15 @@ class AiomysqlTransaction(BaseTransaction):
             self.connection.close()
         # release it back to the pool so we don't eat all the connections
         self.connector.pool.release(self.connection)
+        self.fire_pool_event("pool_release", self.connection)
 
     async def begin(self):
         """
         Begins the current transaction.
         """
-        self.connection = await self.connector.pool.acquire()  # type: aiomysql.Connection
+        self.connection = await self.acquire_connection(
+            self.connector.pool.acquire
+        )  # type: aiomysql.Connection
         await self.connection.begin()
         return self
 
@@ -96,11 +116,14 @@ class AiomysqlTransaction(BaseTransaction):
         # we can pass a dict in instead of a list/tuple
         # i don't fucking trust this at all though.
         try:
-            res = await cursor.execute(sql, params)
-        except pymysql.err.IntegrityError as e:
-            raise IntegrityError(*e.args)
-        except (pymysql.err.ProgrammingError, pymysql.err.InternalError) as e:
-            raise DatabaseException(*e.args)
+            with self.instrument(sql, params, self.connection) as event:
+                try:
+                    res = await cursor.execute(sql, params)
+                except pymysql.err.IntegrityError as e:
+                    raise IntegrityError(*e.args)
+                except (pymysql.err.ProgrammingError, pymysql.err.InternalError) as e:
+                    raise DatabaseException(*e.args)
+                event.rows = res
         finally:
             await cursor.close()
         return res
@@ -112,8 +135,67 @@ class AiomysqlTransaction(BaseTransaction):
         """
         logger.debug("Executing query {} with params {}".format(sql, params))
         cursor = await self.connection.cursor(cursor=aiomysql.DictCursor)
-        await cursor.execute(sql, params)
-        return AiomysqlResultSet(cursor)
+        with self.instrument(sql, params, self.connection) as event:
+            await cursor.execute(sql, params)
+        return AiomysqlResultSet(cursor).track(event, self.connector.hooks,
+                                               self.connector.yield_budget)
+
+    async def _set_multi_statements(self, enabled: bool) -> bool:
+        """
+        Enables or disables multiple statements on the connection of this transaction, with
+        ``COM_SET_OPTION``.
+
+        aiomysql has no public API for this, so this returns False if the connection doesn't have
+        the methods that are used.
+        """
+        execute_command = getattr(self.connection, "_execute_command", None)
+        read_packet = getattr(self.connection, "_read_packet", None)
+        if execute_command is None or read_packet is None:
+            return False
+
+        if enabled:
+            option = MYSQL_OPTION_MULTI_STATEMENTS_ON
+        else:
+            option = MYSQL_OPTION_MULTI_STATEMENTS_OFF
+
+        await execute_command(COMMAND.COM_SET_OPTION, struct.pack("<H", option))
+        # this raises if the server returned an error
+        await read_packet()
+        return True
+
+    async def fetch_batch(self, statements: 'typing.Sequence[typing.Tuple[str, typing.Any]]') \
+            -> typing.List[typing.List[DictRow]]:
+        """
+        Runs several statements as one multi-statement script on the connection of this
+        transaction, and reads each result set.
+
+        Multiple statements are only enabled on the connection for the duration of the script, so
+        that they can't be used for SQL injection elsewhere. If they can't be enabled, the
+        statements are run one after another instead.
+        """
+        if not await self._set_multi_statements(True):
+            return await super().fetch_batch(statements)
+
+        cursor = await self.connection.cursor(cursor=aiomysql.DictCursor)
+        try:
+            # the params are interpolated client-side anyway, so each statement can have its own
+            sql = "\n".join("{};".format(cursor.mogrify(sql, params).strip().rstrip(";"))
+                            for sql, params in statements)
+            results = []
+            with self.instrument(sql, None, self.connection):
+                try:
+                    await cursor.execute(sql)
+                    results.append(list(await cursor.fetchall()))
+                    while await cursor.nextset():
+                        results.append(list(await cursor.fetchall()))
+                except (pymysql.err.ProgrammingError, pymysql.err.InternalError) as e:
+                    raise DatabaseException(*e.args)
+        finally:
+            # this reads any result sets left over from an error
+            await cursor.close()
+            await self._set_multi_statements(False)
+
+        return results
 
     async def rollback(self, checkpoint: str = None):
         """
@@ -169,6 +251,13 @@ class AiomysqlConnector(BaseConnector):
             self.pool.close()
             await self.pool.wait_closed()
 
+    def pool_stats(self) -> typing.Dict[str, typing.Any]:
+        stats = super().pool_stats()
+        # aiomysql doesn't track how many connections it has opened or closed
+        stats.update(size=self.pool.size, max_size=self.pool.maxsize, idle=self.pool.freesize,
+                     in_use=self.pool.size - self.pool.freesize)
+        return stats
+
     def get_transaction(self) -> BaseTransaction:
         """
         Gets a new transaction object.
@@ -12,11 +12,13 @@ PostgreSQL backends.
 # used for namespace packages
 from pkgutil import extend_path
 import io
+import json
 import re
 
 from asyncqlio.exc import DatabaseException
 from asyncqlio.sentinels import NO_DEFAULT
 from asyncqlio.backends.base import BaseDialect
+from asyncqlio.orm import plan as md_plan
 from asyncqlio.orm.schema import column as md_column
 from asyncqlio.orm.schema import index as md_index
 from asyncqlio.orm.schema import types as md_types
@@ -69,6 +71,18 @@ class PostgresqlDialect(BaseDialect):
     def has_cascade(self):
         return True
 
+    @property
+    def has_batch_upsert(self):
+        return True
+
+    @property
+    def has_array_params(self):
+        return True
+
+    @property
+    def max_params(self):
+        return 32767
+
     def get_primary_key_index_name(self, table_name):
         return "{}_pkey".format(table_name)
 
@@ -100,12 +114,16 @@ FROM information_schema.columns
                     .format(emitter("table_name")))
         return sql
 
-    def get_upsert_sql(self, table_name, *, on_conflict_update=True):
+    def get_upsert_sql(self, table_name, *, on_conflict_update=True, conflict_target=True):
         sql = io.StringIO()
-        params = {"insert", "col", "returning"}
+        params = {"insert", "returning"}
         sql.write("INSERT INTO ")
         sql.write(table_name)
-        sql.write(" {insert} ON CONFLICT ({col}) DO ")
+        sql.write(" {insert} ON CONFLICT ")
+        if conflict_target:
+            params.add("col")
+            sql.write("({col}) ")
+        sql.write("DO ")
         if on_conflict_update:
             params.add("update")
             sql.write("UPDATE SET {update} ")
@@ -114,6 +132,35 @@ FROM information_schema.columns
         sql.write("RETURNING {returning};")
         return sql.getvalue(), params
 
+    def get_batch_upsert_sql(self, table_name, *, on_conflict_update=True, conflict_target=True):
+        return self.get_upsert_sql(table_name, on_conflict_update=on_conflict_update,
+                                   conflict_target=conflict_target)
+
+    def get_upsert_excluded_sql(self, column_name):
+        return "EXCLUDED.{}".format(column_name)
+
+    def get_explain_sql(self, sql, *, analyze=False):
+        options = "FORMAT JSON, ANALYZE" if analyze else "FORMAT JSON"
+        return "EXPLAIN ({}) {}".format(options, sql)
+
+    def transform_rows_to_plan(self, *rows, analyze=False):
+        plan = rows[0]["QUERY PLAN"]
+        if isinstance(plan, str):
+            # json is returned as text, unless a codec is set
+            plan = json.loads(plan)
+
+        root = plan[0]["Plan"]
+        scanned_tables = set()
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                scanned_tables.add(node["Relation Name"])
+            nodes.extend(node.get("Plans", ()))
+
+        return md_plan.QueryPlan(plan, cost=root["Total Cost"], scanned_tables=scanned_tables,
+                                 analyzed=analyze)
+
     def transform_rows_to_columns(self, *rows, table_name=None):
         for row in rows:
             table_name = row['table_name']
@@ -55,6 +55,8 @@ class AsyncpgResultSet(BaseResultSet):
 
     async def fetch_many(self, n: int):
         res = await self.cur.fetch(n)
+        self._reset_timer()
+        self._count_rows(len(res), exhausted=len(res) < n)
         if res and self._keys is None:
             self._keys = res[0].keys()
 
@@ -68,6 +70,8 @@ class AsyncpgResultSet(BaseResultSet):
 
     async def fetch_row(self):
         row = await self.cur.fetchrow()  # type: Record
+        self._reset_timer()
+        self._count_rows(row is not None, exhausted=row is None)
         if self._keys is None and row is not None:
             self._keys = row.keys()
 
@@ -75,7 +79,7 @@ class AsyncpgResultSet(BaseResultSet):
             return DictRow(row)
 
     async def close(self):
-        pass
+        self._finish_event()
 
 
 class AsyncpgTransaction(BaseTransaction):
@@ -97,8 +101,9 @@ class AsyncpgTransaction(BaseTransaction):
         Begins the transaction.
         """
         logger.debug("Acquiring new transaction...")
-        self.acquired_connection = \
-            await self.connector.pool.acquire()  # type: asyncpg.connection.Connection
+        self.acquired_connection = await self.acquire_connection(
+            self.connector.pool.acquire
+        )  # type: asyncpg.connection.Connection
         self.transaction = self.acquired_connection.transaction(**transaction_options)
         await self.transaction.start()
         logger.debug("Acquired and started transaction {}".format(self.transaction))
@@ -122,6 +127,7 @@ class AsyncpgTransaction(BaseTransaction):
         if has_error:
             await self.acquired_connection.close()
         await self.connector.pool.release(self.acquired_connection)
+        self.fire_pool_event("pool_release", self.acquired_connection)
 
     async def execute(self, sql: str, params: typing.Mapping[str, typing.Any] = None):
         """
@@ -132,17 +138,23 @@ class AsyncpgTransaction(BaseTransaction):
         """
         # re-paramatarize the query
         logger.debug("Executing query {} with params {}".format(sql, params))
-        query, params = get_param_query(sql, params)
-
-        try:
-            results = await self.acquired_connection.execute(query, *params)
-        except (asyncpg.IntegrityConstraintViolationError,
-                asyncpg.exceptions.NotNullViolationError) as e:
-            raise IntegrityError(*e.args) from e
-        except asyncpg.ObjectNotInPrerequisiteStateError as e:
-            raise OperationalError(*e.args) from e
-        except (asyncpg.SyntaxOrAccessError, asyncpg.InFailedSQLTransactionError) as e:
-            raise DatabaseException(*e.args) from e
+        query, args = get_param_query(sql, params)
+
+        with self.instrument(sql, params, self.acquired_connection) as event:
+            try:
+                results = await self.acquired_connection.execute(query, *args)
+            except (asyncpg.IntegrityConstraintViolationError,
+                    asyncpg.exceptions.NotNullViolationError) as e:
+                raise IntegrityError(*e.args) from e
+            except asyncpg.ObjectNotInPrerequisiteStateError as e:
+                raise OperationalError(*e.args) from e
+            except (asyncpg.SyntaxOrAccessError, asyncpg.InFailedSQLTransactionError) as e:
+                raise DatabaseException(*e.args) from e
+
+            # the status is e.g. "UPDATE 3"
+            count = results.rpartition(" ")[2]
+            if count.isdigit():
+                event.rows = int(count)
 
         return results
 
@@ -152,13 +164,36 @@ class AsyncpgTransaction(BaseTransaction):
         Executes a SQL statement and returns a cursor to iterate over the rows of the result.
         """
         logger.debug("Transforming query {} with params {}".format(sql, params))
-        query, params = get_param_query(sql, params)
-        logger.debug("Executing query {} with params {}".format(query, params))
-        cur = await self.acquired_connection.cursor(query, *params)
-        result = AsyncpgResultSet(cur)
+        query, args = get_param_query(sql, params)
+        logger.debug("Executing query {} with params {}".format(query, args))
+        with self.instrument(sql, params, self.acquired_connection) as event:
+            cur = await self.acquired_connection.cursor(query, *args)
+        result = AsyncpgResultSet(cur).track(event, self.connector.hooks,
+                                             self.connector.yield_budget)
 
         return result
 
+    async def fetch_batch(self, statements: 'typing.Sequence[typing.Tuple[str, typing.Any]]') \
+            -> typing.List[typing.List[DictRow]]:
+        """
+        Runs several statements one after another, fetching all of the rows of each.
+
+        asyncpg can't pipeline different statements, so this is **not** batched: each statement
+        still takes its own round trip. It only avoids the extra round trips of the server-side
+        cursor used by :meth:`.AsyncpgTransaction.cursor`.
+        """
+        results = []
+        for sql, params in statements:
+            query, args = get_param_query(sql, params)
+            with self.instrument(sql, params, self.acquired_connection):
+                try:
+                    rows = await self.acquired_connection.fetch(query, *args)
+                except (asyncpg.SyntaxOrAccessError, asyncpg.InFailedSQLTransactionError) as e:
+                    raise DatabaseException(*e.args) from e
+            results.append([DictRow(r) for r in rows])
+
+        return results
+
     async def create_savepoint(self, name: str):
         await self.acquired_connection.execute("SAVEPOINT {};".format(name))
 
@@ -177,6 +212,10 @@ class AsyncpgConnector(BaseConnector):
         #: The :class:`asyncpg.pool.Pool` connection pool.
         self.pool = None  # type: asyncpg.pool.Pool
 
+        self._connections_opened = 0
+        # None if the driver can't report closed connections
+        self._connections_closed = 0
+
     def __del__(self):
         if self.pool is not None and not self.pool._closed:
             warnings.warn("Unclosed asyncpg pool {}".format(self.pool))
@@ -198,9 +237,40 @@ class AsyncpgConnector(BaseConnector):
         logger.debug("Connecting to {}".format(self.dsn))
         self.pool = await asyncpg.create_pool(host=self.host, port=port, user=self.username,
                                               password=self.password, database=self.db,
-                                              loop=loop, **self.params)
+                                              loop=loop, init=self._init_connection,
+                                              **self.params)
         return self
 
+    async def _init_connection(self, conn: asyncpg.connection.Connection):
+        # called by the pool for every new connection
+        self._connections_opened += 1
+
+        # added in asyncpg 0.21
+        add_termination_listener = getattr(conn, "add_termination_listener", None)
+        if add_termination_listener is None:
+            self._connections_closed = None
+        else:
+            add_termination_listener(self._connection_closed)
+
+    def _connection_closed(self, conn: asyncpg.connection.Connection):
+        if self._connections_closed is not None:
+            self._connections_closed += 1
+
+    def pool_stats(self) -> typing.Dict[str, typing.Any]:
+        stats = super().pool_stats()
+
+        def get(name: str):
+            # the pool size methods were added in asyncpg 0.25
+            method = getattr(self.pool, name, None)
+            return method() if method is not None else None
+
+        size, idle = get("get_size"), get("get_idle_size")
+        stats.update(size=size, max_size=get("get_max_size"), idle=idle,
+                     in_use=size - idle if size is not None and idle is not None else None,
+                     connections_opened=self._connections_opened,
+                     connections_closed=self._connections_closed)
+        return stats
+
     def get_transaction(self) -> 'AsyncpgTransaction':
         return AsyncpgTransaction(self)
 
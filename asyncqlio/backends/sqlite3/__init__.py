@@ -10,11 +10,13 @@ SQLite3 backends.
 
 import io
 import re
+import sqlite3
 from pkgutil import extend_path
 
 from asyncqlio.exc import DatabaseException, UnsupportedOperationException
 from asyncqlio.sentinels import NO_DEFAULT
 from asyncqlio.backends.base import BaseDialect
+from asyncqlio.orm import plan as md_plan
 from asyncqlio.orm.schema import column as md_column
 from asyncqlio.orm.schema import index as md_index
 from asyncqlio.orm.schema import types as md_types
@@ -24,6 +26,8 @@ __path__ = extend_path(__path__, __name__)
 DEFAULT_CONNECTOR = "aiosqlite3"
 
 find_col_expr = re.compile(r"\((.*)\)")
+# older versions of SQLite use "SCAN TABLE x AS y"
+find_scan_expr = re.compile(r"^SCAN (?:TABLE )?(\S+)(?: AS (\S+))?(.*)$")
 
 
 def _parse_numeric_params(t):
@@ -68,6 +72,18 @@ class Sqlite3Dialect(BaseDialect):
     def has_cascade(self):
         return False
 
+    @property
+    def has_batch_upsert(self):
+        # ON CONFLICT was added in 3.24.0
+        return sqlite3.sqlite_version_info >= (3, 24, 0)
+
+    @property
+    def max_params(self):
+        # SQLITE_MAX_VARIABLE_NUMBER was raised in 3.32.0
+        if sqlite3.sqlite_version_info >= (3, 32, 0):
+            return 32766
+        return 999
+
     def get_primary_key_index_name(self, table_name):
         return ""
 
@@ -100,6 +116,42 @@ class Sqlite3Dialect(BaseDialect):
 
         return sql.getvalue(), params
 
+    def get_batch_upsert_sql(self, table_name, *, on_conflict_update=True, conflict_target=True):
+        sql = io.StringIO()
+        params = {"insert"}
+        sql.write("INSERT INTO ")
+        sql.write(table_name)
+        sql.write(" {insert} ON CONFLICT ")
+        if conflict_target:
+            params.add("col")
+            sql.write("({col}) ")
+        sql.write("DO ")
+        if on_conflict_update:
+            params.add("update")
+            sql.write("UPDATE SET {update};")
+        else:
+            sql.write("NOTHING;")
+        return sql.getvalue(), params
+
+    def get_upsert_excluded_sql(self, column_name):
+        return "excluded.{}".format(column_name)
+
+    def get_explain_sql(self, sql, *, analyze=False):
+        if analyze:
+            raise UnsupportedOperationException("Sqlite3 can't EXPLAIN ANALYZE")
+        return "EXPLAIN QUERY PLAN {}".format(sql)
+
+    def transform_rows_to_plan(self, *rows, analyze=False):
+        scanned_tables = set()
+        for row in rows:
+            match = find_scan_expr.match(row["detail"])
+            # scans over an index aren't sequential scans
+            if match is None or "INDEX" in match.group(3) or row["detail"] == "SCAN CONSTANT ROW":
+                continue
+            scanned_tables.add(match.group(1))
+
+        return md_plan.QueryPlan(list(rows), scanned_tables=scanned_tables)
+
     def transform_rows_to_columns(self, *rows, table_name):
         for row in rows:
             column_name = row["name"]
@@ -2,102 +2,400 @@
 A backend using the stdlib sqlite3 driver.
 """
 import asyncio
+import collections
+import concurrent.futures
+import functools
 import logging
+import pathlib
+import re
 import sqlite3
 import typing
 
-from asyncio_extras import threadpool
-
 from asyncqlio.backends.base import BaseConnector, BaseResultSet, BaseTransaction, DictRow
 from asyncqlio.exc import DatabaseException, IntegrityError
-from asyncqlio.utils import separate_statements
+from asyncqlio.utils import split_statements
 
 logger = logging.getLogger(__name__)
 
+#: The pragmas that can be set from DSN params.
+PRAGMAS = ("journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout")
+
+#: The number of rows fetched at once by a result set.
+FETCH_SIZE = 100
+
+_pragma_value = re.compile(r"^-?\w+$")
+_read_statement = re.compile(r"^\s*(SELECT|EXPLAIN|VALUES)\b", flags=re.IGNORECASE)
+
+
+def _is_read_only(sql: str) -> bool:
+    """
+    Checks if a SQL script only reads from the database.
+    """
+    return all(_read_statement.match(stmt) for stmt in split_statements(sql))
+
+
+def _rollback_stale(conn: sqlite3.Connection):
+    """
+    Rolls back any transaction left open on a connection.
+    """
+    if conn.in_transaction:
+        conn.rollback()
+
+
+class _SqliteConnection:
+    """
+    Wraps a sqlite3 connection, and the thread that it is used from.
+
+    Every call on the sqlite3 connection (and its cursors) is run on a single-thread executor owned
+    by this object, so the connection is only ever touched by the thread that created it.
+    """
+
+    def __init__(self):
+        #: The underlying sqlite3 connection.
+        self.raw = None  # type: sqlite3.Connection
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def run(self, fn: typing.Callable, *args) -> 'asyncio.Future':
+        """
+        Runs a function on this connection's thread.
+        """
+        return asyncio.get_event_loop().run_in_executor(self._executor,
+                                                        functools.partial(fn, *args))
+
+    async def open(self, factory: 'typing.Callable[[], sqlite3.Connection]'):
+        """
+        Opens the underlying connection by calling ``factory`` on this connection's thread.
+        """
+        try:
+            self.raw = await self.run(factory)
+        except BaseException:
+            self._executor.shutdown(wait=False)
+            raise
+
+    async def close(self):
+        """
+        Closes the underlying connection, and stops this connection's thread.
+        """
+        try:
+            await self.run(self.raw.close)
+        finally:
+            self._executor.shutdown(wait=False)
+
 
 class _SqlitePool:
     """
     A connection pool for sqlite3 connections.
+
+    The pool opens ``min_size`` connections when connected, and grows lazily up to ``max_size``
+    connections as they are needed. Connections that have been idle for longer than
+    ``idle_timeout`` seconds are closed, down to ``min_size`` connections; the pool checks for them
+    whenever a connection is released, and every ``idle_timeout / 2`` seconds.
     """
 
-    def __init__(self, max_size: int = 12, *, loop=None, **kwargs):
+    def __init__(self, min_size: int = 1, max_size: int = 12, *,
+                 idle_timeout: float = 300.0, health_check_interval: float = 30.0,
+                 pragmas: typing.Mapping[str, str] = None, loop=None, **kwargs):
         """
+        :param min_size: The minimum number of connections to keep open.
         :param max_size: The maximum size of the pool.
+        :param idle_timeout: The number of seconds a connection can be idle before it is closed.
+        :param health_check_interval: The number of seconds a connection can be idle before it is \
+            checked for health when acquired.
+        :param pragmas: A mapping of PRAGMA name -> value to set on each new connection.
         """
-        self.queue = asyncio.Queue(maxsize=max_size, loop=loop)
+        if min_size > max_size:
+            raise ValueError("min_size must not be greater than max_size")
 
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+
+        self.loop = loop or asyncio.get_event_loop()
+        self.pragmas = pragmas or {}
         self.connection_args = kwargs
 
+        #: A deque of (connection, time released) for the idle connections, oldest first.
+        self._idle = collections.deque()
+        #: The set of connections that have been acquired.
+        self._in_use = set()
+        #: Limits the number of connections that can be acquired at once.
+        self._semaphore = asyncio.Semaphore(max_size, loop=loop)
+        self._waiters = 0
+        self._closed = False
+        self._reaper = None  # type: asyncio.Task
+
+        # stats
+        self._acquisitions = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._connections_opened = 0
+        self._connections_closed = 0
+
+    @property
+    def size(self) -> int:
+        """
+        The number of connections currently open in this pool.
+        """
+        return len(self._idle) + len(self._in_use)
+
     def _new_connection(self) -> sqlite3.Connection:
-        # check_same_thread is needed because we're connecting from inside a threadpool.
-        conn = sqlite3.connect(**self.connection_args, check_same_thread=False)
+        # called on the connection's own thread
+        conn = sqlite3.connect(**self.connection_args)
         # this allows dict-like access
         conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute("PRAGMA {} = {};".format(name, value))
         return conn
 
+    async def _open_connection(self) -> _SqliteConnection:
+        conn = _SqliteConnection()
+        await conn.open(self._new_connection)
+
+        self._connections_opened += 1
+        return conn
+
+    async def _close_connection(self, conn: _SqliteConnection):
+        self._connections_closed += 1
+        await conn.close()
+
+    async def _check_connection(self, conn: _SqliteConnection) -> bool:
+        """
+        Checks if a connection is still usable.
+        """
+        try:
+            await conn.run(lambda: conn.raw.execute("SELECT 1;").fetchone())
+        except sqlite3.Error:
+            logger.warning("Discarding unhealthy sqlite3 connection {}".format(conn))
+            return False
+
+        return True
+
+    async def _get_connection(self) -> _SqliteConnection:
+        """
+        Gets an idle connection, or opens a new one if there are no idle connections.
+        """
+        now = self.loop.time()
+        while self._idle:
+            # use the most recently released connection, so that old ones can idle out
+            conn, released = self._idle.pop()
+            if now - released < self.health_check_interval or await self._check_connection(conn):
+                return conn
+
+            await self._close_connection(conn)
+
+        return await self._open_connection()
+
+    async def _reap_idle(self):
+        """
+        Closes connections that have been idle for longer than the idle timeout.
+        """
+        now = self.loop.time()
+        while self._idle and self.size > self.min_size:
+            conn, released = self._idle[0]
+            if now - released < self.idle_timeout:
+                break
+
+            self._idle.popleft()
+            await self._close_connection(conn)
+
+    async def _reap_periodically(self):
+        """
+        Reaps idle connections until the pool is closed, so that they are closed even when no
+        connections are being released.
+        """
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            try:
+                await self._reap_idle()
+            except Exception:
+                logger.exception("Failed to close idle sqlite3 connections")
+
     async def connect(self, *args, **kwargs):
         """
-        Connects this pool.
+        Connects this pool, opening the minimum number of connections.
         """
-        async with threadpool():
-            for x in range(0, self.queue.maxsize):
-                conn = self._new_connection()
-                self.queue.put_nowait(conn)
+        for x in range(0, self.min_size):
+            conn = await self._open_connection()
+            self._idle.append((conn, self.loop.time()))
+
+        if self.idle_timeout > 0:
+            self._reaper = asyncio.ensure_future(self._reap_periodically(), loop=self.loop)
 
         return self
 
-    async def acquire(self) -> sqlite3.Connection:
+    async def acquire(self) -> _SqliteConnection:
         """
         Acquires a connection from the pool.
         """
-        return await self.queue.get()
+        if self._closed:
+            raise RuntimeError("Pool is closed")
+
+        start = self.loop.time()
+        self._waiters += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiters -= 1
+
+        try:
+            conn = await self._get_connection()
+        except BaseException:
+            self._semaphore.release()
+            raise
 
-    async def release(self, conn: sqlite3.Connection):
+        wait_time = self.loop.time() - start
+        self._acquisitions += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+
+        self._in_use.add(conn)
+        return conn
+
+    async def release(self, conn: _SqliteConnection):
         """
         Releases a connection back to the pool of available connections.
         """
-        async with threadpool():
+        self._in_use.discard(conn)
+        try:
             # rollback anything stale left in the DB
-            if conn.in_transaction:
-                conn.close()
-                conn = self._new_connection()
-
-        self.queue.put_nowait(conn)
+            await conn.run(_rollback_stale, conn.raw)
+        except sqlite3.Error:
+            await self._close_connection(conn)
+        else:
+            if self._closed:
+                await self._close_connection(conn)
+            else:
+                self._idle.append((conn, self.loop.time()))
+        finally:
+            self._semaphore.release()
+
+        await self._reap_idle()
 
     async def close(self):
         """
         Closes the pool.
+
+        Connections that are still acquired will be closed when they are released.
         """
-        while True:
-            try:
-                conn = self.queue.get_nowait()
-            except asyncio.QueueEmpty:
-                return
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
 
-            conn.close()
+        while self._idle:
+            conn, _ = self._idle.popleft()
+            await self._close_connection(conn)
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        :return: A dict of statistics about this pool's size, utilization and wait times.
+        """
+        in_use = len(self._in_use)
+        return {
+            "size": self.size,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "idle": len(self._idle),
+            "in_use": in_use,
+            "waiters": self._waiters,
+            "utilization": in_use / self.max_size,
+            "acquisitions": self._acquisitions,
+            "total_wait_time": self._total_wait_time,
+            "max_wait_time": self._max_wait_time,
+            "connections_opened": self._connections_opened,
+            "connections_closed": self._connections_closed,
+        }
 
 
 class Sqlite3Connector(BaseConnector):
     """
     A connector powered by sqlite3.
+
+    The pool can be configured with the ``min_size``, ``max_size``, ``idle_timeout`` and
+    ``health_check_interval`` DSN params, for example
+    ``sqlite3:///my.db?max_size=4&idle_timeout=60``.
+
+    The ``journal_mode``, ``synchronous``, ``mmap_size``, ``cache_size`` and ``busy_timeout`` DSN
+    params are set as PRAGMAs on every connection. When ``journal_mode=wal`` is used, the connector
+    keeps a single writer connection and a separate pool of ``readers`` read-only connections;
+    transactions that only read never wait on the writer.
+
+    .. code-block:: python3
+
+        db = DatabaseInterface("sqlite3:///my.db?journal_mode=wal&synchronous=normal&readers=4")
     """
 
     def __init__(self, parsed, *,
-                 max_size: int = 12):
+                 min_size: int = 1,
+                 max_size: int = 12,
+                 idle_timeout: float = 300.0,
+                 health_check_interval: float = 30.0):
         super().__init__(parsed)
 
         self.loop = None
-        self.max_size = max_size
+        self.min_size = int(self.params.pop("min_size", min_size))
+        self.max_size = int(self.params.pop("max_size", max_size))
+        self.idle_timeout = float(self.params.pop("idle_timeout", idle_timeout))
+        self.health_check_interval = float(self.params.pop("health_check_interval",
+                                                           health_check_interval))
+
+        #: The PRAGMAs to set on every connection.
+        self.pragmas = collections.OrderedDict()
+        for name in PRAGMAS:
+            if name not in self.params:
+                continue
+
+            value = self.params.pop(name)
+            if not _pragma_value.match(value):
+                raise ValueError("Invalid value {!r} for PRAGMA {}".format(value, name))
+            self.pragmas[name] = value
+
+        #: If this connector splits connections into a writer and readers (in WAL mode).
+        self.split = self.pragmas.get("journal_mode", "").lower() == "wal"
+        self.readers = int(self.params.pop("readers", self.max_size))
+
+        #: The pool of connections. In WAL mode, this is the pool for the single writer.
         self.pool = None  # type: _SqlitePool
 
+        #: The pool of read-only connections, in WAL mode.
+        self.reader_pool = None  # type: _SqlitePool
+
     async def connect(self, *, loop: asyncio.AbstractEventLoop = None) -> 'BaseConnector':
         """
         Creates the new pool of sqlite3 connections.
         """
         self.loop = loop or asyncio.get_event_loop()
-        self.pool = _SqlitePool(max_size=self.max_size, database=self.db, loop=self.loop,
+        if not self.split:
+            self.pool = _SqlitePool(min_size=self.min_size, max_size=self.max_size,
+                                    idle_timeout=self.idle_timeout,
+                                    health_check_interval=self.health_check_interval,
+                                    pragmas=self.pragmas, database=self.db, loop=self.loop,
+                                    **self.params)
+            await self.pool.connect()
+            return self
+
+        if not self.db or self.db == ":memory:":
+            raise ValueError("WAL mode requires a database file")
+
+        # the writer is opened first, so the database is switched to WAL before readers open
+        self.pool = _SqlitePool(min_size=1, max_size=1, idle_timeout=self.idle_timeout,
+                                health_check_interval=self.health_check_interval,
+                                pragmas=self.pragmas, database=self.db, loop=self.loop,
                                 **self.params)
         await self.pool.connect()
+
+        # journal_mode can't be changed by read-only connections
+        reader_pragmas = collections.OrderedDict((k, v) for k, v in self.pragmas.items()
+                                                 if k != "journal_mode")
+        reader_uri = "{}?mode=ro".format(pathlib.Path(self.db).absolute().as_uri())
+        self.reader_pool = _SqlitePool(min_size=min(self.min_size, self.readers),
+                                       max_size=self.readers, idle_timeout=self.idle_timeout,
+                                       health_check_interval=self.health_check_interval,
+                                       pragmas=reader_pragmas, database=reader_uri, uri=True,
+                                       loop=self.loop, **self.params)
+        await self.reader_pool.connect()
         return self
 
     async def close(self):
@@ -105,6 +403,18 @@ class Sqlite3Connector(BaseConnector):
         Closes this connector.
         """
         await self.pool.close()
+        if self.reader_pool is not None:
+            await self.reader_pool.close()
+
+    def pool_stats(self) -> typing.Dict[str, typing.Any]:
+        stats = super().pool_stats()
+        # in WAL mode, this is the total of the writer and reader pools
+        pools = [pool.stats() for pool in (self.pool, self.reader_pool) if pool is not None]
+        for key in ("size", "max_size", "idle", "in_use", "waiters", "connections_opened",
+                    "connections_closed"):
+            stats[key] = sum(pool[key] for pool in pools)
+
+        return stats
 
     def get_transaction(self) -> 'BaseTransaction':
         return Sqlite3Transaction(self)
@@ -125,15 +435,120 @@ class Sqlite3Transaction(BaseTransaction):
         super().__init__(connector)
 
         #: The connection for this transaction.
-        self.connection = None  # type: sqlite3.Connection
+        self.connection = None  # type: _SqliteConnection
+
+        #: The pool the connection was acquired from.
+        self._pool = None  # type: _SqlitePool
+
+        # the result sets from cursor() on a reader that haven't been closed yet
+        self._open_results = set()  # type: typing.Set[Sqlite3ResultSet]
+        # readers replaced by the writer, held until their result sets are closed
+        self._held_readers = {}  # type: typing.Dict[_SqliteConnection, _SqlitePool]
 
         self._lock = asyncio.Lock(loop=self.connector.loop)
 
     async def begin(self):
         """
         Begins the current transaction.
+
+        In WAL mode, the connection is only acquired once the first statement is run; a reader
+        connection is used until the transaction writes, after which the writer is used.
+        """
+        if not self.connector.split:
+            await self._acquire(self.connector.pool)
+
+    async def _acquire(self, pool: _SqlitePool):
         """
-        self.connection = await self.connector.pool.acquire()
+        Acquires a connection for this transaction from a pool.
+        """
+        self._pool = pool
+        self.connection = await self.acquire_connection(pool.acquire)
+
+    async def _release(self):
+        """
+        Releases the connection for this transaction back to its pool.
+        """
+        connection, self.connection = self.connection, None
+        await self._release_connection(self._pool, connection)
+
+    async def _release_connection(self, pool: _SqlitePool, connection: _SqliteConnection):
+        await pool.release(connection)
+        self.fire_pool_event("pool_release", connection)
+
+    def _has_open_results(self, connection: _SqliteConnection) -> bool:
+        return any(result.connection is connection for result in self._open_results)
+
+    async def _result_closed(self, result: 'Sqlite3ResultSet'):
+        """
+        Called when a result set from this transaction is closed, to release its reader if the
+        transaction has moved on to the writer.
+        """
+        self._open_results.discard(result)
+        pool = self._held_readers.get(result.connection)
+        if pool is not None and not self._has_open_results(result.connection):
+            del self._held_readers[result.connection]
+            await self._release_connection(pool, result.connection)
+
+    async def _ensure_connection(self, sql: str):
+        """
+        Ensures this transaction has a connection suitable for running the specified SQL.
+        """
+        if not self.connector.split:
+            return
+
+        if self._pool is self.connector.pool:
+            return
+
+        read_only = _is_read_only(sql)
+        if self.connection is not None and read_only:
+            return
+
+        pool = self.connector.reader_pool if read_only else self.connector.pool
+        if self.connection is not None:
+            # upgrading from a reader to the writer
+            # all further statements go to the writer, so they can read our writes
+            if self._has_open_results(self.connection):
+                # the reader's cursors can still be read from, so it can't go back to the pool yet
+                self._held_readers[self.connection] = self._pool
+                self.connection = None
+            else:
+                await self._release()
+
+        await self._acquire(pool)
+
+    def _run_statements(self, sql: str, params, cursor: sqlite3.Cursor, *,
+                        script: bool = False) -> sqlite3.Cursor:
+        """
+        Runs each statement in the SQL on the cursor.
+
+        This is called on the connection's thread.
+
+        :param script: If a multi-statement script without params can be run in one call with \
+            ``executescript``.
+        """
+        statements = split_statements(sql)
+        # executescript commits any open transaction first, so it's only used outside of one
+        # the BEGIN keeps the script's statements in this transaction
+        if script and params is None and len(statements) > 1 \
+                and not cursor.connection.in_transaction \
+                and not statements[0].upper().startswith("BEGIN"):
+            statements = ("BEGIN; {};".format("; ".join(statements)),)
+            execute = cursor.executescript
+        else:
+            execute = cursor.execute
+
+        for stmt in statements:
+            try:
+                if params is None:
+                    execute(stmt)
+                else:
+                    execute(stmt, params)
+            except sqlite3.IntegrityError as e:
+                raise IntegrityError(*e.args)
+            except sqlite3.OperationalError as e:
+                raise DatabaseException(*e.args)
+
+        return cursor
 
     async def execute(self, sql: str, params: typing.Union[typing.Mapping, typing.Iterable] = None):
         """
@@ -143,27 +558,26 @@ class Sqlite3Transaction(BaseTransaction):
 
         logger.debug("Running SQL {} with params {}".format(sql, params))
         async with self._lock:
-            async with threadpool():
-                for stmt in separate_statements(sql):
-                    try:
-                        if params is None:
-                            res = self.connection.execute(stmt)
-                        else:
-                            res = self.connection.execute(stmt, params)
-                    except sqlite3.IntegrityError as e:
-                        raise IntegrityError(*e.args)
-                    except sqlite3.OperationalError as e:
-                        raise DatabaseException(*e.args)
-
-            return res
+            await self._ensure_connection(sql)
+            with self.instrument(sql, params, self.connection) as event:
+                cur = await self.connection.run(
+                    lambda: self._run_statements(sql, params, self.connection.raw.cursor(),
+                                                 script=True)
+                )
+                if cur.rowcount >= 0:
+                    event.rows = cur.rowcount
+
+            return cur
 
     async def commit(self):
         """
         Commits the current transaction.
         """
+        if self.connection is None:
+            return
+
         async with self._lock:
-            async with threadpool():
-                self.connection.commit()
+            await self.connection.run(self.connection.raw.commit)
 
     async def rollback(self, checkpoint: str = None):
         """
@@ -173,9 +587,11 @@ class Sqlite3Transaction(BaseTransaction):
             await self.execute("ROLLBACK TRANSACTION TO SAVEPOINT %s;", (checkpoint,))
             return
 
+        if self.connection is None:
+            return
+
         async with self._lock:
-            async with threadpool():
-                self.connection.rollback()
+            await self.connection.run(self.connection.raw.rollback)
 
     async def create_savepoint(self, name: str):
         """
@@ -197,19 +613,45 @@ class Sqlite3Transaction(BaseTransaction):
 
         logger.debug("Running SQL {} with params {}".format(sql, params))
 
+        def _cursor():
+            # the statements and the first batch of rows are run as one job
+            cur = self._run_statements(sql, params, self.connection.raw.cursor())
+            return cur, [DictRow(r) for r in cur.fetchmany(FETCH_SIZE)]
+
         async with self._lock:
-            async with threadpool():
-                for stmt in separate_statements(sql):
-                    cur = self.connection.cursor()
-                    try:
-                        if params is None:
-                            cur.execute(stmt)
-                        else:
-                            cur.execute(stmt, params)
-                    except sqlite3.OperationalError as e:
-                        raise DatabaseException(*e.args)
-
-        return Sqlite3ResultSet(cur)
+            await self._ensure_connection(sql)
+            with self.instrument(sql, params, self.connection) as event:
+                cur, rows = await self.connection.run(_cursor)
+
+        result = Sqlite3ResultSet(cur, self.connection, rows)
+        if self._pool is self.connector.reader_pool:
+            # the reader isn't released while this is open
+            result.transaction = self
+            self._open_results.add(result)
+
+        return result.track(event, self.connector.hooks, self.connector.yield_budget)
+
+    async def fetch_batch(self, statements: 'typing.Sequence[typing.Tuple[str, typing.Any]]') \
+            -> typing.List[typing.List[DictRow]]:
+        """
+        Runs several statements in one job on the connection's thread.
+        """
+        def _fetch_batch():
+            results = []
+            for sql, params in statements:
+                cur = self._run_statements(sql, params, self.connection.raw.cursor())
+                results.append([DictRow(r) for r in cur.fetchall()])
+                cur.close()
+
+            return results
+
+        sql = "\n".join(sql for sql, params in statements)
+        params = [params for sql, params in statements]
+        async with self._lock:
+            # every statement runs on one connection, so this is the writer if any of them write
+            await self._ensure_connection(sql)
+            with self.instrument(sql, params, self.connection):
+                return await self.connection.run(_fetch_batch)
 
     async def close(self, *, has_error: bool = False):
         """
@@ -217,45 +659,85 @@ class Sqlite3Transaction(BaseTransaction):
         """
         # we can ignore has_error
         # because we try and do proper transaction logic
-        await self.connector.pool.release(self.connection)
-        self.connection = None
+        for result in [result for result in self._open_results
+                       if result.connection in self._held_readers]:
+            # this releases the reader once its last result set is closed
+            await result.close()
+
+        if self.connection is not None:
+            await self._release()
+        self._pool = None
 
 
 class Sqlite3ResultSet(BaseResultSet):
     """
     A result set for a sqlite3 database.
+
+    Rows are fetched from the cursor in batches of :data:`.FETCH_SIZE`, on the connection's thread.
     """
 
-    def __init__(self, cursor: sqlite3.Cursor):
+    def __init__(self, cursor: sqlite3.Cursor, connection: _SqliteConnection,
+                 rows: typing.List[DictRow] = None):
         self.cursor = cursor
+        self.connection = connection
+
+        #: The transaction to notify when this is closed, if any.
+        self.transaction = None  # type: Sqlite3Transaction
 
         self._keys = None
+        self._buffer = collections.deque(rows or ())
+        # a short batch means the cursor has no more rows
+        self._exhausted = rows is not None and len(rows) < FETCH_SIZE
 
     @property
     def keys(self) -> typing.Iterable[str]:
         return self._keys
 
+    @property
+    def last_row_id(self) -> typing.Optional[int]:
+        return self.cursor.lastrowid
+
+    def _fetch(self, n: int) -> typing.List[DictRow]:
+        # called on the connection's thread
+        return [DictRow(r) for r in self.cursor.fetchmany(n)]
+
+    async def _fill(self, n: int):
+        """
+        Fills the buffer with at least ``n`` rows, if the cursor has that many left.
+        """
+        if self._exhausted or len(self._buffer) >= n:
+            return
+
+        size = max(n - len(self._buffer), FETCH_SIZE)
+        rows = await self.connection.run(self._fetch, size)
+        self._reset_timer()
+        self._exhausted = len(rows) < size
+        self._buffer.extend(rows)
+
     async def close(self):
-        async with threadpool():
-            self.cursor.close()
+        self._buffer.clear()
+        self._finish_event()
+        await self.connection.run(self.cursor.close)
+        if self.transaction is not None:
+            await self.transaction._result_closed(self)
 
     async def fetch_many(self, n: int) -> typing.List[typing.Mapping[str, typing.Any]]:
         """
         Fetches many rows.
         """
-        async with threadpool():
-            rows = self.cursor.fetchmany(size=n)
-
-        return [DictRow(r) for r in rows if r is not None]
+        await self._fill(n)
+        rows = [self._buffer.popleft() for _ in range(min(n, len(self._buffer)))]
+        self._count_rows(len(rows), exhausted=len(rows) < n)
+        return rows
 
     async def fetch_row(self) -> typing.Mapping[str, typing.Any]:
         """
         Fetches one row.
         """
-        async with threadpool():
-            row = self.cursor.fetchone()
-
-        return DictRow(row) if row is not None else None
+        await self._fill(1)
+        row = self._buffer.popleft() if self._buffer else None
+        self._count_rows(row is not None, exhausted=row is None)
+        return row
 
 
 CONNECTOR_TYPE = Sqlite3Connector
@@ -1,16 +1,24 @@
 """
 The main Database object. This is the "database interface" to the actual DB server.
 """
+import asyncio
+import collections.abc
 import importlib
+import inspect
 import itertools
 import logging
-from typing import Tuple, Type, Union
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Tuple, Type, Union
 from urllib.parse import ParseResult, urlparse
 
+from asyncqlio import hooks as md_hooks
 from asyncqlio.backends.base import BaseConnector, BaseDialect, BaseTransaction
-from asyncqlio.orm import session as md_session
-from asyncqlio.orm.ddl import ddlsession as md_ddlsession
-from asyncqlio.orm.schema import table as md_table
+
+# the ORM modules are imported when they are first used, so that the low-level API can be used
+# without importing them
+if TYPE_CHECKING:
+    from asyncqlio.orm import session as md_session
+    from asyncqlio.orm.ddl import ddlsession as md_ddlsession
+    from asyncqlio.orm.schema import table as md_table
 
 # sentinels
 NO_CONNECTOR = object()
@@ -36,11 +44,25 @@ class DatabaseInterface(object):
     """
     param_counter = itertools.count()
 
-    def __init__(self, dsn: str, connector: Type[BaseConnector] = None):
+    def __init__(self, dsn: str, connector: Type[BaseConnector] = None, *,
+                 slow_query_threshold: float = None,
+                 explain_slow_queries: bool = False,
+                 redact_params: bool = False,
+                 yield_rows: int = None,
+                 yield_interval: float = None):
         """
         :param dsn:
             The `Data Source Name <http://whatis.techtarget.com/definition/data-source-name-DSN>_`
             to connect to the database on.
+        :param slow_query_threshold: If provided, queries that take longer than this many seconds \
+            are recorded in :attr:`.DatabaseInterface.slow_query_log`.
+        :param explain_slow_queries: If slow queries should be re-run as EXPLAIN, and the plan \
+            attached to their record.
+        :param redact_params: If the values of params should be left out of slow query records.
+        :param yield_rows: If provided, iterating over rows yields to the event loop after this \
+            many rows. See :class:`.YieldBudget`.
+        :param yield_interval: If provided, iterating over rows yields to the event loop after \
+            holding it for this many seconds.
         """
         self._dsn = dsn
 
@@ -77,6 +99,22 @@ class DatabaseInterface(object):
         #: The current connector instance.
         self.connector = None  # type: BaseConnector
 
+        #: The :class:`.Hooks` fired by every transaction of this database.
+        self.hooks = md_hooks.Hooks()
+
+        #: The :class:`.SlowQueryLog` for this database, if a slow query threshold was provided.
+        self.slow_query_log = None  # type: md_hooks.SlowQueryLog
+        if slow_query_threshold is not None:
+            self.slow_query_log = md_hooks.SlowQueryLog(self, slow_query_threshold,
+                                                        explain=explain_slow_queries,
+                                                        redact_params=redact_params)
+            self.hooks.add_listener("after_execute", self.slow_query_log)
+
+        #: The :class:`.YieldBudget` for iterating over rows, if a yield limit was provided.
+        self.yield_budget = None  # type: md_hooks.YieldBudget
+        if yield_rows is not None or yield_interval is not None:
+            self.yield_budget = md_hooks.YieldBudget(yield_rows, yield_interval)
+
     async def __aenter__(self):
         if not self.connected:
             await self.connect()
@@ -97,6 +135,8 @@ class DatabaseInterface(object):
         """
         Binds tables to this DB instance.
         """
+        from asyncqlio.orm.schema import table as md_table
+
         if isinstance(md, md_table.TableMeta):
             md = md.metadata
         # first set a bind on the metadata
@@ -115,6 +155,8 @@ class DatabaseInterface(object):
         :return: The :class:`~.BaseConnector` established.
         """
         self.connector = self._connector_type(self._parsed_dsn)
+        self.connector.hooks = self.hooks
+        self.connector.yield_budget = self.yield_budget
         try:
             await self.connector.connect(**kwargs)
         except Exception:
@@ -153,12 +195,48 @@ class DatabaseInterface(object):
         """
         Gets a new :class:`.Session` bound to this instance.
         """
+        from asyncqlio.orm import session as md_session
+
         return md_session.Session(self, **kwargs)
 
+    def map(self, queries: 'Iterable[Callable[[md_session.Session], Any]]', *,
+            concurrency: int = 4) -> 'QueryMapper':
+        """
+        Runs independent queries concurrently, over several sessions.
+
+        Each item of ``queries`` is a callable that takes a :class:`.Session` and returns a query,
+        or an awaitable for its result. Up to ``concurrency`` sessions are opened, and each one
+        runs queries until there are none left, so a connection is only acquired once per
+        session.
+
+        .. code-block:: python3
+
+            queries = [lambda sess, id=id: sess.select(User).where(User.id == id).first()
+                       for id in user_ids]
+            async with db.map(queries, concurrency=8) as results:
+                async for index, user in results:
+                    ...
+
+        .. versionadded:: 0.2.0
+
+        :param queries: The callables that create each query.
+        :param concurrency: The maximum number of sessions to run queries in at once. This is \
+            lowered to the maximum size of the connection pool, if it is known.
+        :return: A :class:`.QueryMapper` that yields ``(index, result)`` tuples as each query \
+            finishes.
+        """
+        max_size = self.connector.pool_stats()["max_size"]
+        if max_size is not None:
+            concurrency = min(concurrency, max_size)
+
+        return QueryMapper(self, queries, concurrency=concurrency)
+
     def get_ddl_session(self, **kwargs) -> 'md_ddlsession.DDLSession':
         """
         Gets a new :class:`.DDLSession` bound to this instance.
         """
+        from asyncqlio.orm.ddl import ddlsession as md_ddlsession
+
         return md_ddlsession.DDLSession(self, **kwargs)
 
     async def close(self):
@@ -174,3 +252,136 @@ class DatabaseInterface(object):
         Gets the version of the DB server.
         """
         return await self.connector.get_db_server_version()
+
+
+class QueryMapper(collections.abc.AsyncIterator):
+    """
+    Runs queries concurrently over several sessions, as returned by :meth:`.DatabaseInterface.map`.
+
+    Iterating over this yields ``(index, result)`` tuples in the order the queries finish, where
+    ``index`` is the position of the query in the iterable passed in. If a query raises, the
+    other sessions are stopped and the exception is raised from the iteration.
+
+    The sessions are closed, and their connections released, once every query has finished; if
+    iteration is stopped early, use this as an async context manager or call
+    :meth:`.QueryMapper.close` to cancel the remaining queries.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, db: DatabaseInterface,
+                 queries: 'Iterable[Callable[[md_session.Session], Any]]', *,
+                 concurrency: int = 4):
+        """
+        :param db: The :class:`.DatabaseInterface` to get sessions from.
+        :param queries: The callables that create each query.
+        :param concurrency: The number of sessions to run queries in at once.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        if isinstance(queries, collections.abc.Sized):
+            # don't open sessions that would have nothing to run
+            concurrency = max(min(concurrency, len(queries)), 1)
+
+        self.db = db
+        self.concurrency = concurrency
+
+        # shared between the workers, so each query is only run once
+        self._queries = enumerate(queries)
+        # (index, result) for each finished query, or (None, error) when a worker stops
+        self._results = asyncio.Queue()
+        self._tasks = None  # type: List[asyncio.Task]
+        self._running = 0
+
+    async def __aenter__(self) -> 'QueryMapper':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    async def _run(self, sess: 'md_session.Session', query: Callable) -> Any:
+        """
+        Runs one query in a session, and fetches all of its results.
+        """
+        from asyncqlio.orm import query as md_query
+
+        result = query(sess)
+        if isinstance(result, md_query.SelectQuery):
+            result = await result.all()
+        elif inspect.isawaitable(result):
+            result = await result
+
+        # the session is re-used for the next query, so the rows must be fetched now
+        if isinstance(result, md_query.ResultGenerator):
+            result = await result.flatten()
+
+        return result
+
+    async def _worker(self):
+        """
+        Runs queries in one session until there are none left.
+        """
+        error = None
+        try:
+            async with self.db.get_session() as sess:
+                for index, query in self._queries:
+                    self._results.put_nowait((index, await self._run(sess, query)))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+
+        self._results.put_nowait((None, error))
+
+    def _start(self):
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+        self._running = len(self._tasks)
+
+    async def __anext__(self) -> Tuple[int, Any]:
+        if self._tasks is None:
+            self._start()
+
+        while self._running:
+            try:
+                index, result = await self._results.get()
+            except asyncio.CancelledError:
+                await self.close()
+                raise
+
+            if index is not None:
+                return index, result
+
+            # a worker has stopped
+            self._running -= 1
+            if result is not None:
+                await self.close()
+                raise result
+
+        raise StopAsyncIteration
+
+    async def flatten(self) -> List[Any]:
+        """
+        Runs every query, and returns their results in the order the queries were passed in.
+        """
+        results = {}
+        async with self:
+            async for index, result in self:
+                results[index] = result
+
+        return [results[index] for index in sorted(results)]
+
+    async def close(self):
+        """
+        Cancels any queries that are still running, and waits for their sessions to close.
+        """
+        if not self._tasks:
+            return
+
+        for task in self._tasks:
+            task.cancel()
+
+        # the sessions roll back and release their connections as the cancellation unwinds them
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._running = 0
@@ -0,0 +1,386 @@
+"""
+Instrumentation hooks, for observing queries and connection pools.
+
+Listeners are registered on the :attr:`.DatabaseInterface.hooks` of a database, and are fired by
+every transaction created from it:
+
+.. code-block:: python3
+
+    db = DatabaseInterface("postgresql://127.0.0.1/mydb")
+
+    @db.hooks.listen("after_execute")
+    def observe(event: QueryEvent):
+        query_latency.observe(event.duration)
+
+Listeners are called synchronously, in the order they were added. Exceptions raised inside a
+listener are logged, and never propagate into the query.
+
+Queries that take longer than a threshold can be recorded with a :class:`.SlowQueryLog`, which is
+usually set up by passing ``slow_query_threshold`` to the :class:`.DatabaseInterface`.
+
+How long iterating over rows holds the event loop for can be limited, and measured, with a
+:class:`.YieldBudget`.
+
+.. versionadded:: 0.2.0
+"""
+import asyncio
+import collections.abc
+import contextlib
+import logging
+import os
+import re
+import time
+import traceback
+import typing
+
+from asyncqlio.utils import split_statements
+
+logger = logging.getLogger(__name__)
+
+_explain_statement = re.compile(r"^\s*EXPLAIN\b", flags=re.IGNORECASE)
+# frames in these are skipped when finding where a query was run from
+_skipped_files = (os.path.dirname(os.path.abspath(__file__)), os.path.abspath(contextlib.__file__))
+
+#: The events that can be listened to.
+#:
+#:  - ``before_execute``, ``after_execute`` and ``on_error`` are fired with a :class:`.QueryEvent`
+#:    for each call to :meth:`.BaseTransaction.execute` or :meth:`.BaseTransaction.cursor`, and
+#:    for each batch of statements sent by :meth:`.BaseTransaction.fetch_batch`.
+#:  - ``after_fetch`` is fired with the :class:`.QueryEvent` of a
+#:    :meth:`.BaseTransaction.cursor` call once its result set is exhausted or closed, with
+#:    :attr:`.QueryEvent.rows` set to the number of rows fetched.
+#:  - ``pool_acquire`` and ``pool_release`` are fired with a :class:`.PoolEvent` when a
+#:    transaction acquires or releases a connection.
+EVENTS = ("before_execute", "after_execute", "on_error", "after_fetch", "pool_acquire",
+          "pool_release")
+
+
+class QueryEvent:
+    """
+    Represents a query being run in a transaction.
+    """
+    __slots__ = ("sql", "params", "connection_id", "duration", "rows", "error")
+
+    def __init__(self, sql: str, params: typing.Union[typing.Mapping, typing.Iterable, None],
+                 connection_id: int = None):
+        #: The SQL being run.
+        self.sql = sql
+
+        #: The params the SQL is being run with.
+        self.params = params
+
+        #: The ID of the connection the SQL is being run on.
+        self.connection_id = connection_id
+
+        #: The number of seconds the query took to run. This is None in ``before_execute``.
+        self.duration = None  # type: float
+
+        #: The number of rows changed by :meth:`.BaseTransaction.execute`, if known.
+        #: For :meth:`.BaseTransaction.cursor`, this is the number of rows fetched, which is only
+        #: known in ``after_fetch``.
+        self.rows = None  # type: int
+
+        #: The exception raised by the query, in ``on_error``.
+        self.error = None  # type: BaseException
+
+    @property
+    def params_shape(self) -> typing.Union[typing.Tuple[str, ...], int]:
+        """
+        The shape of the params, without their values. This is the sorted tuple of names for a
+        mapping, or the number of params otherwise.
+        """
+        if self.params is None:
+            return 0
+
+        if isinstance(self.params, collections.abc.Mapping):
+            return tuple(sorted(self.params))
+
+        return len(self.params)
+
+    def __repr__(self):
+        return "<QueryEvent sql={!r} duration={} rows={}>".format(self.sql, self.duration,
+                                                                  self.rows)
+
+
+class PoolEvent:
+    """
+    Represents a connection being acquired from or released to a connection pool.
+    """
+    __slots__ = ("connection_id", "duration")
+
+    def __init__(self, connection_id: int, duration: float = None):
+        #: The ID of the connection.
+        self.connection_id = connection_id
+
+        #: The number of seconds spent waiting for the connection, in ``pool_acquire``.
+        self.duration = duration
+
+    def __repr__(self):
+        return "<PoolEvent connection_id={} duration={}>".format(self.connection_id,
+                                                                 self.duration)
+
+
+class Hooks:
+    """
+    A registry of listeners for instrumentation events.
+    """
+
+    def __init__(self):
+        self._listeners = {event: [] for event in EVENTS}
+
+    def add_listener(self, event: str, listener: 'typing.Callable[[typing.Any], None]'):
+        """
+        Adds a listener for an event.
+
+        :param event: The name of the event, from :data:`.EVENTS`.
+        :param listener: A callable that takes the event object.
+        """
+        if event not in self._listeners:
+            raise ValueError("Unknown event {}".format(event))
+
+        self._listeners[event].append(listener)
+
+    def remove_listener(self, event: str, listener: 'typing.Callable[[typing.Any], None]'):
+        """
+        Removes a listener for an event.
+        """
+        self._listeners[event].remove(listener)
+
+    def listen(self, event: str):
+        """
+        A decorator that adds the decorated function as a listener for an event.
+        """
+
+        def inner(func):
+            self.add_listener(event, func)
+            return func
+
+        return inner
+
+    def fire(self, event: str, payload: typing.Union[QueryEvent, PoolEvent]):
+        """
+        Fires an event, calling each of its listeners.
+
+        :param event: The name of the event.
+        :param payload: The event object to pass to the listeners.
+        """
+        for listener in self._listeners[event]:
+            try:
+                listener(payload)
+            except Exception:
+                logger.exception("Ignoring exception in {} listener {}".format(event, listener))
+
+
+def _find_stack_site() -> 'typing.Optional[traceback.FrameSummary]':
+    """
+    Finds the innermost frame in the current stack that is outside of asyncqlio.
+    """
+    for frame in reversed(traceback.extract_stack()):
+        if not os.path.abspath(frame.filename).startswith(_skipped_files):
+            return frame
+
+    return None
+
+
+class SlowQuery:
+    """
+    Represents a query recorded by a :class:`.SlowQueryLog`.
+    """
+    __slots__ = ("sql", "params", "duration", "site", "plan")
+
+    def __init__(self, sql: str, params: typing.Any, duration: float,
+                 site: 'traceback.FrameSummary' = None):
+        #: The SQL that was run.
+        self.sql = sql
+
+        #: The params the SQL was run with, or their :attr:`.QueryEvent.params_shape` if the log
+        #: redacts params.
+        self.params = params
+
+        #: The number of seconds the query took to run.
+        self.duration = duration
+
+        #: The :class:`traceback.FrameSummary` of the code outside of asyncqlio that ran the query.
+        self.site = site
+
+        #: The list of rows returned by EXPLAIN for the query, if the log explains queries.
+        self.plan = None  # type: typing.List[typing.Mapping[str, typing.Any]]
+
+    def __repr__(self):
+        return "<SlowQuery sql={!r} duration={}>".format(self.sql, self.duration)
+
+    def __str__(self):
+        site = "{0.filename}:{0.lineno}".format(self.site) if self.site is not None else "?"
+        msg = "Slow query ({:.3f}s) at {}: {} with params {}".format(self.duration, site,
+                                                                     self.sql, self.params)
+        if self.plan is not None:
+            msg += "\nPlan: {}".format(self.plan)
+
+        return msg
+
+
+class SlowQueryLog:
+    """
+    Records queries that take longer than a threshold to run, and logs them at WARNING.
+
+    .. code-block:: python3
+
+        db = DatabaseInterface(dsn, slow_query_threshold=0.5, explain_slow_queries=True)
+        ...
+        for query in db.slow_query_log.records:
+            print(query.duration, query.sql, query.plan)
+
+    When ``explain`` is set, each slow query is run again as an ``EXPLAIN`` on a separate
+    connection, and the plan is attached to the record before it is logged.
+    """
+
+    def __init__(self, db, threshold: float, *,
+                 explain: bool = False, redact_params: bool = False, max_records: int = 100):
+        """
+        :param db: The :class:`.DatabaseInterface` to record queries for.
+        :param threshold: The number of seconds a query can take before it is recorded.
+        :param explain: If slow queries should be re-run with EXPLAIN.
+        :param redact_params: If the values of params should be left out of the records.
+        :param max_records: The number of most recent slow queries to keep.
+        """
+        self.db = db
+        self.threshold = threshold
+        self.explain = explain
+        self.redact_params = redact_params
+
+        #: A deque of the most recent :class:`.SlowQuery` records.
+        self.records = collections.deque(maxlen=max_records)
+
+        self._pending = set()
+
+    def __call__(self, event: QueryEvent):
+        # the after_execute listener
+        if event.duration < self.threshold or _explain_statement.match(event.sql):
+            return
+
+        params = event.params_shape if self.redact_params else event.params
+        record = SlowQuery(event.sql, params, event.duration, _find_stack_site())
+        self.records.append(record)
+
+        if self.explain and len(split_statements(event.sql)) == 1:
+            task = asyncio.ensure_future(self._explain(record, event.params))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        else:
+            logger.warning(str(record))
+
+    async def _explain(self, record: SlowQuery, params):
+        """
+        Runs EXPLAIN for a slow query, then logs it.
+        """
+        try:
+            sql = self.db.dialect.get_explain_sql(record.sql)
+            tr = self.db.get_transaction()
+            await tr.begin()
+            try:
+                cursor = await tr.cursor(sql, params)
+                record.plan = [dict(row) for row in await cursor.flatten()]
+                await cursor.close()
+            finally:
+                await tr.rollback()
+                await tr.close()
+        except Exception:
+            logger.debug("Failed to EXPLAIN slow query {}".format(record.sql), exc_info=True)
+
+        logger.warning(str(record))
+
+    async def flush(self):
+        """
+        Waits for any pending EXPLAINs to finish.
+        """
+        if self._pending:
+            await asyncio.wait(list(self._pending))
+
+
+class YieldBudget:
+    """
+    Limits how long iterating over rows can hold the event loop for, without awaiting real I/O.
+
+    Drivers often return buffered rows without suspending, so iterating over a large result can
+    starve every other task. With a budget, iteration yields to the loop (with
+    ``await asyncio.sleep(0)``) after every ``rows`` rows, or after ``interval`` seconds, whichever
+    comes first.
+
+    This is usually set up by passing ``yield_rows`` or ``yield_interval`` to the
+    :class:`.DatabaseInterface`, and is used by :class:`.ResultGenerator` and
+    :meth:`.BaseResultSet.flatten`.
+    """
+
+    def __init__(self, rows: int = None, interval: float = None):
+        """
+        :param rows: The number of rows to process between yields.
+        :param interval: The number of seconds to hold the loop for before yielding.
+        """
+        #: The number of rows to process between yields.
+        self.rows = rows
+
+        #: The number of seconds to hold the loop for before yielding.
+        self.interval = interval
+
+        #: The longest stretch, in seconds, that an iteration held the loop for before yielding.
+        #: This is measured from the start of the iteration, its last yield, or the last time the
+        #: driver suspended to fetch rows.
+        self.longest_stretch = 0.0
+
+        #: The number of times an iteration has yielded to the loop.
+        self.yields = 0
+
+    def timer(self) -> 'YieldTimer':
+        """
+        Starts timing a new iteration.
+        """
+        return YieldTimer(self)
+
+    def record(self, stretch: float):
+        """
+        Records the length of a stretch that the loop was held for.
+        """
+        if stretch > self.longest_stretch:
+            self.longest_stretch = stretch
+
+
+class YieldTimer:
+    """
+    Tracks the rows processed and time spent by one iteration, for a :class:`.YieldBudget`.
+    """
+    __slots__ = ("budget", "_rows", "_start")
+
+    def __init__(self, budget: YieldBudget):
+        self.budget = budget
+        self._rows = 0
+        self._start = time.perf_counter()
+
+    async def tick(self, rows: int = 1):
+        """
+        Records some rows as processed, and yields to the loop if the budget is used up.
+
+        :param rows: The number of rows processed.
+        """
+        self._rows += rows
+        budget = self.budget
+        stretch = time.perf_counter() - self._start
+        if (budget.rows is not None and self._rows >= budget.rows) \
+                or (budget.interval is not None and stretch >= budget.interval):
+            budget.record(stretch)
+            budget.yields += 1
+            await asyncio.sleep(0)
+            self._rows = 0
+            self._start = time.perf_counter()
+
+    def reset(self):
+        """
+        Starts a new stretch, without yielding. This is called by result sets after the driver
+        suspends to fetch rows, as the loop is free while it waits.
+        """
+        self._start = time.perf_counter()
+
+    def stop(self):
+        """
+        Records the final stretch of the iteration.
+        """
+        self.budget.record(time.perf_counter() - self._start)
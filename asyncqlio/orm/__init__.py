@@ -11,8 +11,11 @@ The core code for the ORM.
 
     query
     session
+    plan
 
     inspection
     operators
+    functions
+    columnar
 
 """
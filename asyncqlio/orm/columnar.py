@@ -0,0 +1,79 @@
+"""
+Typed column buffers, for fetching results in columnar form.
+
+.. versionadded:: 0.2.0
+"""
+import array
+import typing
+
+from asyncqlio.orm.schema import column as md_column
+
+
+class ColumnBuffer(object):
+    """
+    Stores the values of one column of a result, as returned by :meth:`.SelectQuery.to_columns`.
+
+    Values are appended to an :class:`array.array` with the typecode of the column's type
+    (:attr:`.ColumnType.array_typecode`), so they are stored unboxed. Columns without a typecode,
+    and typed columns that contain a NULL, are stored in a list instead.
+    """
+
+    def __init__(self, column: 'md_column.Column'):
+        """
+        :param column: The :class:`.Column` to store the values of.
+        """
+        #: The :class:`.Column` whose values are stored.
+        self.column = column
+
+        typecode = column.type.array_typecode
+
+        #: The stored values. This is an :class:`array.array` if the column is typed, or a list.
+        self.values = array.array(typecode) if typecode is not None else []
+
+    def __len__(self):
+        return len(self.values)
+
+    def extend(self, values: typing.Sequence[typing.Any]):
+        """
+        Appends some values to this buffer.
+
+        :param values: The values to append.
+        """
+        if isinstance(self.values, array.array):
+            length = len(self.values)
+            try:
+                self.values.extend(values)
+                return
+            except TypeError:
+                # NULLs can't be stored in a typed array
+                # extend() doesn't undo the values appended before the NULL
+                del self.values[length:]
+                if self.values.typecode == "B":
+                    self.values = [bool(value) for value in self.values]
+                else:
+                    self.values = self.values.tolist()
+
+        self.values.extend(values)
+
+    def to_array(self, *, numpy: bool = False) -> typing.Any:
+        """
+        Gets the values in this buffer.
+
+        :param numpy: If a NumPy array should be returned. Typed arrays are converted without
+            copying, and untyped values are returned in an array of objects.
+        :return: The :class:`array.array`, list or NumPy array of values.
+        """
+        if not numpy:
+            return self.values
+
+        import numpy as np
+
+        if isinstance(self.values, array.array):
+            arr = np.frombuffer(self.values, dtype=self.values.typecode)
+            if self.values.typecode == "B":
+                arr = arr.view(np.bool_)
+            return arr
+
+        arr = np.empty(len(self.values), dtype=object)
+        arr[:] = self.values
+        return arr
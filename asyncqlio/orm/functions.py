@@ -0,0 +1,154 @@
+"""
+SQL aggregate functions, for use in :meth:`.SelectQuery.aggregate`.
+
+.. code-block:: python3
+
+    from asyncqlio.orm import functions as func
+
+    rows = await sess.select(User).aggregate(func.sum(User.xp), group_by=User.guild_id)
+
+.. versionadded:: 0.2.0
+"""
+from asyncqlio.orm import operators as md_operators
+from asyncqlio.orm.schema import column as md_column
+
+
+class Aggregate(object):
+    """
+    Represents an aggregate function over a column, such as ``SUM(users.xp)``.
+
+    Aggregates can be compared like columns to create conditions for a HAVING clause, and sorted
+    with :meth:`.Aggregate.asc` and :meth:`.Aggregate.desc`.
+    """
+
+    def __init__(self, function: str, column: 'md_column.Column' = None, *,
+                 distinct: bool = False):
+        """
+        :param function: The name of the SQL function, e.g. ``SUM``.
+        :param column: The :class:`.Column` to aggregate. If this is None, ``*`` is used.
+        :param distinct: If only distinct values should be aggregated.
+        """
+        #: The name of the SQL function.
+        self.function = function
+
+        #: The :class:`.Column` being aggregated, or None for ``*``.
+        self.column = column
+
+        #: If only distinct values are aggregated.
+        self.distinct = distinct
+
+        if column is None:
+            name = function.lower()
+        else:
+            name = "{}_{}".format(function.lower(), column.name)
+
+        #: The name of this aggregate in the result rows.
+        self.name = name
+
+    def __repr__(self):
+        return "<Aggregate {}>".format(self.quoted_fullname)
+
+    def __hash__(self):
+        return id(self)
+
+    @property
+    def quoted_fullname(self) -> str:
+        """
+        Gets the SQL expression for this aggregate.
+        """
+        if self.column is None:
+            expr = "*"
+        else:
+            expr = self.column.quoted_fullname
+
+        if self.distinct:
+            expr = "DISTINCT {}".format(expr)
+
+        return "{}({})".format(self.function, expr)
+
+    def alias_name(self, table=None, quoted: bool = False) -> str:
+        """
+        Gets the name this aggregate is selected as.
+        """
+        if quoted:
+            return r'"{}"'.format(self.name)
+        return self.name
+
+    def label(self, name: str) -> 'Aggregate':
+        """
+        Sets the name of this aggregate in the result rows.
+
+        :param name: The name to use.
+        :return: This aggregate.
+        """
+        self.name = name
+        return self
+
+    # Operators
+    def __eq__(self, other) -> 'md_operators.Eq':
+        return md_operators.Eq(self, other)
+
+    def __ne__(self, other) -> 'md_operators.NEq':
+        return md_operators.NEq(self, other)
+
+    def __lt__(self, other) -> 'md_operators.Lt':
+        return md_operators.Lt(self, other)
+
+    def __gt__(self, other) -> 'md_operators.Gt':
+        return md_operators.Gt(self, other)
+
+    def __le__(self, other) -> 'md_operators.Lte':
+        return md_operators.Lte(self, other)
+
+    def __ge__(self, other) -> 'md_operators.Gte':
+        return md_operators.Gte(self, other)
+
+    def asc(self) -> 'md_operators.AscSorter':
+        """
+        Returns the ascending sorter operator for this aggregate.
+        """
+        return md_operators.AscSorter(self)
+
+    def desc(self) -> 'md_operators.DescSorter':
+        """
+        Returns the descending sorter operator for this aggregate.
+        """
+        return md_operators.DescSorter(self)
+
+
+def count(column: 'md_column.Column' = None, *, distinct: bool = False) -> Aggregate:
+    """
+    Counts the rows, or the non-NULL values of a column.
+
+    :param column: The :class:`.Column` to count. If this is None, every row is counted.
+    :param distinct: If only distinct values should be counted.
+    """
+    return Aggregate("COUNT", column, distinct=distinct)
+
+
+def sum(column: 'md_column.Column', *, distinct: bool = False) -> Aggregate:
+    """
+    Sums the values of a column.
+    """
+    return Aggregate("SUM", column, distinct=distinct)
+
+
+def avg(column: 'md_column.Column', *, distinct: bool = False) -> Aggregate:
+    """
+    Averages the values of a column.
+    """
+    return Aggregate("AVG", column, distinct=distinct)
+
+
+def min(column: 'md_column.Column') -> Aggregate:
+    """
+    Gets the minimum value of a column.
+    """
+    return Aggregate("MIN", column)
+
+
+def max(column: 'md_column.Column') -> Aggregate:
+    """
+    Gets the maximum value of a column.
+    """
+    return Aggregate("MAX", column)
@@ -48,14 +48,21 @@ class BaseOperator(abc.ABC):
     The base operator class.
     """
     @abc.abstractmethod
-    def generate_sql(self, emitter: typing.Callable[[], typing.Tuple[str, str]]) \
-            -> OperatorResponse:
+    def generate_sql(self, emitter: typing.Callable[[], typing.Tuple[str, str]], *,
+                     dialect=None) -> OperatorResponse:
         """
         Generates the SQL for an operator.
 
         Parameters must be generated using the emitter callable.
 
+        .. versionchanged:: 0.2.0
+
+            Added the ``dialect`` keyword argument. Operators that wrap other operators must pass
+            it on.
+
         :param emitter: A callable that can be used to generate param placeholders in a query.
+        :param dialect: The :class:`.BaseDialect` the SQL is generated for, or None if it isn't
+            known.
         :return: A :class:`.OperatorResponse` representing the result.
 
         .. warning::
@@ -99,11 +106,11 @@ class And(BaseOperator):
     def __init__(self, *ops: 'BaseOperator'):
         self.operators = list(ops)
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         final = []
         vals = {}
         for op in self.operators:
-            response = op.generate_sql(emitter)
+            response = op.generate_sql(emitter, dialect=dialect)
             final.append(response.sql)
             vals.update(response.parameters)
 
@@ -122,11 +129,11 @@ class Or(BaseOperator):
     def __init__(self, *ops: 'BaseOperator'):
         self.operators = list(ops)
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         final = []
         vals = {}
         for op in self.operators:
-            response = op.generate_sql(emitter)
+            response = op.generate_sql(emitter, dialect=dialect)
             final.append(response.sql)
             vals.update(response.parameters)
 
@@ -150,7 +157,7 @@ class Sorter(BaseOperator, metaclass=abc.ABCMeta):
         """
         pass
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         names = ", ".join(col.alias_name(quoted=True) for col in self.cols)
         sql = "{} {}".format(names, self.sort_order)
 
@@ -195,7 +202,7 @@ class BasicSetter(BaseOperator, ColumnValueMixin, metaclass=abc.ABCMeta):
         """
         pass
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         param_name, name = emitter()
         params = {name: self.value}
 
@@ -210,7 +217,7 @@ class ValueSetter(BasicSetter):
     set_operator = "="
 
     # override as the default setter impl doesn't work
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         param_name, name = emitter()
         params = {name: self.value}
 
@@ -233,7 +240,20 @@ class DecrementSetter(BasicSetter):
 
 
 class In(BaseOperator, ColumnValueMixin):
-    def generate_sql(self, emitter: typing.Callable[[str], str]):
+    """
+    Represents an IN operator.
+
+    .. versionchanged:: 0.2.0
+
+        On dialects with array params, the items are passed as a single array param, like
+        :class:`.InArray`. This is decided by the dialect passed to
+        :meth:`.In.generate_sql`.
+    """
+
+    def generate_sql(self, emitter: typing.Callable[[str], str], *, dialect=None):
+        if dialect is not None and dialect.has_array_params:
+            return self.generate_array_sql(emitter)
+
         # generate a dict of params
         params = {}
         l = []
@@ -245,6 +265,133 @@ class In(BaseOperator, ColumnValueMixin):
         sql = "{} IN ({})".format(self.column.quoted_fullname, ", ".join(l))
         return OperatorResponse(sql, params)
 
+    def generate_array_sql(self, emitter: typing.Callable[[str], str]):
+        """
+        Generates the SQL for this operator, passing the items as one array param.
+        """
+        emitted, name = emitter()
+        sql = "{} = ANY({})".format(self.column.quoted_fullname, emitted)
+        return OperatorResponse(sql, {name: list(self.value)})
+
+
+class InArray(In):
+    """
+    Represents an IN operator that always passes the items as a single array param
+    (``col = ANY($1)``).
+
+    This keeps the SQL the same no matter how many items there are, so the database can reuse the
+    query plan. :class:`.In` generates this form by itself on dialects that support it.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def generate_sql(self, emitter, *, dialect=None):
+        return self.generate_array_sql(emitter)
+
+
+class Subquery(object):
+    """
+    Represents a query that is used inside of another query.
+
+    These are created with :meth:`.SelectQuery.subquery` or :meth:`.AggregateQuery.subquery`, and
+    can be used with :meth:`.ColumnType.in_`, or compared to a column as a scalar subquery:
+
+    .. code-block:: python3
+
+        # users that have a rare item
+        rare = sess.select(Item).where(Item.rare == True).subquery(Item.owner_id)
+        query = sess.select(User).where(User.id.in_(rare))
+
+        # users with more than the average xp
+        average = sess.select(User).aggregate(func.avg(User.xp)).subquery()
+        query = sess.select(User).where(User.xp > average)
+
+    Subqueries can refer to the columns of the outer query, which makes them correlated.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, query, *columns: 'md_column.Column'):
+        """
+        :param query: The :class:`.SelectQuery` or :class:`.AggregateQuery` to use.
+        :param columns: The :class:`.Column` objects to select.
+        """
+        self.query = query
+        self.columns = columns
+
+    def generate_sql(self, emitter, *, dialect=None):
+        sql, params = self.query.generate_subquery_sql(emitter, *self.columns)
+        return OperatorResponse("({})".format(sql), params)
+
+
+class InSubquery(BaseOperator, ColumnValueMixin):
+    """
+    Represents an IN operator, checking if a value in a column is in the result of a
+    :class:`.Subquery`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def generate_sql(self, emitter, *, dialect=None):
+        response = self.value.generate_sql(emitter, dialect=dialect)
+        sql = "{} IN {}".format(self.column.quoted_fullname, response.sql)
+        return OperatorResponse(sql, response.parameters)
+
+
+class Exists(BaseOperator):
+    """
+    Represents an EXISTS operator, checking if a query matches any rows.
+
+    .. code-block:: python3
+
+        # users that have any items
+        has_items = exists(sess.select(Item).where(Item.owner_id.eq(User.id)))
+        query = sess.select(User).where(has_items)
+
+    .. versionadded:: 0.2.0
+    """
+    operator = "EXISTS"
+
+    def __init__(self, query):
+        """
+        :param query: The :class:`.SelectQuery` or :class:`.Subquery` to check.
+        """
+        if isinstance(query, Subquery):
+            query = query.query
+
+        self.query = query
+
+    def generate_sql(self, emitter, *, dialect=None):
+        sql, params = self.query.generate_subquery_sql(emitter)
+        return OperatorResponse("{} ({})".format(self.operator, sql), params)
+
+
+class NotExists(Exists):
+    """
+    Represents a NOT EXISTS operator, checking if a query matches no rows.
+
+    .. versionadded:: 0.2.0
+    """
+    operator = "NOT EXISTS"
+
+
+def exists(query) -> Exists:
+    """
+    Creates an :class:`.Exists` operator for a query.
+
+    :param query: The :class:`.SelectQuery` or :class:`.Subquery` to check.
+    """
+    return Exists(query)
+
+
+def not_exists(query) -> NotExists:
+    """
+    Creates a :class:`.NotExists` operator for a query.
+
+    :param query: The :class:`.SelectQuery` or :class:`.Subquery` to check.
+    """
+    return NotExists(query)
+
 
 class ComparisonOp(ColumnValueMixin, BaseOperator):
     """
@@ -254,11 +401,16 @@ class ComparisonOp(ColumnValueMixin, BaseOperator):
     """
     operator = None
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         params = {}
         if isinstance(self.value, md_column.Column):
             sql = "{} {} {}".format(self.column.quoted_fullname, self.operator,
                                     self.value.quoted_fullname)
+        elif isinstance(self.value, Subquery):
+            # scalar subquery
+            response = self.value.generate_sql(emitter, dialect=dialect)
+            sql = "{} {} {}".format(self.column.quoted_fullname, self.operator, response.sql)
+            params.update(response.parameters)
         else:
             param_name, name = emitter()
             sql = "{} {} {}".format(self.column.quoted_fullname, self.operator, param_name)
@@ -274,12 +426,12 @@ class Eq(ComparisonOp):
     """
     operator = "="
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         if self.value is None:
             sql = "{} IS NULL".format(self.column.quoted_fullname)
             return OperatorResponse(sql, {})
 
-        return super().generate_sql(emitter)
+        return super().generate_sql(emitter, dialect=dialect)
 
 
 class NEq(ComparisonOp):
@@ -288,12 +440,12 @@ class NEq(ComparisonOp):
     """
     operator = "!="
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         if self.value is None:
             sql = "{} IS NOT NULL".format(self.column.quoted_fullname)
             return OperatorResponse(sql, {})
 
-        return super().generate_sql(emitter)
+        return super().generate_sql(emitter, dialect=dialect)
 
 
 class Lt(ComparisonOp):
@@ -347,7 +499,7 @@ class HackyILike(BaseOperator, ColumnValueMixin):
     A "hacky" ILIKE operator for databases that do not support it.
     """
 
-    def generate_sql(self, emitter):
+    def generate_sql(self, emitter, *, dialect=None):
         # lower(column) like (pattern|column)
         # this will lower the column
         params = {}
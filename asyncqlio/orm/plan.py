@@ -0,0 +1,53 @@
+"""
+Query plans, as returned by EXPLAIN.
+
+.. versionadded:: 0.2.0
+"""
+import typing
+
+
+class QueryPlan(object):
+    """
+    Represents the plan the database will use to run a query.
+
+    Plans are created by the dialect from the rows returned by EXPLAIN. They are usually
+    retrieved with :meth:`.SelectQuery.explain`:
+
+    .. code-block:: python3
+
+        plan = await sess.select(User).where(User.name == "bob").explain()
+        assert not plan.seq_scan, "User.name should be indexed"
+    """
+
+    def __init__(self, rows: typing.List[typing.Any], *,
+                 cost: float = None,
+                 scanned_tables: typing.Iterable[str] = (),
+                 analyzed: bool = False):
+        """
+        :param rows: The raw rows (or parsed JSON) returned by EXPLAIN.
+        :param cost: The estimated total cost of the query, if the database estimates one.
+        :param scanned_tables: The tables that are read with a sequential (full) scan.
+        :param analyzed: If this plan came from EXPLAIN ANALYZE.
+        """
+        #: The raw rows (or parsed JSON) returned by EXPLAIN.
+        self.rows = rows
+
+        #: The estimated total cost of the query, in the database's units.
+        #: This is None if the database doesn't estimate costs (e.g. SQLite).
+        self.cost = cost
+
+        #: The set of tables that are read with a sequential (full) scan.
+        self.scanned_tables = set(scanned_tables)
+
+        #: If this plan came from EXPLAIN ANALYZE, and the query was actually run.
+        self.analyzed = analyzed
+
+    @property
+    def seq_scan(self) -> bool:
+        """
+        If a sequential (full) scan happens on any table.
+        """
+        return bool(self.scanned_tables)
+
+    def __repr__(self):
+        return "<QueryPlan cost={} scanned_tables={}>".format(self.cost, self.scanned_tables)
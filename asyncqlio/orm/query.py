@@ -2,17 +2,20 @@
 Classes for query objects.
 """
 import abc
+import asyncio
 import collections
+import concurrent.futures
 import io
 import itertools
+import time
 import typing
 
-from asyncqlio.backends.base import BaseResultSet
+from asyncqlio import hooks as md_hooks  # noqa: F401 (used in type comments)
+from asyncqlio.backends.base import BaseResultSet, DictRow
 from asyncqlio.meta import AsyncABC
-from asyncqlio.orm import inspection as md_inspection, operators as md_operators, \
-    session as md_session
-from asyncqlio.orm.schema import column as md_column, relationship as md_relationship, \
-    table as md_table
+from asyncqlio.orm import functions as md_functions, inspection as md_inspection, \
+    operators as md_operators, plan as md_plan, session as md_session
+from asyncqlio.orm.schema import column as md_column, table as md_table
 from asyncqlio.sentinels import NO_VALUE
 
 
@@ -41,19 +44,238 @@ class BaseQuery(AsyncABC):
         """
 
 
+class ChunkedResultSet(BaseResultSet):
+    """
+    A result set that runs several statements one after another, and returns all of their rows.
+
+    This is used for queries that are split up by :meth:`.SelectQuery.generate_chunked_sql`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, session: 'md_session.Session',
+                 queries: 'typing.Iterable[typing.Tuple[str, dict]]'):
+        """
+        :param session: The :class:`.Session` to run the statements in.
+        :param queries: The SQL and params of each statement.
+        """
+        self.session = session
+        self._queries = collections.deque(queries)
+        self._cursor = None  # type: BaseResultSet
+
+    @property
+    def keys(self) -> typing.Iterable[str]:
+        if self._cursor is None:
+            raise RuntimeError("No keys have been fetched")
+        return self._cursor.keys
+
+    async def fetch_row(self) -> 'DictRow':
+        while True:
+            if self._cursor is None:
+                if not self._queries:
+                    return None
+                self._cursor = await self.session.cursor(*self._queries.popleft())
+                self._cursor.timer = self.timer
+                self._reset_timer()
+
+            row = await self._cursor.fetch_row()
+            if row is not None:
+                return row
+
+            await self._cursor.close()
+            self._cursor = None
+
+    async def fetch_many(self, n: int) -> 'typing.List[DictRow]':
+        rows = []
+        while len(rows) < n:
+            row = await self.fetch_row()
+            if row is None:
+                break
+            rows.append(row)
+
+        return rows
+
+    async def close(self):
+        if self._cursor is not None:
+            await self._cursor.close()
+            self._cursor = None
+        self._queries.clear()
+
+
+class BufferedResultSet(BaseResultSet):
+    """
+    A result set over rows that have already been fetched.
+
+    This is used for the results of :meth:`.Session.gather`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, rows: 'typing.Iterable[DictRow]'):
+        """
+        :param rows: The fetched rows.
+        """
+        self._rows = collections.deque(rows)
+        self._keys = self._rows[0].keys() if self._rows else None
+
+    @property
+    def keys(self) -> typing.Iterable[str]:
+        if self._keys is None:
+            raise RuntimeError("No keys have been fetched")
+        return self._keys
+
+    async def fetch_row(self) -> 'DictRow':
+        return self._rows.popleft() if self._rows else None
+
+    async def fetch_many(self, n: int) -> 'typing.List[DictRow]':
+        return [self._rows.popleft() for _ in range(min(n, len(self._rows)))]
+
+    async def close(self):
+        self._rows.clear()
+
+
+def rows_to_records(names: typing.List[str], rows: typing.List[tuple]) -> typing.List[dict]:
+    """
+    Transforms raw rows into records, as dicts of column name to value.
+
+    This is the default transform of :class:`.RecordGenerator`. It is run in an executor, so
+    custom transforms must be picklable (i.e. module-level functions) to use a process pool.
+
+    .. versionadded:: 0.2.0
+
+    :param names: The names of the columns, in the order of the values of each row.
+    :param rows: The values of each row.
+    :return: A list of records.
+    """
+    return [dict(zip(names, row)) for row in rows]
+
+
+class RecordGenerator(collections.AsyncIterator):
+    """
+    Generates lightweight records from a query, rather than :class:`.Table` rows.
+
+    Chunks of raw rows are transformed in an executor (a thread or process pool), so that
+    transforming a very large result doesn't block the event loop. The only work done on the loop
+    is fetching the rows; the chunk size is lowered if this takes longer than the time budget.
+
+    This is normally created with :meth:`.SelectQuery.records`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, q: 'SelectQuery', *,
+                 executor: 'concurrent.futures.Executor' = None,
+                 transform: 'typing.Callable[[typing.List[str], typing.List[tuple]], list]' =
+                 rows_to_records,
+                 chunk_size: int = 1000, time_budget: float = 0.01):
+        """
+        :param q: The :class:`.SelectQuery` to use.
+        :param executor: The executor to transform rows in. Defaults to the loop's executor.
+        :param transform: The function used to transform each chunk of rows.
+        :param chunk_size: The initial number of rows in each chunk.
+        :param time_budget: The longest time, in seconds, that fetching a chunk should block the
+            event loop for.
+        """
+        self.query = q
+        self.executor = executor
+        self.transform = transform
+
+        #: The number of rows fetched in each chunk. This is lowered to fit the time budget.
+        self.chunk_size = chunk_size
+
+        #: The longest time that fetching a chunk should block the event loop for.
+        self.time_budget = time_budget
+
+        self._columns = tuple(q.table.iter_columns())
+        self._results = None  # type: BaseResultSet
+        self._records = collections.deque()
+
+    async def _open(self):
+        query, session = self.query, self.query.session
+        # only the columns of the table are selected, so relationships aren't joined
+        queries = query.generate_chunked_sql(
+            lambda: query.generate_subquery_sql(session.bind.emit_param, *self._columns)
+        )
+        if len(queries) == 1:
+            self._results = await session.cursor(*queries[0])
+        else:
+            self._results = ChunkedResultSet(session, queries)
+
+    async def _fill(self) -> bool:
+        if self._results is None:
+            await self._open()
+
+        rows = await self._results.fetch_many(self.chunk_size)
+        if not rows:
+            await self._results.close()
+            return False
+
+        # this is the only part that runs on the loop
+        # the time spent waiting for the driver is deliberately excluded, as the loop is free then
+        start = time.perf_counter()
+        rows = [tuple(row.values()) for row in rows]
+        if time.perf_counter() - start > self.time_budget and self.chunk_size > 1:
+            self.chunk_size //= 2
+
+        names = [column.name for column in self._columns]
+        loop = asyncio.get_event_loop()
+        records = await loop.run_in_executor(self.executor, self.transform, names, rows)
+        self._records.extend(records)
+        return True
+
+    async def __anext__(self):
+        while not self._records:
+            if not await self._fill():
+                raise StopAsyncIteration
+
+        return self._records.popleft()
+
+    async def flatten(self) -> list:
+        """
+        Flattens the remaining records of this generator into a single list.
+        """
+        # start with any records left over from iterating
+        records = list(self._records)
+        self._records.clear()
+        while await self._fill():
+            records.extend(self._records)
+            self._records.clear()
+
+        return records
+
+
 class ResultGenerator(collections.AsyncIterator):
     """
     A helper class that will generate new results from a query when iterated over.
     """
 
-    def __init__(self, q: 'SelectQuery'):
+    def __init__(self, q: 'SelectQuery', results: BaseResultSet = None):
         """
         :param q: The :class:`.SelectQuery` to use.
+        :param results: The :class:`.BaseResultSet` of rows to map, if the query has already \
+            been run.
         """
         self.query = q
-        self._results = None  # type: BaseResultSet
+        self._results = results
 
         self._result_deque = collections.deque()
+        self._timer = None  # type: md_hooks.YieldTimer
+        if results is not None:
+            self._start_timer()
+
+    def _start_timer(self):
+        budget = self.query.session.bind.yield_budget
+        if budget is not None:
+            self._timer = self._results.timer = budget.timer()
+
+    async def _open(self):
+        queries = self.query.generate_chunked_sql()
+        if len(queries) == 1:
+            self._results = await self.query.session.cursor(*queries[0])
+        else:
+            self._results = ChunkedResultSet(self.query.session, queries)
+
+        self._start_timer()
 
     async def _fill(self):
         # peek from the first item
@@ -103,19 +325,27 @@ class ResultGenerator(collections.AsyncIterator):
     async def __anext__(self):
         # ensure we have a BaseResultSet
         if self._results is None:
-            self._results = await self.query.session.cursor(*self.query.generate_sql())
+            await self._open()
 
         # get the number of rows filled off of the end
         filled = await self._fill()
 
         if filled == 0:
+            if self._timer is not None:
+                self._timer.stop()
             raise StopAsyncIteration
 
         rows = [self._result_deque.popleft() for x in range(0, filled)]
         if len(rows) == 1:
-            return self.query.map_columns(rows[0])
+            row = self.query.map_columns(rows[0])
+        else:
+            row = self.query.map_many(*rows)
+
+        # yield to the loop if this has held it for too long
+        if self._timer is not None:
+            await self._timer.tick(filled)
 
-        return self.query.map_many(*rows)
+        return row
 
     async def next(self):
         try:
@@ -185,110 +415,148 @@ class SelectQuery(BaseQuery):
     def __aiter__(self):
         return ResultGenerator(q=self)
 
-    def _get_joins_for_table(self, parent: 'md_relationship.Relationship',
-                             table: 'md_table.Table', seen: list = None):
+    def get_required_join_paths(self):
         """
-        Gets the foreign joins for a table.
+        Gets the required join paths for this query.
+
+        :return: A two-item tuple of (foreign tables, join clauses).
         """
-        if seen is None:
-            seen = [table]
+        plan = self.table.metadata.get_join_plan(self.table)
+        return list(plan.foreign_tables), list(plan.joins)
 
-        foreign_tables = []
-        joins = []
-        for relationship in table.iter_relationships():
-            # ignore non-join relationships
-            if relationship.load_type != "joined":
-                continue
+    def generate_sql(self) -> typing.Tuple[str, dict]:
+        """
+        Generates the SQL for this query.
+        """
+        # the selected columns and joins are precomputed by the metadata
+        plan = self.table.metadata.get_join_plan(self.table)
 
-            if relationship.foreign_table in seen:
-                continue
+        # BEGIN THE GENERATION
+        fmt = io.StringIO()
+        fmt.write("SELECT {} FROM {} ".format(", ".join(plan.selected_columns),
+                                              self.table.__quoted_name__))
+
+        # format conditions
+        params = {}
+        c_sql = []
+        for condition in self.conditions:
+            response = condition.generate_sql(self.session.bind.emit_param,
+                                              dialect=self.session.bind.dialect)
+            params.update(response.parameters)
+            c_sql.append(response.sql)
 
-            foreign_table = relationship.foreign_table
-            foreign_tables.append(foreign_table)
+        # append joins
+        fmt.write(" ".join(plan.joins))
 
-            joins.append(relationship._get_join_query(parent))
+        # append the fmt with the conditions
+        # these are assumed to be And if there are multiple!
+        if c_sql:
+            fmt.write(" WHERE {}".format(" AND ".join(c_sql)))
 
-        return foreign_tables, joins
+        if self.orderer is not None:
+            res = self.orderer.generate_sql(self.session.bind.emit_param)
+            fmt.write(" ORDER BY {}".format(res.sql))
+        if self.row_limit is not None:
+            fmt.write(" LIMIT {}".format(self.row_limit))
+
+        if self.row_offset is not None:
+            fmt.write(" OFFSET {}".format(self.row_offset))
+
+        return fmt.getvalue(), params
 
-    def _recursive_get_table_joins(self, parent: 'md_relationship.Relationship',
-                                   table: 'md_table.Table', seen: list = None):
+    def generate_chunked_sql(self,
+                             generate: 'typing.Callable[[], typing.Tuple[str, dict]]' = None) \
+            -> typing.List[typing.Tuple[str, dict]]:
         """
-        Recursively loads the joins for a table.
+        Generates the SQL for this query, split into several statements if an IN condition has
+        too many items for the dialect's param limit.
 
-        :param parent: The parent relationship this table is being loaded from, or None if it was \
-            loaded directly.
-        :param table: The table to get joins for.
-        :param seen: A list of tables that have already been seen and should not be re-joined.
+        The largest IN condition on the queried table is split into chunks, with one statement per
+        chunk. Queries with an ORDER BY, LIMIT or OFFSET are never split, as the results of
+        each statement can't be merged correctly.
+
+        .. versionadded:: 0.2.0
+
+        :param generate: The function that generates the SQL and params of each statement.
+            Defaults to :meth:`.SelectQuery.generate_sql`.
+        :return: A list of two-item tuples, the SQL to use and a mapping of params to pass.
         """
-        # this scans the tree of relationships
-        # and determines how to join them properly
-        if seen is None:
-            seen = [table]
-        elif table in seen:
-            return [], []
+        if generate is None:
+            generate = self.generate_sql
 
-        foreign_tables, joins = self._get_joins_for_table(parent, table, seen=seen)
-        for relationship in table.iter_relationships():
-            if relationship.load_type != "joined":
-                continue
+        if self.orderer is not None or self.row_limit is not None or self.row_offset is not None:
+            return [generate()]
 
-            if relationship.foreign_table in seen:
+        # IN conditions only use one param
+        if self.session.bind.dialect.has_array_params:
+            return [generate()]
+
+        # leave room for the params of the other conditions
+        chunk_size = self.session.bind.dialect.max_params // 2
+        largest, index = None, None
+        for n, condition in enumerate(self.conditions):
+            if not isinstance(condition, md_operators.In) \
+                    or isinstance(condition, md_operators.InArray) \
+                    or condition.column.table is not self.table:
                 continue
 
-            # get the table joins for the foreign table
-            f, j = self._recursive_get_table_joins(relationship,
-                                                   relationship.foreign_table, seen=seen)
-            seen.append(relationship.foreign_table)
-            foreign_tables.extend(f), joins.extend(j)
+            if len(condition.value) > chunk_size \
+                    and (largest is None or len(condition.value) > len(largest.value)):
+                largest, index = condition, n
 
-        return foreign_tables, joins
+        if largest is None:
+            return [generate()]
 
-    def get_required_join_paths(self):
-        """
-        Gets the required join paths for this query.
-        """
-        # we can just pass None since it's the first in the chain
-        return self._recursive_get_table_joins(None, self.table, seen=None)
+        queries = []
+        conditions = self.conditions
+        # a value in several chunks would return its rows several times
+        values = list(collections.OrderedDict.fromkeys(largest.value))
+        try:
+            for offset in range(0, len(values), chunk_size):
+                chunk = md_operators.In(largest.column, values[offset:offset + chunk_size])
+                self.conditions = conditions[:index] + [chunk] + conditions[index + 1:]
+                queries.append(generate())
+        finally:
+            self.conditions = conditions
 
-    def generate_sql(self) -> typing.Tuple[str, dict]:
-        """
-        Generates the SQL for this query.
+        return queries
+
+    def generate_subquery_sql(self, emitter: typing.Callable[[], typing.Tuple[str, str]],
+                              *columns: 'md_column.Column') -> typing.Tuple[str, dict]:
         """
-        # calculate the column names
-        foreign_tables, joins = self.get_required_join_paths()
-        selected_columns = self.table.iter_columns()
-        column_names = []
+        Generates the SQL for this query, for use inside of another query.
 
-        for table in itertools.chain([self.table], foreign_tables):
-            for column in table.iter_columns():
-                a = column.alias_name(table=table, quoted=True)
-                column_names.append(r'{} AS {}'.format(column.quoted_fullname_with_table(table), a))
+        Unlike :meth:`.SelectQuery.generate_sql`, relationships are not joined.
+
+        .. versionadded:: 0.2.0
+
+        :param emitter: The emitter of the outer query, so that params don't clash.
+        :param columns: The :class:`.Column` objects to select. If none are passed, ``1`` is
+            selected.
+        """
+        if columns:
+            selected = ", ".join(col.quoted_fullname for col in columns)
+        else:
+            selected = "1"
 
-        # BEGIN THE GENERATION
         fmt = io.StringIO()
-        fmt.write("SELECT {} FROM {} ".format(", ".join(column_names), self.table.__quoted_name__))
-        # cleanup after ourselves for a bit
-        del selected_columns
+        fmt.write("SELECT {} FROM {}".format(selected, self.table.__quoted_name__))
 
-        # format conditions
         params = {}
         c_sql = []
         for condition in self.conditions:
-            response = condition.generate_sql(self.session.bind.emit_param)
+            response = condition.generate_sql(emitter, dialect=self.session.bind.dialect)
             params.update(response.parameters)
             c_sql.append(response.sql)
 
-        # append joins
-        fmt.write(" ".join(joins))
-
-        # append the fmt with the conditions
-        # these are assumed to be And if there are multiple!
         if c_sql:
             fmt.write(" WHERE {}".format(" AND ".join(c_sql)))
 
         if self.orderer is not None:
-            res = self.orderer.generate_sql(self.session.bind.emit_param)
-            fmt.write(" ORDER BY {}".format(res.sql))
+            # columns aren't selected by their alias names here
+            names = ", ".join(col.quoted_fullname for col in self.orderer.cols)
+            fmt.write(" ORDER BY {} {}".format(names, self.orderer.sort_order))
+
         if self.row_limit is not None:
             fmt.write(" LIMIT {}".format(self.row_limit))
 
@@ -297,7 +565,36 @@ class SelectQuery(BaseQuery):
 
         return fmt.getvalue(), params
 
+    def subquery(self, *columns: 'md_column.Column') -> 'md_operators.Subquery':
+        """
+        Creates a :class:`.Subquery` from this query, to use inside of another query.
+
+        .. code-block:: python3
+
+            rare = sess.select(Item).where(Item.rare == True).subquery(Item.owner_id)
+            users = await sess.select(User).where(User.id.in_(rare)).all()
+
+        .. versionadded:: 0.2.0
+
+        :param columns: The :class:`.Column` objects to select.
+        """
+        return md_operators.Subquery(self, *columns)
+
     # "fetch" methods
+    async def exists(self) -> bool:
+        """
+        Checks if any rows match this query, without fetching them.
+
+        .. code-block:: python3
+
+            has_items = await sess.select(Item).where(Item.owner_id == user.id).exists()
+
+        .. versionadded:: 0.2.0
+
+        :return: True if any rows match, False otherwise.
+        """
+        return await self.session.run_exists_query(self)
+
     async def first(self) -> 'md_table.Table':
         """
         Gets the first result that matches from this query.
@@ -321,6 +618,125 @@ class SelectQuery(BaseQuery):
     async def run(self):
         return await self.all()
 
+    def records(self, *, executor: 'concurrent.futures.Executor' = None,
+                transform: 'typing.Callable[[typing.List[str], typing.List[tuple]], list]' =
+                rows_to_records,
+                chunk_size: int = 1000, time_budget: float = 0.01) -> 'RecordGenerator':
+        """
+        Gets the rows that match this query as lightweight records, transformed in an executor.
+
+        This is for very large results, where creating :class:`.Table` rows would block the event
+        loop for too long. Relationships are not loaded.
+
+        .. code-block:: python3
+
+            with concurrent.futures.ProcessPoolExecutor() as pool:
+                async for record in sess.select(User).records(executor=pool):
+                    print(record["name"])
+
+        .. versionadded:: 0.2.0
+
+        See :class:`.RecordGenerator` for the parameters.
+        """
+        return RecordGenerator(self, executor=executor, transform=transform,
+                               chunk_size=chunk_size, time_budget=time_budget)
+
+    async def to_columns(self, *columns: 'md_column.Column', chunk_size: int = 1000,
+                         numpy: bool = False) -> typing.Dict[str, typing.Any]:
+        """
+        Fetches the rows that match this query in columnar form, without creating a
+        :class:`.Table` row for each result.
+
+        .. code-block:: python3
+
+            columns = await sess.select(User).where(User.xp > 0).to_columns(User.id, User.xp)
+            total = sum(columns["xp"])
+
+        Integer, real and boolean columns are returned as :class:`array.array` objects, and other
+        columns as lists. See :class:`.ColumnBuffer`.
+
+        .. versionadded:: 0.2.0
+
+        :param columns: The :class:`.Column` objects to fetch. Defaults to every column of the
+            queried table.
+        :param chunk_size: The number of rows to fetch from the cursor at a time.
+        :param numpy: If NumPy arrays should be returned. This requires NumPy to be installed.
+        :return: A dict of column name to the array of values.
+        """
+        if not columns:
+            columns = tuple(self.table.iter_columns())
+
+        buffers = await self.session.run_columns_query(self, columns, chunk_size=chunk_size)
+        return {buffer.column.name: buffer.to_array(numpy=numpy) for buffer in buffers}
+
+    async def count(self) -> int:
+        """
+        Counts the rows that match this query, without fetching them.
+
+        .. code-block:: python3
+
+            admins = await sess.select(User).where(User.admin == True).count()
+
+        .. versionadded:: 0.2.0
+
+        :return: The number of matching rows.
+        """
+        return await self.aggregate(md_functions.count()).scalar()
+
+    def aggregate(self, *aggregates: 'md_functions.Aggregate',
+                  group_by: 'typing.Union[md_column.Column, typing.List[md_column.Column]]' = None,
+                  having: 'md_operators.BaseOperator' = None) -> 'AggregateQuery':
+        """
+        Creates an :class:`.AggregateQuery` over the rows that match this query.
+
+        .. code-block:: python3
+
+            from asyncqlio.orm import functions as func
+
+            query = sess.select(User).aggregate(func.sum(User.xp), group_by=User.guild_id)
+            for row in await query:
+                print(row["guild_id"], row["sum_xp"])
+
+        .. versionadded:: 0.2.0
+
+        :param aggregates: The :class:`.Aggregate` functions to select.
+        :param group_by: The :class:`.Column` or columns to group the rows by.
+        :param having: A condition on the aggregates, to filter the groups by.
+        :return: A new :class:`.AggregateQuery`. If this query has a limit or offset, the
+            aggregates are over the rows it returns.
+        """
+        query = AggregateQuery(self.session, self.table, *aggregates)
+        if self.row_limit is not None or self.row_offset is not None:
+            # the ORDER BY, LIMIT and OFFSET decide which rows are aggregated
+            query.source = self
+        else:
+            # the order doesn't change the aggregates
+            query.where(*self.conditions)
+
+        if group_by is not None:
+            if isinstance(group_by, md_column.Column):
+                group_by = (group_by,)
+            query.group_by(*group_by)
+
+        if having is not None:
+            query.having(having)
+
+        return query
+
+    async def explain(self, analyze: bool = False) -> 'md_plan.QueryPlan':
+        """
+        Explains how the database will run this query.
+
+        .. code-block:: python3
+
+            plan = await sess.select(User).where(User.id == 1).explain()
+            assert not plan.seq_scan
+
+        :param analyze: If EXPLAIN ANALYZE should be used, to get real timings.
+        :return: The :class:`.QueryPlan` for this query.
+        """
+        return await self.session.run_explain_query(self, analyze=analyze)
+
     # ORM methods
     def map_columns(self, results: typing.Mapping[str, typing.Any]) -> 'md_table.Table':
         """
@@ -330,8 +746,7 @@ class SelectQuery(BaseQuery):
         :return: A new :class:`.Table` instance that represents the row returned.
         """
         # try and map columns to our Table
-        mapping = {column.alias_name(self.table, quoted=False): column
-                   for column in self.table.iter_columns()}
+        mapping = self.table.metadata.get_join_plan(self.table).columns
         row_expando = {}
         relation_data = {}
 
@@ -476,6 +891,209 @@ class SelectQuery(BaseQuery):
         return self
 
 
+class AggregateQuery(BaseQuery):
+    """
+    Represents an aggregate SELECT query, such as ``SELECT COUNT(*) ... GROUP BY ...``.
+
+    The results are returned as plain :class:`.DictRow` objects, rather than as :class:`.Table`
+    rows. This is normally created with :meth:`.SelectQuery.aggregate` or
+    :meth:`.SelectQuery.count`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, session: 'md_session.Session', table: 'md_table.TableMeta',
+                 *aggregates: 'md_functions.Aggregate'):
+        super().__init__(session)
+
+        #: The table being queried.
+        self.table = table
+
+        #: The list of aggregates to select.
+        self.aggregates = list(aggregates)
+
+        #: A list of conditions to fulfil.
+        self.conditions = []
+
+        #: The list of columns to group by.
+        self.group_columns = []
+
+        #: A list of conditions on the aggregates.
+        self.having_conditions = []
+
+        #: The aggregate or column to order by.
+        self.orderer = None
+
+        #: The :class:`.SelectQuery` whose rows are aggregated, if it has a limit or offset.
+        #: Its rows are selected in a subquery, named after the table.
+        self.source = None  # type: SelectQuery
+
+    def __await__(self):
+        return self.run().__await__()
+
+    def generate_sql(self) -> typing.Tuple[str, dict]:
+        """
+        Generates the SQL for this query.
+        """
+        return self.generate_subquery_sql(self.session.bind.emit_param)
+
+    def generate_subquery_sql(self, emitter: typing.Callable[[], typing.Tuple[str, str]],
+                              *columns: 'md_column.Column') -> typing.Tuple[str, dict]:
+        """
+        Generates the SQL for this query, for use inside of another query.
+
+        :param emitter: The emitter of the outer query, so that params don't clash.
+        """
+        if columns:
+            raise TypeError("Aggregate subqueries select their aggregates")
+
+        selected = ["{} AS {}".format(col.quoted_fullname, col.quoted_name)
+                    for col in self.group_columns]
+        selected += ["{} AS {}".format(agg.quoted_fullname, agg.alias_name(quoted=True))
+                     for agg in self.aggregates]
+
+        params = {}
+        if self.source is not None:
+            # the columns of the table still refer to the subquery, as it has the same name
+            sql, params = self.source.generate_subquery_sql(emitter, *self.table.iter_columns())
+            source = "({}) AS {}".format(sql, self.table.__quoted_name__)
+        else:
+            source = self.table.__quoted_name__
+
+        fmt = io.StringIO()
+        fmt.write("SELECT {} FROM {}".format(", ".join(selected), source))
+
+        c_sql = []
+        for condition in self.conditions:
+            response = condition.generate_sql(emitter, dialect=self.session.bind.dialect)
+            params.update(response.parameters)
+            c_sql.append(response.sql)
+
+        if c_sql:
+            fmt.write(" WHERE {}".format(" AND ".join(c_sql)))
+
+        if self.group_columns:
+            fmt.write(" GROUP BY {}".format(", ".join(col.quoted_fullname
+                                                      for col in self.group_columns)))
+
+        h_sql = []
+        for condition in self.having_conditions:
+            response = condition.generate_sql(emitter, dialect=self.session.bind.dialect)
+            params.update(response.parameters)
+            h_sql.append(response.sql)
+
+        if h_sql:
+            fmt.write(" HAVING {}".format(" AND ".join(h_sql)))
+
+        if self.orderer is not None:
+            # the group columns aren't selected by their alias names here either
+            names = ", ".join(col.quoted_fullname for col in self.orderer.cols)
+            fmt.write(" ORDER BY {} {}".format(names, self.orderer.sort_order))
+
+        return fmt.getvalue(), params
+
+    async def all(self) -> 'typing.List[DictRow]':
+        """
+        Gets all the result rows of this query.
+
+        :return: A list of :class:`.DictRow`, one per group.
+        """
+        return await self.session.run_aggregate_query(self)
+
+    async def first(self) -> 'DictRow':
+        """
+        Gets the first result row of this query.
+
+        :return: A :class:`.DictRow`, or None if there are no groups.
+        """
+        rows = await self.all()
+        if rows:
+            return rows[0]
+
+    async def scalar(self) -> typing.Any:
+        """
+        Gets the value of the first aggregate in the first result row.
+
+        .. code-block:: python3
+
+            total_xp = await sess.select(User).aggregate(func.sum(User.xp)).scalar()
+
+        :return: The value, or None if there are no rows.
+        """
+        row = await self.first()
+        if row is not None:
+            return row[self.aggregates[0].name]
+
+    async def run(self):
+        return await self.all()
+
+    def subquery(self) -> 'md_operators.Subquery':
+        """
+        Creates a :class:`.Subquery` from this query, to use inside of another query.
+
+        .. code-block:: python3
+
+            average = sess.select(User).aggregate(func.avg(User.xp)).subquery()
+            users = await sess.select(User).where(User.xp > average).all()
+        """
+        return md_operators.Subquery(self)
+
+    async def explain(self, analyze: bool = False) -> 'md_plan.QueryPlan':
+        """
+        Explains how the database will run this query.
+
+        :param analyze: If EXPLAIN ANALYZE should be used, to get real timings.
+        :return: The :class:`.QueryPlan` for this query.
+        """
+        return await self.session.run_explain_query(self, analyze=analyze)
+
+    # Builder methods
+    def where(self, *conditions: 'md_operators.BaseOperator') -> 'AggregateQuery':
+        """
+        Adds a WHERE clause to the query, filtering the rows before they are aggregated.
+
+        :param conditions: The conditions to use for this WHERE clause.
+        :return: This query.
+        """
+        self.conditions.extend(conditions)
+        return self
+
+    def group_by(self, *columns: 'md_column.Column') -> 'AggregateQuery':
+        """
+        Adds columns to the GROUP BY clause of this query. These columns are selected too.
+
+        :param columns: The :class:`.Column` objects to group by.
+        :return: This query.
+        """
+        self.group_columns.extend(columns)
+        return self
+
+    def having(self, *conditions: 'md_operators.BaseOperator') -> 'AggregateQuery':
+        """
+        Adds a HAVING clause to the query, filtering the groups after they are aggregated.
+
+        .. code-block:: python3
+
+            query.group_by(User.guild_id).having(func.count() > 10)
+
+        :param conditions: The conditions to use for this HAVING clause.
+        :return: This query.
+        """
+        self.having_conditions.extend(conditions)
+        return self
+
+    def order_by(self, sorter: 'md_operators.Sorter') -> 'AggregateQuery':
+        """
+        Sets the order by clause for this query.
+
+        :param sorter: A :class:`.Sorter`, from e.g. :meth:`.Aggregate.desc` or
+            :meth:`.Column.asc`.
+        :return: This query.
+        """
+        self.orderer = sorter
+        return self
+
+
 class InsertQuery(BaseQuery):
     """
     Represents an INSERT query.
@@ -583,6 +1201,14 @@ class UpsertQuery(InsertQuery):
         self._update_cols.extend(cols)
         return self
 
+    async def run(self) -> 'typing.List[md_table.Table]':
+        """
+        Runs this query.
+
+        :return: A list of upserted :class:`.md_table.Table`.
+        """
+        return await self.session.run_upsert_query(self)
+
     def nothing(self) -> 'UpsertQuery':
         """
         Specify that this query should do nothing if there's a conflict.
@@ -618,6 +1244,89 @@ class UpsertQuery(InsertQuery):
 
         return queries
 
+    def generate_batches(self) -> 'typing.Iterator[typing.Tuple[list, str, dict]]':
+        """
+        Generates multi-row SQL statements for this upsert query.
+
+        Rows are upserted in as few statements as the dialect's parameter limit allows. Every column
+        is written, so consecutive rows of the same table share a statement. If the statement names
+        its conflict columns, a new statement is started when a row conflicts with another row in
+        the same statement, as the database can't update a row twice in one statement; otherwise,
+        the database applies the rows in order.
+
+        This requires the dialect to support :attr:`.BaseDialect.has_batch_upsert`.
+
+        .. versionadded:: 0.2.0
+
+        :returns: An iterator of three-item tuples:
+            - The list of rows the statement upserts
+            - The SQL query to use
+            - The params to use with the query
+        """
+        dialect = self.session.bind.dialect
+        emit_param = self.session.bind.emit_param
+
+        for table, rows in itertools.groupby(self.rows_to_insert, key=lambda row: row.table):
+            columns = tuple(table.iter_columns())
+            col_names = ", ".join(col.quoted_name for col in columns)
+
+            fmt, needed_params = dialect.get_batch_upsert_sql(
+                table.__quoted_name__,
+                on_conflict_update=self._on_conflict_update,
+                conflict_target=bool(self._conflict_cols),
+            )
+            fmt_params = {}
+            for fmt_param in needed_params:
+                if fmt_param == "update":
+                    fmt_params["update"] = ", ".join(
+                        "{}={}".format(col.quoted_name,
+                                       dialect.get_upsert_excluded_sql(col.quoted_name))
+                        for col in columns if col in self._update_cols
+                    )
+
+                elif fmt_param == "returning":
+                    fmt_params["returning"] = col_names
+
+                elif fmt_param == "col":
+                    fmt_params["col"] = ", ".join(col.quoted_name for col in self._conflict_cols)
+
+                elif fmt_param != "insert":
+                    raise RuntimeError("Driver passed an invalid format specification.")
+
+            # e.g. MySQL's ON DUPLICATE KEY UPDATE has no conflict target
+            split_conflicts = "col" in needed_params
+            batch_size = max(dialect.max_params // len(columns), 1)
+            batch = []
+            keys = set()
+
+            def build():
+                counter = itertools.count()
+                params = {}
+                values = []
+                for row in batch:
+                    emitted = []
+                    for column in columns:
+                        param = "param_{}".format(next(counter))
+                        params[param] = row.get_column_value(column)
+                        emitted.append(emit_param(param))
+                    values.append("({})".format(", ".join(emitted)))
+
+                insert = "({}) VALUES {}".format(col_names, ", ".join(values))
+                return batch, fmt.format(insert=insert, **fmt_params), params
+
+            for row in rows:
+                key = tuple(row.get_column_value(col) for col in self._conflict_cols)
+                if len(batch) >= batch_size or (split_conflicts and key in keys):
+                    yield build()
+                    batch = []
+                    keys = set()
+
+                batch.append(row)
+                keys.add(key)
+
+            if batch:
+                yield build()
+
 
 class BulkQuery(BaseQuery, metaclass=abc.ABCMeta):
     """
@@ -656,6 +1365,19 @@ class BulkQuery(BaseQuery, metaclass=abc.ABCMeta):
         self.conditions.extend(conditions)
         return self
 
+    async def explain(self, analyze: bool = False) -> 'md_plan.QueryPlan':
+        """
+        Explains how the database will run this query, without running it.
+
+        .. warning::
+
+            With ``analyze``, the query is actually run.
+
+        :param analyze: If EXPLAIN ANALYZE should be used, to get real timings.
+        :return: The :class:`.QueryPlan` for this query.
+        """
+        return await self.session.run_explain_query(self, analyze=analyze)
+
     # Manual-style methods
     def set_table(self, table: 'typing.Type[md_table.Table]'):
         """
@@ -735,7 +1457,8 @@ class BulkUpdateQuery(BulkQuery):
         c_sql = []
         for condition in self.conditions:
             # pass the condition offset
-            res = condition.generate_sql(self.session.bind.emit_param)
+            res = condition.generate_sql(self.session.bind.emit_param,
+                                         dialect=self.session.bind.dialect)
             params.update(res.parameters)
             c_sql.append(res.sql)
 
@@ -778,7 +1501,8 @@ class BulkDeleteQuery(BulkQuery):
         c_sql = []
         for condition in self.conditions:
             # pass the condition offset
-            res = condition.generate_sql(self.session.bind.emit_param)
+            res = condition.generate_sql(self.session.bind.emit_param,
+                                         dialect=self.session.bind.dialect)
             params.update(res.parameters)
             c_sql.append(res.sql)
 
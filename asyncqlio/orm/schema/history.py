@@ -6,7 +6,7 @@ Classes for the history API.
 import abc
 from typing import Any, Callable, Tuple
 
-from asyncqlio.orm.operators import OperatorResponse
+from asyncqlio.orm import operators as md_operators
 from asyncqlio.orm.schema import column as md_column
 
 
@@ -69,7 +69,8 @@ class ColumnChange(abc.ABC):
         """
 
     @abc.abstractmethod
-    def get_update_sql(self, emitter: Callable[[], Tuple[str, str]]) -> 'OperatorResponse':
+    def get_update_sql(self, emitter: Callable[[], Tuple[str, str]]) \
+            -> 'md_operators.OperatorResponse':
         """
         :return: The UPDATE SQL (the part after the ``SET``) for this change.
         """
@@ -101,7 +102,8 @@ class ValueChange(ColumnChange):
         self._previous = previous._previous
         self._new = new
 
-    def get_update_sql(self, emitter: Callable[[], Tuple[str, str]]) -> 'OperatorResponse':
+    def get_update_sql(self, emitter: Callable[[], Tuple[str, str]]) \
+            -> 'md_operators.OperatorResponse':
         emitted, name = emitter()
         sql = "{} = {}".format(self.column.quoted_name, emitted)
-        return OperatorResponse(sql, {name: self._new})
+        return md_operators.OperatorResponse(sql, {name: self._new})
@@ -43,6 +43,9 @@ class TableMetadata(object):
         #: The DB object bound to this metadata.
         self._bind = None  # type: md_db.DatabaseInterface
 
+        #: A cache of table -> :class:`.JoinPlan` for the tables in this metadata.
+        self._join_plans = {}
+
     @property
     def bind(self) -> 'md_db.DatabaseInterface':
         """
@@ -100,6 +103,49 @@ class TableMetadata(object):
         self.resolve_backrefs()
         self.generate_primary_key_indexes()
         self.generate_unique_column_indexes()
+        self.generate_autoincrement_columns()
+        self.generate_join_plans()
+
+    def generate_autoincrement_columns(self):
+        """
+        Calculates the autoincrement column of each table, which depends on the bound dialect.
+
+        .. versionadded:: 0.2.0
+        """
+        for table in self.tables.values():
+            if isinstance(table, AliasedTable):
+                continue
+
+            table._autoincrement_column = table._calculate_autoincrement_column()
+
+    def generate_join_plans(self):
+        """
+        Generates the :class:`.JoinPlan` for each table.
+
+        .. versionadded:: 0.2.0
+        """
+        self._join_plans = {}
+        for table in self.tables.values():
+            if isinstance(table, AliasedTable):
+                continue
+
+            self._join_plans[table] = JoinPlan(table)
+
+    def get_join_plan(self, table: 'TableMeta') -> 'JoinPlan':
+        """
+        Gets the :class:`.JoinPlan` for a table.
+
+        .. versionadded:: 0.2.0
+
+        :param table: The table to get the plan for.
+        :return: The :class:`.JoinPlan` used to load the table.
+        """
+        try:
+            return self._join_plans[table]
+        except KeyError:
+            # i.e. an aliased table, or the tables haven't been setup
+            plan = self._join_plans[table] = JoinPlan(table)
+            return plan
 
     def resolve_aliases(self):
         """
@@ -251,6 +297,106 @@ class TableMetadata(object):
                 )
 
 
+class JoinPlan(object):
+    """
+    The precomputed plan for selecting a table and its joined relationships, and for folding the
+    joined rows back into :class:`.Table` instances.
+
+    These are created for each table by :meth:`.TableMetadata.setup_tables`, and retrieved with
+    :meth:`.TableMetadata.get_join_plan`.
+
+    .. versionadded:: 0.2.0
+    """
+
+    def __init__(self, table: 'TableMeta'):
+        """
+        :param table: The table being selected.
+        """
+        #: The table being selected.
+        self.table = table
+
+        foreign_tables, joins = self._get_table_joins(None, table, seen={table})
+
+        #: The (aliased) foreign tables that are joined, in join order.
+        self.foreign_tables = tuple(foreign_tables)
+
+        #: The JOIN clauses for the foreign tables.
+        self.joins = tuple(joins)
+
+        #: The ``<column> AS <alias>`` expressions for every selected column.
+        self.selected_columns = tuple(
+            "{} AS {}".format(column.quoted_fullname_with_table(tbl),
+                              column.alias_name(table=tbl, quoted=True))
+            for tbl in itertools.chain([table], self.foreign_tables)
+            for column in tbl.iter_columns()
+        )
+
+        #: Every relationship reachable from the table, in the order joined rows are folded.
+        self.relationships = tuple(self._get_relationships(table, seen=set()))
+
+        #: A mapping of alias name -> :class:`.Column` for the columns of the table itself.
+        self.columns = {column.alias_name(table): column for column in table.iter_columns()}
+
+        #: A mapping of alias name -> (:class:`.Relationship`, :class:`.Column`), used to split
+        #: the joined columns of a record into a bucket per relationship.
+        self.relationship_columns = {}
+        for relationship in self.relationships:
+            foreign_table = relationship.foreign_table
+            for column in foreign_table.iter_columns():
+                self.relationship_columns.setdefault(column.alias_name(foreign_table),
+                                                     (relationship, column))
+
+    def _get_table_joins(self, parent: 'md_relationship.Relationship', table: 'TableMeta',
+                         seen: set):
+        """
+        Recursively gets the joined tables and join clauses for a table.
+
+        :param parent: The parent relationship this table is being loaded from, or None if it was \
+            loaded directly.
+        :param table: The table to get joins for.
+        :param seen: A set of tables that have already been joined and should not be re-joined.
+        """
+        foreign_tables = []
+        joins = []
+        joined = []
+        for relationship in table.iter_relationships():
+            # ignore non-join relationships
+            if relationship.load_type != "joined":
+                continue
+
+            foreign_table = relationship.foreign_table
+            if foreign_table in seen:
+                continue
+
+            seen.add(foreign_table)
+            foreign_tables.append(foreign_table)
+            joins.append(relationship._get_join_query(parent))
+            joined.append(relationship)
+
+        # each joined table is followed by the tables joined from it
+        for relationship in joined:
+            f, j = self._get_table_joins(relationship, relationship.foreign_table, seen)
+            foreign_tables.extend(f)
+            joins.extend(j)
+
+        return foreign_tables, joins
+
+    def _get_relationships(self, table: 'TableMeta', seen: set):
+        """
+        Recursively yields the relationships reachable from a table, depth first.
+        """
+        for relationship in table.iter_relationships():
+            if relationship in seen:
+                continue
+
+            seen.add(relationship)
+            yield relationship
+            yield from self._get_relationships(relationship.foreign_table, seen)
+
+    def __repr__(self):
+        return "<JoinPlan table={} foreign_tables={}>".format(self.table, self.foreign_tables)
+
+
 class TableMeta(type):
     """
     The metaclass for a table object. This represents the "type" of a table class.
@@ -295,6 +441,8 @@ class TableMeta(type):
         except KeyError:
             class_body["__tablename__"] = name.lower()
 
+        class_body["__shard_key__"] = kwargs.get("shard_key")
+
         return type.__new__(mcs, name, bases, class_body)
 
     def __init__(self, tblname: str, tblbases: tuple, class_body: dict, register: bool = True,
@@ -304,6 +452,8 @@ class TableMeta(type):
 
         :param register: Should this table be registered in the TableMetadata?
         :param table_name: The name for this table.
+        :param shard_key: The name of the column used to route rows of this table to a shard, when \
+            used with a :class:`.ShardedDatabaseInterface`.
         """
         # create the new type object
         super().__init__(tblname, tblbases, class_body)
@@ -346,6 +496,14 @@ class TableMeta(type):
         #: This should be a :class:`.PrimaryKey`.
         self._primary_key = self._calculate_primary_key()
 
+        #: The shard key column for this table, if any.
+        self._shard_key = None  # type: md_column.Column
+        if self.__shard_key__ is not None:
+            self._shard_key = self.get_column(self.__shard_key__)
+            if self._shard_key is None:
+                raise SchemaError("No such column '{}' exists for the shard key of table '{}'"
+                                  .format(self.__shard_key__, tblname))
+
         logger.debug("Registered new table {}".format(tblname))
         self.metadata.register_table(self)
 
@@ -393,6 +551,32 @@ class TableMeta(type):
 
         return None
 
+    def _calculate_autoincrement_column(self) -> 'typing.Union[md_column.Column, None]':
+        """
+        Calculates the autoincrement column for this table.
+        """
+        columns = [column for column in self.iter_columns() if column.autoincrement]
+        if len(columns) == 1:
+            return columns[0]
+
+        return None
+
+    @property
+    def autoincrement_column(self) -> 'typing.Union[md_column.Column, None]':
+        """
+        The column that the database automatically increments on insert, or None if this table
+        doesn't have exactly one.
+
+        This is calculated when the tables are setup, since it depends on the dialect.
+
+        .. versionadded:: 0.2.0
+        """
+        try:
+            return self._autoincrement_column
+        except AttributeError:
+            # the tables haven't been setup yet
+            return self._calculate_autoincrement_column()
+
     @property
     def primary_key(self) -> 'PrimaryKey':
         """
@@ -411,6 +595,22 @@ class TableMeta(type):
         key.table = self
         self._primary_key = key
 
+    @property
+    def shard_key(self) -> 'typing.Union[md_column.Column, None]':
+        """
+        :return: The :class:`.Column` used to route rows of this table to a shard, or None if this \
+            table is not sharded.
+
+        .. code-block:: python3
+
+            class Member(Table, shard_key="guild_id"):
+                guild_id = Column(BigInt, primary_key=True)
+                user_id = Column(BigInt, primary_key=True)
+
+        .. versionadded:: 0.2.0
+        """
+        return self._shard_key
+
     def _internal_from_row(cls, values: dict, *,
                            existed: bool = False):
         obb = object.__new__(cls)  # type: Table
@@ -449,6 +649,10 @@ class Table(metaclass=TableMeta, register=False):
         #: A mapping of relationship -> rows for this row.
         self._relationship_mapping = collections.defaultdict(lambda: [])
 
+        #: A mapping of relationship -> (rows indexed, primary keys of the rows), used to skip
+        #: duplicate rows when loading joined relationships.
+        self._relationship_keys = {}
+
         #: A mapping of Column -> Current value for this row.
         self._values = {}
 
@@ -617,15 +821,20 @@ class Table(metaclass=TableMeta, register=False):
         try:
             return cls._columns[column_name]
         except KeyError:
+            pass
+
+        # misses are common (e.g. every non-column attribute set on a row), so the names and
+        # alias names are indexed instead of being scanned and formatted on every lookup
+        count, index = cls.__dict__.get("_column_index", (None, None))
+        if count != len(cls._columns):
+            index = {}
             for column in cls._columns.values():
-                if column.name == column_name:
-                    return column
+                index.setdefault(column.name, column)
+                index.setdefault(column.alias_name(table=cls), column)
 
-                alias = column.alias_name(table=cls)
-                if alias == column_name:
-                    return column
+            cls._column_index = (len(cls._columns), index)
 
-        return None
+        return index.get(column_name)
 
     @classmethod
     def get_relationship(cls, relationship_name) \
@@ -1063,53 +1272,6 @@ class Table(metaclass=TableMeta, register=False):
         rel._update_sub_relationships(self._relationship_mapping)
         return rel
 
-    def _load_columns_using_table(self, table: 'TableMeta', record: dict, buckets: dict,
-                                  seen: list):
-        """
-        Recursively organizes columns in a record into table buckets by scanning the
-        relationships inside the table.
-
-        :param table: The :class:`.TableMeta` to use to load the table.
-        :param record: The dict-like record to read from.
-        :param buckets: The dict of buckets to store tables in.
-        :param seen: A list of relationships that have already been seen. This prevents infinite \
-            loops.
-
-            Outside of internal code, this should be passed in as an empty list.
-
-        """
-        for relationship in table.iter_relationships():
-            if relationship in seen:
-                continue
-
-            seen.append(relationship)
-
-            self._load_columns_using_relationship(relationship, record, buckets)
-            self._load_columns_using_table(relationship.foreign_table, record, buckets, seen)
-
-    def _load_columns_using_relationship(self, relationship, record: dict, buckets: dict):
-        """
-        Loads columns from a record dict using a relationship object.
-        """
-        if relationship not in buckets:
-            buckets[relationship] = {}
-
-        # iterate over every column in the record
-        # checking to see if the column adds up
-        for cname, value in record.copy().items():
-            # this will load using cname too, thankfully
-            # use the foreign column to load the columns
-            # since this is the one we're joining on
-            column = relationship.foreign_table.get_column(cname)
-            if column is not None:
-                # use the actual name
-                # if we use the cname, it won't expand into the row correctly
-                actual_name = column.name
-                buckets[relationship][actual_name] = value
-                # get rid of the record
-                # so it doesn't come around in the next relationship check
-                record.pop(cname)
-
     def _update_relationships(self, record: dict):
         """
         Updates relationship data for this row, storing any extra rows that are needed.
@@ -1122,29 +1284,46 @@ class Table(metaclass=TableMeta, register=False):
         if self.table not in self._relationship_mapping:
             self._relationship_mapping[self.table] = [self]
 
+        plan = self.table.metadata.get_join_plan(self.table)
+        relationship_columns = plan.relationship_columns
+
+        # split the record into a bucket of column name -> value for each relationship
         buckets = {}
-        seen = []
-        # this will load columns recursively
-        self._load_columns_using_table(self.table, record, buckets, seen)
+        for cname, value in record.items():
+            try:
+                relationship, column = relationship_columns[cname]
+            except KeyError:
+                continue
+
+            try:
+                buckets[relationship][column.name] = value
+            except KeyError:
+                buckets[relationship] = {column.name: value}
 
         # store the new relationship data
-        for relationship, subdict in buckets.items():
+        for relationship in plan.relationships:
+            subdict = buckets.get(relationship)
             # Prevent null values from showing up
-            if all(i is None for i in subdict.values()):
+            if subdict is None or all(i is None for i in subdict.values()):
                 continue
 
             row = relationship.foreign_table._internal_from_row(subdict, existed=True)
             # ensure the row doesn't already exist with the PK
-            try:
-                next(filter(lambda r: r.primary_key == row.primary_key,
-                            self._relationship_mapping[relationship]))
-            except StopIteration:
-                # only append if the row didn't exist earlier
-                # i.e that the filter raised StopIteration
-                self._relationship_mapping[relationship].append(row)
+            rows = self._relationship_mapping[relationship]
+            indexed, keys = self._relationship_keys.get(relationship, (0, set()))
+            # rows can be added to the mapping elsewhere, so index any we haven't seen yet
+            for existing in rows[indexed:]:
+                keys.add(existing.primary_key)
+
+            pk = row.primary_key
+            if pk not in keys:
+                keys.add(pk)
+                rows.append(row)
             else:
                 row._session = self._session
 
+            self._relationship_keys[relationship] = (len(rows), keys)
+
     def to_dict(self, *, include_attrs: bool = False) -> dict:
         """
         Converts this row to a dict, indexed by Column.
@@ -75,6 +75,10 @@ class ColumnType(abc.ABC):
     """
     __slots__ = ("column",)
 
+    #: The :mod:`array` typecode used to store values of this type in columnar results.
+    #: If this is None, the values are stored as Python objects.
+    array_typecode = None
+
     def __init__(self):
         #: The column this type object is associated with.
         self.column = None  # type: md_column.Column
@@ -154,15 +158,22 @@ class ColumnType(abc.ABC):
         return cls()
 
     # Some methods for base types
-    def in_(self, *args) -> 'md_operators.In':
+    def in_(self, *args) -> 'typing.Union[md_operators.In, md_operators.InSubquery]':
         """
         Returns an IN operator, checking if a value in this column is in a tuple of items.
 
+        .. versionchanged:: 0.2.0
+
+            A single :class:`.Subquery` can be passed, to check the results of a query.
+
         :param args: The items to check.
         """
         if len(args) <= 0:
             raise ValueError("Must provide at least one argument to in_")
 
+        if len(args) == 1 and isinstance(args[0], md_operators.Subquery):
+            return md_operators.InSubquery(self.column, args[0])
+
         return md_operators.In(self.column, args)
 
 
@@ -245,6 +256,7 @@ class Boolean(ColumnType):
     """
     Represents a BOOL type.
     """
+    array_typecode = "B"
 
     def sql(self):
         return "BOOLEAN"
@@ -260,6 +272,7 @@ class Integer(ColumnType):
     .. warning::
         This represents a 32-bit integer (2**31-1 to -2**32)
     """
+    array_typecode = "q"
 
     def sql(self):
         return "INTEGER"
@@ -334,6 +347,7 @@ class Real(ColumnType):
     """
     Represents a REAL type.
     """
+    array_typecode = "d"
 
     def sql(self):
         return "REAL"
@@ -2,6 +2,7 @@
 Classes for session objects.
 """
 
+import copy
 import enum
 import functools
 import io
@@ -10,10 +11,11 @@ import typing
 import warnings
 
 from asyncqlio import db as md_db
-from asyncqlio.backends.base import BaseResultSet, BaseTransaction
+from asyncqlio.backends.base import BaseResultSet, BaseTransaction, DictRow
 from asyncqlio.exc import DatabaseException
-from asyncqlio.orm import inspection as md_inspection, query as md_query
-from asyncqlio.orm.schema import table as md_table
+from asyncqlio.orm import columnar as md_columnar, inspection as md_inspection, \
+    plan as md_plan, query as md_query
+from asyncqlio.orm.schema import column as md_column, table as md_table
 from asyncqlio.sentinels import NO_DEFAULT, NO_VALUE
 
 logger = logging.getLogger(__name__)
@@ -308,6 +310,57 @@ class Session(SessionBase):
         await self.run_delete_query(q)
         return row
 
+    @enforce_open
+    async def gather(self, *queries: 'md_query.BaseQuery') -> typing.List[typing.List[typing.Any]]:
+        """
+        Runs several independent queries together, and fetches all of their results.
+
+        .. code-block:: python3
+
+            users, guilds, counts = await sess.gather(
+                sess.select(User).where(User.id == 1),
+                sess.select(Guild).where(Guild.owner_id == 1),
+                sess.select(Message).aggregate(func.count(), group_by=Message.channel_id)
+            )
+
+        The statements are sent with :meth:`.BaseTransaction.fetch_batch`, so that drivers which
+        support it can avoid a round trip per query. On MySQL they are sent as one script if
+        nothing has been run in the session yet, and on SQLite they are run in one job on the
+        connection's thread. On PostgreSQL, they are run one after another, as asyncpg can't
+        pipeline them.
+
+        .. versionadded:: 0.2.0
+
+        :param queries: The :class:`.SelectQuery` and :class:`.AggregateQuery` objects to run.
+        :return: A list of the results of each query, in the same order. The results of a
+            :class:`.SelectQuery` are a list of :class:`.Table` rows, and the results of an
+            :class:`.AggregateQuery` are a list of :class:`.DictRow`.
+        """
+        statements = []
+        counts = []
+        for query in queries:
+            if isinstance(query, md_query.SelectQuery):
+                sql = query.generate_chunked_sql()
+            elif isinstance(query, md_query.AggregateQuery):
+                sql = [query.generate_sql()]
+            else:
+                raise TypeError("Cannot gather query {}".format(query))
+
+            statements.extend(sql)
+            counts.append(len(sql))
+
+        fetched = iter(await self.transaction.fetch_batch(statements))
+        results = []
+        for query, count in zip(queries, counts):
+            rows = [row for _ in range(count) for row in next(fetched)]
+            if isinstance(query, md_query.SelectQuery):
+                gen = md_query.ResultGenerator(query, md_query.BufferedResultSet(rows))
+                results.append(await gen.flatten())
+            else:
+                results.append(rows)
+
+        return results
+
     async def run_select_query(self, query: 'md_query.SelectQuery'):
         """
         Executes a select query.
@@ -323,11 +376,91 @@ class Session(SessionBase):
         :return: A :class:`._ResultGenerator` for this query.
         """
         gen = md_query.ResultGenerator(query)
+        # this sets the cursor on the result generator
+        await gen._open()
+        return gen
+
+    async def run_columns_query(self, query: 'md_query.SelectQuery',
+                                columns: 'typing.Sequence[md_column.Column]', *,
+                                chunk_size: int = 1000) \
+            -> 'typing.List[md_columnar.ColumnBuffer]':
+        """
+        Executes a select query, fetching the results in columnar form.
+
+        .. versionadded:: 0.2.0
+
+        :param query: The :class:`.SelectQuery` to use.
+        :param columns: The :class:`.Column` objects to fetch.
+        :param chunk_size: The number of rows to fetch from the cursor at a time.
+        :return: A :class:`.ColumnBuffer` for each column.
+        """
+        buffers = [md_columnar.ColumnBuffer(column) for column in columns]
+        sql, params = query.generate_subquery_sql(self.bind.emit_param, *columns)
+        cursor = await self.cursor(sql, params)
+        async with cursor:
+            while True:
+                rows = await cursor.fetch_many(chunk_size)
+                if not rows:
+                    break
+
+                # transpose the rows into columns
+                for buffer, values in zip(buffers, zip(*(row.values() for row in rows))):
+                    buffer.extend(values)
+
+        return buffers
+
+    async def run_aggregate_query(self, query: 'md_query.AggregateQuery') \
+            -> 'typing.List[DictRow]':
+        """
+        Executes an aggregate query.
+
+        .. versionadded:: 0.2.0
+
+        :param query: The :class:`.AggregateQuery` to use.
+        :return: The list of result rows, which are not mapped to :class:`.Table` rows.
+        """
         sql, params = query.generate_sql()
         cursor = await self.cursor(sql, params)
-        # set the cursor on the result generator
-        gen._results = cursor
-        return gen
+        rows = await cursor.flatten(budget=self.bind.yield_budget)
+        await cursor.close()
+        return rows
+
+    async def run_exists_query(self, query: 'md_query.SelectQuery') -> bool:
+        """
+        Checks if any rows match a select query, with ``SELECT EXISTS(...)``.
+
+        .. versionadded:: 0.2.0
+
+        :param query: The :class:`.SelectQuery` to use.
+        :return: True if any rows match, False otherwise.
+        """
+        # only one row is needed; this keeps the LIMIT before any OFFSET
+        query = copy.copy(query)
+        query.row_limit = 1 if query.row_limit is None else min(query.row_limit, 1)
+        sql, params = query.generate_subquery_sql(self.bind.emit_param)
+
+        row = await self.fetch('SELECT EXISTS({}) AS "exists"'.format(sql), params)
+        return bool(row["exists"])
+
+    async def run_explain_query(self, query: 'md_query.BaseQuery', *,
+                                analyze: bool = False) -> 'md_plan.QueryPlan':
+        """
+        Explains how the database will run a query, with the dialect's EXPLAIN syntax.
+
+        .. warning::
+
+            With ``analyze``, the query is actually run; this includes bulk updates and deletes.
+
+        :param query: The :class:`.SelectQuery` or :class:`.BulkQuery` to explain.
+        :param analyze: If EXPLAIN ANALYZE should be used, to get real timings.
+        :return: The :class:`.QueryPlan` for the query.
+        """
+        sql, params = query.generate_sql()
+        sql = self.bind.dialect.get_explain_sql(sql, analyze=analyze)
+        cursor = await self.cursor(sql, params)
+        rows = await cursor.flatten(budget=self.bind.yield_budget)
+        await cursor.close()
+        return self.bind.dialect.transform_rows_to_plan(*rows, analyze=analyze)
 
     async def run_insert_query(self, query: 'md_query.InsertQuery'):
         """
@@ -362,17 +495,19 @@ class Session(SessionBase):
                     row.store_column_value(column, value, track_history=False)
                     await cur.close()
             else:
-                if sum(1 for x in row.table.iter_columns() if x.autoincrement) == 1:
-                    # we can load the last value easily
-                    lquery = "SELECT {};".format(self.bind.dialect.lastval_method)
-                    cursor = await self.cursor(lquery)
-                    async with cursor:
-                        lval_row = await cursor.fetch_row()
-                        # there should only be one value here
-                        value = list(lval_row.values())[0]
-                    column = next(
-                        filter(lambda x: x.autoincrement, row.table.iter_columns()), None
-                    )
+                column = row.table.autoincrement_column
+                if column is not None:
+                    # use the ID the driver reports, to avoid another round trip
+                    value = cur.last_row_id
+                    if value is None:
+                        # we can load the last value easily
+                        lquery = "SELECT {};".format(self.bind.dialect.lastval_method)
+                        cursor = await self.cursor(lquery)
+                        async with cursor:
+                            lval_row = await cursor.fetch_row()
+                            # there should only be one value here
+                            value = list(lval_row.values())[0]
+
                     row.store_column_value(column, value)
 
                 for column in row.table.iter_columns():
@@ -388,6 +523,61 @@ class Session(SessionBase):
 
         return results
 
+    async def run_upsert_query(self, query: 'md_query.UpsertQuery'):
+        """
+        Executes an upsert query.
+
+        If the dialect supports it, the rows are upserted in batches of multiple rows per
+        statement. Otherwise, this falls back to one statement per row.
+
+        .. versionadded:: 0.2.0
+
+        :param query: The :class:`.UpsertQuery` to use.
+        :return: The list of rows that were upserted.
+        """
+        if not self.bind.dialect.has_batch_upsert:
+            return await self.run_insert_query(query)
+
+        results = []
+
+        for rows, sql, params in query.generate_batches():
+            for row in rows:
+                if md_inspection._get_mangled(row, "deleted"):
+                    raise RuntimeError("Row '{}' is marked as deleted".format(row))
+
+            if self.bind.dialect.has_returns:
+                # returned rows aren't guaranteed to be in order, so match them up by the
+                # conflict columns, which are unique, or the primary key if there are none
+                key_cols = query._conflict_cols or rows[0].table.primary_key.columns
+                by_key = {tuple(row.get_column_value(col) for col in key_cols): row
+                          for row in rows}
+                cur = await self.cursor(sql, params)
+                async with cur:
+                    async for returned_row in cur:
+                        row = by_key.get(tuple(returned_row[col.name] for col in key_cols))
+                        if row is None:
+                            continue
+
+                        for colname, value in returned_row.items():
+                            column = row.table.get_column(colname)
+                            if column is None:
+                                continue
+                            row.store_column_value(column, value, track_history=False)
+            else:
+                await self.execute(sql, params)
+
+            for row in rows:
+                for column in row.table.iter_columns():
+                    if column.default is not NO_DEFAULT \
+                            and row.get_column_value(column, return_default=False) is NO_VALUE:
+                        row.store_column_value(column, column.default)
+
+                md_inspection._set_mangled(row, "deleted", False)
+                md_inspection._set_mangled(row, "existed", True)
+                results.append(row)
+
+        return results
+
     async def run_update_query(self, query: 'md_query.BaseQuery'):
         """
         Executes an update query.
@@ -0,0 +1,718 @@
+"""
+Horizontal sharding support. This spreads the rows of a table over several databases, using a
+column of the table as the shard key.
+
+.. versionadded:: 0.2.0
+"""
+import asyncio
+import collections.abc
+import copy
+import heapq
+import itertools
+import logging
+import typing
+import zlib
+
+from asyncqlio import db as md_db, hooks as md_hooks
+from asyncqlio.backends.base import DictRow
+from asyncqlio.exc import UnsupportedOperationException
+from asyncqlio.orm import columnar as md_columnar, operators as md_operators, \
+    query as md_query, session as md_session
+from asyncqlio.orm.schema import column as md_column, table as md_table
+
+logger = logging.getLogger(__name__)
+
+#: The aggregate functions whose results from each shard can be combined, and how to combine them.
+AGGREGATE_COMBINERS = {
+    "COUNT": sum,
+    "SUM": sum,
+    "MIN": min,
+    "MAX": max,
+}
+
+
+def hash_shard_key(key: typing.Any, shard_count: int) -> int:
+    """
+    The default shard function.
+
+    Integer keys are distributed by modulo; every other key is distributed by the CRC32 of its
+    string form, which is stable across processes (unlike :func:`hash`).
+
+    :param key: The value of the shard key column.
+    :param shard_count: The number of shards available.
+    :return: The index of the shard to use.
+    """
+    if isinstance(key, int):
+        return key % shard_count
+
+    return zlib.crc32(str(key).encode("utf-8")) % shard_count
+
+
+class ShardedDatabaseInterface(object):
+    """
+    A database interface that spreads tables over several databases (shards).
+
+    Each shard is a normal :class:`.DatabaseInterface`; rows are routed to a shard using the
+    value of the table's shard key column, which is declared on the table:
+
+    .. code-block:: python3
+
+        class Member(Table, shard_key="guild_id"):
+            guild_id = Column(BigInt, primary_key=True)
+            user_id = Column(BigInt, primary_key=True)
+            xp = Column(Integer)
+
+        db = ShardedDatabaseInterface("postgresql://127.0.0.1/shard0",
+                                      "postgresql://127.0.0.1/shard1")
+        await db.connect()
+        db.bind_tables(Table)
+
+        async with db.get_session() as sess:
+            # routed to a single shard
+            member = await sess.select(Member).where(Member.guild_id == 1).first()
+            # scattered over every shard, and merged in order
+            top = await sess.select(Member).order_by(Member.xp, sort_order="desc").limit(10).all()
+
+    .. warning::
+
+        Writes to several shards are committed one shard at a time; there is no two-phase commit.
+    """
+
+    def __init__(self, *dsns: str, connector=None,
+                 shard_function: 'typing.Callable[[typing.Any, int], int]' = hash_shard_key):
+        """
+        :param dsns: The DSNs of each shard, in shard order.
+        :param connector: The connector type to use for every shard, if not the default.
+        :param shard_function: A callable that takes a shard key value and the number of shards, \
+            and returns the index of the shard to use.
+        """
+        if not dsns:
+            raise TypeError("Must provide at least one DSN")
+
+        #: The list of :class:`.DatabaseInterface` for each shard.
+        self.shards = [md_db.DatabaseInterface(dsn, connector=connector) for dsn in dsns]
+
+        #: The current Dialect instance. This is shared between every shard.
+        self.dialect = self.shards[0].dialect
+
+        #: The :class:`.Hooks` fired by every transaction of every shard.
+        self.hooks = md_hooks.Hooks()
+        for shard in self.shards:
+            shard.hooks = self.hooks
+
+        #: The :class:`.YieldBudget` for iterating over rows, if any.
+        self.yield_budget = None  # type: md_hooks.YieldBudget
+
+        self._shard_function = shard_function
+
+    async def __aenter__(self):
+        if not self.connected:
+            await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    @property
+    def connected(self) -> bool:
+        """
+        Checks if every shard is connected.
+        """
+        return all(shard.connected for shard in self.shards)
+
+    def bind_tables(self, md: 'md_table.TableMetadata'):
+        """
+        Binds tables to this sharded interface.
+        """
+        if isinstance(md, md_table.TableMeta):
+            md = md.metadata
+
+        md._bind = self
+        md.setup_tables()
+        return md
+
+    async def connect(self, **kwargs) -> 'ShardedDatabaseInterface':
+        """
+        Connects every shard concurrently.
+        """
+        await asyncio.gather(*(shard.connect(**kwargs) for shard in self.shards))
+        return self
+
+    async def close(self):
+        """
+        Closes every shard.
+        """
+        await asyncio.gather(*(shard.close() for shard in self.shards))
+
+    def emit_param(self, name: str = None):
+        """
+        Emits a param in the format that the DB driver specifies.
+
+        See :meth:`.DatabaseInterface.emit_param`.
+        """
+        return self.shards[0].emit_param(name)
+
+    def get_shard_index(self, key: typing.Any) -> int:
+        """
+        Gets the index of the shard that a shard key value belongs to.
+
+        :param key: The value of the shard key column.
+        """
+        return self._shard_function(key, len(self.shards))
+
+    def get_shard(self, key: typing.Any) -> 'md_db.DatabaseInterface':
+        """
+        Gets the :class:`.DatabaseInterface` that a shard key value belongs to.
+
+        :param key: The value of the shard key column.
+        """
+        return self.shards[self.get_shard_index(key)]
+
+    def get_session(self, **kwargs) -> 'ShardedSession':
+        """
+        Gets a new :class:`.ShardedSession` bound to this instance.
+        """
+        return ShardedSession(self, **kwargs)
+
+    async def get_db_server_version(self) -> str:
+        """
+        Gets the version of the DB server of the first shard.
+        """
+        return await self.shards[0].get_db_server_version()
+
+
+class ShardedResultGenerator(collections.abc.AsyncIterator):
+    """
+    A result generator for rows that have been gathered from several shards.
+
+    This mirrors the interface of :class:`.ResultGenerator`.
+    """
+
+    def __init__(self, rows: 'typing.Iterable[md_table.Table]'):
+        self._it = iter(rows)
+
+    async def __anext__(self) -> 'md_table.Table':
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def next(self) -> 'md_table.Table':
+        return next(self._it, None)
+
+    async def flatten(self) -> 'typing.List[md_table.Table]':
+        """
+        Flattens the remaining rows into a single list.
+        """
+        return list(self._it)
+
+
+class ShardedSession(md_session.Session):
+    """
+    A session over a :class:`.ShardedDatabaseInterface`.
+
+    A session is started lazily on each shard the first time a query is routed to it, and each of
+    these sessions is committed, rolled back or closed together.
+
+    Queries are routed using the shard key of the table being queried:
+
+        - Rows being inserted, updated or deleted are grouped by the value of their shard key.
+          Rows can't be moved between shards, so updating a row whose shard key has changed
+          raises an :class:`.UnsupportedOperationException`.
+        - SELECT and bulk queries are routed by an ``==`` or ``in_`` condition on the shard key.
+          If there is no such condition, the query is run on every shard concurrently.
+    """
+
+    def __init__(self, bind: 'ShardedDatabaseInterface', **kwargs):
+        super().__init__(bind, **kwargs)
+
+        #: A mapping of shard index -> :class:`.Session` started on that shard.
+        self.shard_sessions = {}  # type: typing.Dict[int, md_session.Session]
+
+        # stops concurrent queries from each starting a session on the same shard
+        self._shard_locks = collections.defaultdict(asyncio.Lock)
+
+    async def start(self) -> 'ShardedSession':
+        """
+        Starts the session. Sessions on each shard are only started once they are used.
+        """
+        if self._state is not md_session.SessionState.NOT_READY:
+            raise RuntimeError("Session must not be ready or closed")
+
+        self._state = md_session.SessionState.READY
+        return self
+
+    @md_session.enforce_open
+    async def commit(self) -> 'ShardedSession':
+        """
+        Commits the session on every shard that has been used.
+        """
+        await asyncio.gather(*(sess.commit() for sess in self.shard_sessions.values()))
+        return self
+
+    @md_session.enforce_open
+    async def rollback(self, checkpoint: str = None) -> 'ShardedSession':
+        """
+        Rolls back the session on every shard that has been used.
+        """
+        await asyncio.gather(*(sess.rollback(checkpoint=checkpoint)
+                               for sess in self.shard_sessions.values()))
+        return self
+
+    @md_session.enforce_open
+    async def close(self, *, has_error: bool = False):
+        """
+        Closes the session on every shard that has been used.
+        """
+        try:
+            await asyncio.gather(*(sess.close(has_error=has_error)
+                                   for sess in self.shard_sessions.values()))
+        finally:
+            self.shard_sessions.clear()
+            self._shard_locks.clear()
+            self._state = md_session.SessionState.CLOSED
+
+    # shard helpers
+    async def _get_shard_session(self, index: int) -> 'md_session.Session':
+        try:
+            return self.shard_sessions[index]
+        except KeyError:
+            pass
+
+        async with self._shard_locks[index]:
+            # another query may have started it while this one was waiting
+            try:
+                return self.shard_sessions[index]
+            except KeyError:
+                pass
+
+            sess = self.bind.shards[index].get_session()
+            await sess.start()
+            self.shard_sessions[index] = sess
+            return sess
+
+    @md_session.enforce_open
+    async def get_shard_session(self, key: typing.Any) -> 'md_session.Session':
+        """
+        Gets the :class:`.Session` for the shard that a shard key value belongs to. This can be used
+        to run raw SQL on a specific shard.
+
+        :param key: The value of the shard key column.
+        """
+        return await self._get_shard_session(self.bind.get_shard_index(key))
+
+    def _get_shard_keys(self, column: 'md_column.Column',
+                        conditions: 'typing.Iterable[md_operators.BaseOperator]'):
+        """
+        Finds the shard key values that a list of (ANDed) conditions restricts a query to.
+
+        :return: A set of shard key values, or None if the conditions do not restrict the key.
+        """
+        for condition in conditions:
+            if isinstance(condition, md_operators.And):
+                keys = self._get_shard_keys(column, condition.operators)
+            elif isinstance(condition, md_operators.Eq) and condition.column is column \
+                    and condition.value is not None \
+                    and not isinstance(condition.value, (md_column.Column, md_operators.Subquery)):
+                keys = {condition.value}
+            elif isinstance(condition, md_operators.In) and condition.column is column:
+                keys = set(condition.value)
+            else:
+                keys = None
+
+            if keys is not None:
+                return keys
+
+        return None
+
+    def _route_conditions(self, table: 'md_table.TableMeta',
+                          conditions: 'typing.Iterable[md_operators.BaseOperator]') \
+            -> typing.List[int]:
+        """
+        Gets the shard indexes a query on a table with the specified conditions must run on.
+        """
+        keys = None
+        if table.shard_key is not None:
+            keys = self._get_shard_keys(table.shard_key, conditions)
+
+        if keys is None:
+            return list(range(len(self.bind.shards)))
+
+        return sorted({self.bind.get_shard_index(key) for key in keys})
+
+    def _route_rows(self, rows: 'typing.Iterable[md_table.Table]', *, stored: bool = False) \
+            -> 'typing.Dict[int, typing.List[md_table.Table]]':
+        """
+        Groups rows by the index of the shard they belong to.
+
+        :param stored: If rows should be routed by the shard key they were loaded with, which is \
+            the shard they are stored on, rather than by its current value.
+        """
+        grouped = collections.OrderedDict()
+        for row in rows:
+            column = row.table.shard_key
+            if column is None:
+                raise UnsupportedOperationException("Table {} has no shard key"
+                                                    .format(row.table.__name__))
+
+            key = row.get_column_value(column)
+            if stored:
+                key = row._values.get(column, key)
+            if key is None:
+                raise UnsupportedOperationException("Row '{}' has no value for shard key {}"
+                                                    .format(row, column.name))
+
+            grouped.setdefault(self.bind.get_shard_index(key), []).append(row)
+
+        return grouped
+
+    @staticmethod
+    def _rebind(query: 'md_query.BaseQuery', sess: 'md_session.Session', **attrs):
+        """
+        Copies a query, binding it to the session of a shard.
+        """
+        new_query = copy.copy(query)
+        new_query.session = sess
+        for name, value in attrs.items():
+            setattr(new_query, name, value)
+
+        return new_query
+
+    async def _run_on_shards(self, indexes: typing.Iterable[int], fn):
+        """
+        Runs ``fn(session)`` on the session of each shard concurrently.
+        """
+        async def runner(index: int):
+            sess = await self._get_shard_session(index)
+            return await fn(sess)
+
+        return await asyncio.gather(*(runner(index) for index in indexes))
+
+    # sql methods
+    @md_session.enforce_open
+    async def execute(self, sql: str, params=None):
+        """
+        Executes SQL on **every** shard.
+
+        :return: A list of the results from each shard.
+        """
+        return await self._run_on_shards(range(len(self.bind.shards)),
+                                         lambda sess: sess.execute(sql, params))
+
+    @md_session.enforce_open
+    async def cursor(self, sql: str, params=None):
+        raise UnsupportedOperationException("Raw cursors cannot be routed to a shard; use "
+                                            "ShardedSession.get_shard_session instead")
+
+    @md_session.enforce_open
+    async def fetch(self, sql: str, params=None):
+        raise UnsupportedOperationException("Raw cursors cannot be routed to a shard; use "
+                                            "ShardedSession.get_shard_session instead")
+
+    @md_session.enforce_open
+    async def gather(self, *queries: 'md_query.BaseQuery') -> typing.List[typing.List[typing.Any]]:
+        """
+        Runs several independent queries together, and fetches all of their results.
+
+        Queries that are routed to a single shard are sent to it together with
+        :meth:`.Session.gather`. Other queries are run on every shard they need, like they would
+        be if they were run on their own.
+        """
+        batches = collections.OrderedDict()
+        others = []
+        for n, query in enumerate(queries):
+            if not isinstance(query, (md_query.SelectQuery, md_query.AggregateQuery)):
+                raise TypeError("Cannot gather query {}".format(query))
+
+            indexes = self._route_conditions(query.table, query.conditions)
+            if len(indexes) == 1:
+                batches.setdefault(indexes[0], []).append(n)
+            else:
+                others.append(n)
+
+        results = [None] * len(queries)
+
+        async def run_batch(index: int, ns: typing.List[int]):
+            sess = await self._get_shard_session(index)
+            rows = await sess.gather(*(self._rebind(queries[n], sess) for n in ns))
+            for n, result in zip(ns, rows):
+                results[n] = result
+
+        async def run_other(n: int):
+            query = queries[n]
+            if isinstance(query, md_query.SelectQuery):
+                results[n] = await (await self.run_select_query(query)).flatten()
+            else:
+                results[n] = await self.run_aggregate_query(query)
+
+        await asyncio.gather(*[run_batch(index, ns) for index, ns in batches.items()],
+                             *[run_other(n) for n in others])
+        return results
+
+    # query methods
+    async def run_select_query(self, query: 'md_query.SelectQuery'):
+        """
+        Executes a select query, on a single shard if possible or otherwise on every shard.
+
+        When the query is run on several shards, each shard is queried concurrently. If the query
+        has an ORDER BY, the results from each shard are merged in order, and the limit and offset
+        are applied over the merged results.
+
+        :param query: The :class:`.SelectQuery` to use.
+        :return: A :class:`.ResultGenerator` or :class:`.ShardedResultGenerator` for this query.
+        """
+        indexes = self._route_conditions(query.table, query.conditions)
+        if len(indexes) == 1:
+            sess = await self._get_shard_session(indexes[0])
+            return await sess.run_select_query(self._rebind(query, sess))
+
+        # every shard needs to return enough rows to satisfy the offset, too
+        offset = query.row_offset or 0
+        limit = query.row_limit
+        shard_limit = limit + offset if limit is not None else None
+
+        async def run(sess: 'md_session.Session'):
+            gen = await sess.run_select_query(self._rebind(query, sess,
+                                                           row_limit=shard_limit, row_offset=None))
+            return await gen.flatten()
+
+        results = await self._run_on_shards(indexes, run)
+
+        if query.orderer is not None:
+            columns = query.orderer.cols
+
+            def key(row: 'md_table.Table'):
+                values = (row.get_column_value(column) for column in columns)
+                # sort NULLs last, without comparing them to other values
+                return tuple((value is None, value) for value in values)
+
+            merged = heapq.merge(*results, key=key,
+                                 reverse=isinstance(query.orderer, md_operators.DescSorter))
+        else:
+            merged = itertools.chain.from_iterable(results)
+
+        stop = offset + limit if limit is not None else None
+        return ShardedResultGenerator(itertools.islice(merged, offset, stop))
+
+    async def run_columns_query(self, query: 'md_query.SelectQuery',
+                                columns: 'typing.Sequence[md_column.Column]', *,
+                                chunk_size: int = 1000) \
+            -> 'typing.List[md_columnar.ColumnBuffer]':
+        """
+        Executes a select query in columnar form, on a single shard if possible or otherwise on
+        every shard.
+
+        When the query is run on several shards, the columns from each shard are concatenated, and
+        the limit and offset are applied over the concatenated columns. Queries with an ORDER BY
+        can't be merged this way, and raise :class:`.UnsupportedOperationException`.
+
+        :param query: The :class:`.SelectQuery` to use.
+        :param columns: The :class:`.Column` objects to fetch.
+        :param chunk_size: The number of rows to fetch from each cursor at a time.
+        :return: A :class:`.ColumnBuffer` for each column.
+        """
+        indexes = self._route_conditions(query.table, query.conditions)
+        if len(indexes) == 1:
+            sess = await self._get_shard_session(indexes[0])
+            return await sess.run_columns_query(self._rebind(query, sess), columns,
+                                                chunk_size=chunk_size)
+
+        if query.orderer is not None:
+            raise UnsupportedOperationException("Ordered columns cannot be merged across shards; "
+                                                "use SelectQuery.all instead")
+
+        offset = query.row_offset or 0
+        limit = query.row_limit
+        shard_limit = limit + offset if limit is not None else None
+
+        results = await self._run_on_shards(
+            indexes, lambda sess: sess.run_columns_query(
+                self._rebind(query, sess, row_limit=shard_limit, row_offset=None), columns,
+                chunk_size=chunk_size
+            )
+        )
+
+        stop = offset + limit if limit is not None else None
+        buffers = []
+        for shard_buffers in zip(*results):
+            buffer = md_columnar.ColumnBuffer(shard_buffers[0].column)
+            for shard_buffer in shard_buffers:
+                buffer.extend(shard_buffer.values)
+
+            buffer.values = buffer.values[offset:stop]
+            buffers.append(buffer)
+
+        return buffers
+
+    async def run_exists_query(self, query: 'md_query.SelectQuery') -> bool:
+        """
+        Checks if any rows match a select query, on every shard that it is routed to.
+
+        :param query: The :class:`.SelectQuery` to use.
+        :return: True if any rows match on any shard, False otherwise.
+        """
+        indexes = self._route_conditions(query.table, query.conditions)
+        if len(indexes) > 1 and query.row_offset:
+            # the offset is over the merged rows of every shard
+            limit = 1 if query.row_limit is None else min(query.row_limit, 1)
+            gen = await self.run_select_query(self._rebind(query, self, row_limit=limit))
+            return bool(await gen.flatten())
+
+        results = await self._run_on_shards(
+            indexes, lambda sess: sess.run_exists_query(self._rebind(query, sess))
+        )
+        return any(results)
+
+    async def run_aggregate_query(self, query: 'md_query.AggregateQuery') \
+            -> 'typing.List[DictRow]':
+        """
+        Executes an aggregate query, on a single shard if possible or otherwise on every shard.
+
+        When the query is run on several shards, the rows of each group are combined from the
+        results of every shard, using :data:`.AGGREGATE_COMBINERS`. Only ``COUNT``, ``SUM``,
+        ``MIN`` and ``MAX`` without ``distinct`` can be combined; other aggregates, a HAVING
+        clause, or aggregating over a query with a limit or offset raise
+        :class:`.UnsupportedOperationException`.
+
+        :param query: The :class:`.AggregateQuery` to use.
+        :return: The list of result rows.
+        """
+        conditions = list(query.conditions)
+        if query.source is not None:
+            conditions += query.source.conditions
+
+        indexes = self._route_conditions(query.table, conditions)
+        if len(indexes) == 1:
+            sess = await self._get_shard_session(indexes[0])
+            if query.source is not None:
+                query = self._rebind(query, sess, source=self._rebind(query.source, sess))
+            return await sess.run_aggregate_query(self._rebind(query, sess))
+
+        if query.source is not None or query.having_conditions:
+            raise UnsupportedOperationException("Aggregates with a HAVING clause, or over a limit "
+                                                "or offset, cannot be combined across shards")
+
+        for aggregate in query.aggregates:
+            if aggregate.distinct or aggregate.function.upper() not in AGGREGATE_COMBINERS:
+                raise UnsupportedOperationException("Aggregate {} cannot be combined across "
+                                                    "shards".format(aggregate.quoted_fullname))
+
+        results = await self._run_on_shards(
+            indexes, lambda sess: sess.run_aggregate_query(self._rebind(query, sess))
+        )
+
+        groups = collections.OrderedDict()
+        for row in itertools.chain.from_iterable(results):
+            key = tuple(row[column.name] for column in query.group_columns)
+            groups.setdefault(key, []).append(row)
+
+        rows = []
+        for group in groups.values():
+            row = DictRow(group[0])
+            for aggregate in query.aggregates:
+                # NULLs are ignored, like in SQL
+                values = [shard_row[aggregate.name] for shard_row in group
+                          if shard_row[aggregate.name] is not None]
+                row[aggregate.name] = \
+                    AGGREGATE_COMBINERS[aggregate.function.upper()](values) if values else None
+            rows.append(row)
+
+        if query.orderer is not None:
+            names = [column.name for column in query.orderer.cols]
+
+            def key(row: DictRow):
+                # sort NULLs last, without comparing them to other values
+                return tuple((row[name] is None, row[name]) for name in names)
+
+            rows.sort(key=key, reverse=isinstance(query.orderer, md_operators.DescSorter))
+
+        return rows
+
+    async def run_insert_query(self, query: 'md_query.InsertQuery'):
+        """
+        Executes an insert query, routing each row to its shard.
+
+        :param query: The :class:`.InsertQuery` to use.
+        :return: The list of rows that were inserted.
+        """
+        grouped = self._route_rows(query.rows_to_insert)
+
+        async def run(index: int, rows):
+            sess = await self._get_shard_session(index)
+            return await sess.run_insert_query(self._rebind(query, sess, rows_to_insert=rows))
+
+        await asyncio.gather(*(run(index, rows) for index, rows in grouped.items()))
+        return list(query.rows_to_insert)
+
+    async def run_upsert_query(self, query: 'md_query.UpsertQuery'):
+        """
+        Executes an upsert query, routing each row to its shard.
+
+        :param query: The :class:`.UpsertQuery` to use.
+        :return: The list of rows that were upserted.
+        """
+        grouped = self._route_rows(query.rows_to_insert)
+
+        async def run(index: int, rows):
+            sess = await self._get_shard_session(index)
+            return await sess.run_upsert_query(self._rebind(query, sess, rows_to_insert=rows))
+
+        await asyncio.gather(*(run(index, rows) for index, rows in grouped.items()))
+        return list(query.rows_to_insert)
+
+    async def run_update_query(self, query: 'md_query.BaseQuery'):
+        """
+        Executes an update query, routing each row (or the bulk conditions) to its shard.
+
+        :param query: The :class:`.RowUpdateQuery` or :class:`.BulkUpdateQuery` to execute.
+        """
+        if isinstance(query, md_query.RowUpdateQuery):
+            for row in query.rows_to_update:
+                column = row.table.shard_key
+                if column in row._values and row.get_column_value(column) != row._values[column]:
+                    raise UnsupportedOperationException(
+                        "The shard key of row '{}' has changed; rows cannot be moved between "
+                        "shards, so delete and re-insert it instead".format(row)
+                    )
+
+            grouped = self._route_rows(query.rows_to_update, stored=True)
+
+            async def run(index: int, rows):
+                sess = await self._get_shard_session(index)
+                await sess.run_update_query(self._rebind(query, sess, rows_to_update=rows))
+
+            await asyncio.gather(*(run(index, rows) for index, rows in grouped.items()))
+        elif isinstance(query, md_query.BulkUpdateQuery):
+            indexes = self._route_conditions(query._table, query.conditions)
+            await self._run_on_shards(
+                indexes, lambda sess: sess.run_update_query(self._rebind(query, sess))
+            )
+        else:
+            raise TypeError("Type {0.__class__.__name__} is not an update query".format(query))
+
+        return query
+
+    async def run_delete_query(self, query: 'md_query.BaseQuery'):
+        """
+        Executes a delete query, routing each row (or the bulk conditions) to its shard.
+
+        :param query: The :class:`.RowDeleteQuery` or :class:`.BulkDeleteQuery` to execute.
+        """
+        if isinstance(query, md_query.RowDeleteQuery):
+            grouped = self._route_rows(query.rows_to_delete, stored=True)
+
+            async def run(index: int, rows):
+                sess = await self._get_shard_session(index)
+                await sess.run_delete_query(self._rebind(query, sess, rows_to_delete=rows))
+
+            await asyncio.gather(*(run(index, rows) for index, rows in grouped.items()))
+        elif isinstance(query, md_query.BulkDeleteQuery):
+            indexes = self._route_conditions(query._table, query.conditions)
+            await self._run_on_shards(
+                indexes, lambda sess: sess.run_delete_query(self._rebind(query, sess))
+            )
+        else:
+            raise TypeError("Type {0.__class__.__name__} is not a delete query".format(query))
+
+        return query
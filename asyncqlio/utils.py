@@ -2,6 +2,8 @@
 Miscellaneous utilities used throughout the library.
 """
 import collections.abc
+import functools
+import typing
 
 
 class IterToAiter(collections.abc.Iterator, collections.abc.AsyncIterator):
@@ -83,3 +85,19 @@ def separate_statements(sql: str) -> str:
     stmt = sql[start:-1].strip()
     if stmt:
         yield stmt
+
+
+@functools.lru_cache(maxsize=512)
+def split_statements(sql: str) -> typing.Tuple[str, ...]:
+    """
+    Splits a SQL script into a tuple of individual statements.
+
+    This is a cached version of :func:`.separate_statements`. SQL with no semicolon except a
+    trailing one is a single statement, and skips the scan entirely.
+    """
+    stripped = sql.strip()
+    if stripped.find(";") in (-1, len(stripped) - 1):
+        stmt = stripped.rstrip(";").strip()
+        return (stmt,) if stmt else ()
+
+    return tuple(separate_statements(sql))
@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the hot paths of asyncqlio.
+
+This runs against a temporary SQLite3 database by default, or against the database in the
+``ASQL_DSN`` environment variable (or ``--dsn``) if it is set. Results are written as JSON, so
+that runs can be compared across versions:
+
+.. code-block:: bash
+
+    python benchmarks/run.py -o before.json
+    ASQL_DSN=postgresql://asql@127.0.0.1/asqltest python benchmarks/run.py -k hydrate
+
+With ``--memory``, the memory benchmarks are run instead. These report the bytes retained (and the
+peak bytes allocated) per row or object according to :mod:`tracemalloc`, and the peak RSS of the
+process.
+"""
+import asyncio
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+
+import click
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+from asyncqlio.backends.base import DictRow
+from asyncqlio.db import DatabaseInterface
+from asyncqlio.orm.query import RowUpdateQuery
+from asyncqlio.orm.schema.history import ValueChange
+from asyncqlio.orm.schema.column import Column
+from asyncqlio.orm.schema.relationship import ForeignKey, Relationship
+from asyncqlio.orm.schema.table import table_base
+from asyncqlio.orm.schema.types import Integer, String
+from asyncqlio.utils import separate_statements, split_statements
+
+Table = table_base()
+
+
+class User(Table, table_name="bench_user"):
+    id = Column(Integer, primary_key=True)
+    name = Column(String(64))
+    email = Column(String(64))
+    score = Column(Integer)
+
+
+class Guild(Table, table_name="bench_guild"):
+    id = Column(Integer, primary_key=True)
+    name = Column(String(64))
+    channels = Relationship(left="Guild.id", right="Channel.guild_id", load="joined")
+
+
+class Channel(Table, table_name="bench_channel"):
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(Integer, foreign_key=ForeignKey("Guild.id"))
+    name = Column(String(64))
+    messages = Relationship(left="Channel.id", right="Message.channel_id", load="joined")
+
+
+class Message(Table, table_name="bench_message"):
+    id = Column(Integer, primary_key=True)
+    channel_id = Column(Integer, foreign_key=ForeignKey("Channel.id"))
+    author_id = Column(Integer, foreign_key=ForeignKey("User.id"))
+    content = Column(String(256))
+    author = Relationship(left="Message.author_id", right="User.id", load="joined",
+                          use_iter=False)
+
+
+# in creation order
+TABLES = [User, Guild, Channel, Message]
+
+#: The list of registered benchmarks.
+BENCHMARKS = []  # type: typing.List[Benchmark]
+
+#: The list of registered memory benchmarks.
+MEMORY_BENCHMARKS = []  # type: typing.List[MemoryBenchmark]
+
+
+def get_peak_rss() -> typing.Optional[int]:
+    """
+    :return: The peak resident set size of this process in bytes, or None if it is unknown.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS reports bytes
+    if sys.platform != "darwin":
+        peak *= 1024
+
+    return peak
+
+
+class Benchmark(object):
+    """
+    Represents a single benchmark.
+
+    The benchmark function is a coroutine function that takes the :class:`.Context`, and returns
+    the number of operations it ran, so that the results are per operation.
+    """
+
+    def __init__(self, func, name: str, group: str):
+        self.func = func
+        self.name = name
+        self.group = group
+
+    async def run(self, ctx: 'Context', rounds: int) -> typing.Dict[str, typing.Any]:
+        """
+        Runs this benchmark, returning the JSON-compatible results.
+        """
+        # warm up caches, and get rid of one-off setup costs
+        await self.func(ctx)
+
+        times = []
+        number = 1
+        for _ in range(rounds):
+            start = time.perf_counter()
+            number = await self.func(ctx)
+            times.append((time.perf_counter() - start) / number)
+
+        return self.get_results(times, number)
+
+    def get_results(self, times: typing.List[float], number: int) -> typing.Dict[str, typing.Any]:
+        """
+        :return: The JSON-compatible results for the per-operation times of each round.
+        """
+        return {
+            "name": self.name,
+            "group": self.group,
+            "number": number,
+            "rounds": len(times),
+            "times": times,
+            "min": min(times),
+            "mean": statistics.mean(times),
+            "median": statistics.median(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        }
+
+    def summary(self, result: typing.Dict[str, typing.Any]) -> str:
+        return "{:>12.3f} us/op".format(result["median"] * 1e6)
+
+
+class StartupBenchmark(Benchmark):
+    """
+    Represents a benchmark of the time to import a module in a new interpreter.
+
+    This uses ``python -X importtime``, so it only counts the time spent importing, not the time
+    spent starting the interpreter.
+    """
+
+    def __init__(self, module: str):
+        super().__init__(None, "startup.import_{}".format(module.replace(".", "_")), "startup")
+        self.module = module
+
+    async def get_import_time(self) -> float:
+        """
+        :return: The cumulative time spent importing the module and its dependencies, in seconds.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-X", "importtime", "-c", "import {}".format(self.module),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await proc.communicate()
+
+        # lines look like "import time: self [us] | cumulative | name"
+        # and the name is indented by nesting, so only the top-level imports of our package count
+        total = 0
+        for line in stderr.decode().splitlines():
+            if not line.startswith("import time:"):
+                continue
+
+            _, cumulative, name = line.split("|")
+            if name.startswith("  ") or not name.strip().startswith("asyncqlio"):
+                continue
+
+            total += int(cumulative)
+
+        return total / 1e6
+
+    async def run(self, ctx: 'Context', rounds: int) -> typing.Dict[str, typing.Any]:
+        # warm up the bytecode cache
+        await self.get_import_time()
+        times = [await self.get_import_time() for _ in range(rounds)]
+        return self.get_results(times, 1)
+
+
+class MemoryBenchmark(object):
+    """
+    Represents a single memory benchmark.
+
+    The benchmark function is a coroutine function that takes the :class:`.Context`, and returns a
+    two-item tuple of (objects, count). The objects are kept alive until the allocations have been
+    measured, and the results are per item of the count.
+    """
+
+    def __init__(self, func, name: str):
+        self.func = func
+        self.name = name
+        self.group = "memory"
+
+    async def run(self, ctx: 'Context', rounds: int) -> typing.Dict[str, typing.Any]:
+        """
+        Runs this benchmark, returning the JSON-compatible results.
+
+        Allocations are deterministic enough that only one round is measured.
+        """
+        # warm up caches, so that the shared rows aren't counted
+        await self.func(ctx)
+        gc.collect()
+
+        tracemalloc.start()
+        try:
+            objects, count = await self.func(ctx)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        del objects
+        return {
+            "name": self.name,
+            "group": self.group,
+            "count": count,
+            "bytes_per_item": current / count,
+            "peak_bytes_per_item": peak / count,
+            "peak_rss": get_peak_rss(),
+        }
+
+    def summary(self, result: typing.Dict[str, typing.Any]) -> str:
+        return "{:>12.1f} B/item".format(result["bytes_per_item"])
+
+
+def benchmark(group: str):
+    """
+    Registers a benchmark.
+
+    :param group: The group of the benchmark, e.g. ``compile``.
+    """
+
+    def inner(func):
+        name = "{}.{}".format(group, func.__name__)
+        BENCHMARKS.append(Benchmark(func, name, group))
+        return func
+
+    return inner
+
+
+def memory_benchmark(func):
+    """
+    Registers a memory benchmark.
+    """
+    MEMORY_BENCHMARKS.append(MemoryBenchmark(func, "memory.{}".format(func.__name__)))
+    return func
+
+
+class Context(object):
+    """
+    The state shared between benchmarks.
+    """
+
+    def __init__(self, db: DatabaseInterface, rows: int):
+        #: The database being benchmarked.
+        self.db = db
+
+        #: The number of rows to hydrate.
+        self.rows = rows
+
+        # created lazily
+        self._user_rows = None
+        self._joined_rows = None
+
+    @property
+    def user_rows(self) -> typing.List[DictRow]:
+        """
+        The raw rows returned by a select of :class:`.User`.
+        """
+        if self._user_rows is None:
+            self._user_rows = [
+                DictRow((column.alias_name(User), value) for column, value in zip(
+                    User.iter_columns(), (i, "user{}".format(i), "user{}@example.com".format(i), i)
+                ))
+                for i in range(self.rows)
+            ]
+
+        return self._user_rows
+
+    @property
+    def joined_rows(self) -> typing.List[typing.List[DictRow]]:
+        """
+        The raw rows returned by a select of :class:`.Guild`, grouped by guild.
+
+        Each guild has 2 channels of 5 messages.
+        """
+        if self._joined_rows is None:
+            query = self.db.get_session().select(Guild)
+            foreign_tables, _ = query.get_required_join_paths()
+            tables = [Guild] + foreign_tables
+            groups = []
+            for i in range(0, self.rows, 10):
+                group = []
+                for message_id in range(i, i + 10):
+                    values = {
+                        Guild: (i, "guild{}".format(i)),
+                        Channel: (message_id // 5, i, "channel"),
+                        Message: (message_id, message_id // 5, message_id % 50, "hello"),
+                        User: (message_id % 50, "user", "user@example.com", 0),
+                    }
+                    group.append(DictRow(
+                        (column.alias_name(table), value)
+                        for table in tables
+                        for column, value in zip(table.iter_columns(),
+                                                 values[getattr(table, "alias_table", table)])
+                    ))
+                groups.append(group)
+
+            self._joined_rows = groups
+
+        return self._joined_rows
+
+
+# startup
+# -X importtime was added in 3.7
+if sys.version_info >= (3, 7):
+    for module in ("asyncqlio", "asyncqlio.db"):
+        BENCHMARKS.append(StartupBenchmark(module))
+
+#: The number of statements compiled per round.
+COMPILE_COUNT = 1000
+
+#: The number of rows used by the round-trip benchmarks.
+ROUNDTRIP_ROWS = 1000
+
+SCRIPT = "CREATE TABLE a (x VARCHAR(10)); INSERT INTO a VALUES ('b;c'); SELECT * FROM a;"
+
+
+# compile
+@benchmark("compile")
+async def select_small(ctx: Context):
+    sess = ctx.db.get_session()
+    for _ in range(COMPILE_COUNT):
+        sess.select(User).where(User.id == 1).generate_sql()
+
+    return COMPILE_COUNT
+
+
+@benchmark("compile")
+async def select_joined(ctx: Context):
+    sess = ctx.db.get_session()
+    for _ in range(COMPILE_COUNT):
+        sess.select(Guild).where(Guild.id == 1).generate_sql()
+
+    return COMPILE_COUNT
+
+
+@benchmark("compile")
+async def separate_statements_script(ctx: Context):
+    for _ in range(COMPILE_COUNT):
+        list(separate_statements(SCRIPT))
+
+    return COMPILE_COUNT
+
+
+@benchmark("compile")
+async def split_statements_cached(ctx: Context):
+    for _ in range(COMPILE_COUNT):
+        split_statements(SCRIPT)
+
+    return COMPILE_COUNT
+
+
+# hydrate
+@benchmark("hydrate")
+async def map_columns(ctx: Context):
+    query = ctx.db.get_session().select(User)
+    for row in ctx.user_rows:
+        query.map_columns(row)
+
+    return len(ctx.user_rows)
+
+
+@benchmark("hydrate")
+async def map_many_joined(ctx: Context):
+    query = ctx.db.get_session().select(Guild)
+    for group in ctx.joined_rows:
+        query.map_many(*group)
+
+    return sum(len(group) for group in ctx.joined_rows)
+
+
+# round-trip
+async def _insert_users(sess):
+    await sess.delete.table(User).where(User.id >= 0)
+    await sess.insert.rows(*(User(id=i, name="user{}".format(i), email="u@example.com", score=i)
+                             for i in range(ROUNDTRIP_ROWS)))
+
+
+@benchmark("roundtrip")
+async def insert_bulk(ctx: Context):
+    async with ctx.db.get_session() as sess:
+        await _insert_users(sess)
+
+    return ROUNDTRIP_ROWS
+
+
+@benchmark("roundtrip")
+async def row_update_flush(ctx: Context):
+    async with ctx.db.get_session() as sess:
+        rows = await (await sess.select(User).all()).flatten()
+        for row in rows:
+            row.score += 1
+
+        await RowUpdateQuery(sess).rows(*rows)
+
+    return len(rows)
+
+
+@benchmark("roundtrip")
+async def select_iterate(ctx: Context):
+    count = 0
+    async with ctx.db.get_session() as sess:
+        async for _ in await sess.select(User).all():
+            count += 1
+
+    return count
+
+
+@benchmark("roundtrip")
+async def select_columns(ctx: Context):
+    async with ctx.db.get_session() as sess:
+        columns = await sess.select(User).to_columns()
+
+    return len(columns["id"])
+
+
+# memory
+@memory_benchmark
+async def result_generator_flatten(ctx: Context):
+    async with ctx.db.get_session() as sess:
+        rows = await (await sess.select(User).all()).flatten()
+
+    return rows, len(rows)
+
+
+@memory_benchmark
+async def select_columns_buffers(ctx: Context):
+    async with ctx.db.get_session() as sess:
+        columns = await sess.select(User).to_columns()
+
+    return columns, len(columns["id"])
+
+
+@memory_benchmark
+async def result_set_flatten(ctx: Context):
+    async with ctx.db.get_transaction() as tr:
+        cursor = await tr.cursor("SELECT * FROM {};".format(User.__quoted_name__))
+        rows = await cursor.flatten()
+        await cursor.close()
+
+    return rows, len(rows)
+
+
+@memory_benchmark
+async def map_many_joined_rows(ctx: Context):
+    query = ctx.db.get_session().select(Guild)
+    rows = [query.map_many(*group) for group in ctx.joined_rows]
+    return rows, sum(len(group) for group in ctx.joined_rows)
+
+
+@memory_benchmark
+async def dict_row(ctx: Context):
+    rows = [DictRow(row) for row in ctx.user_rows]
+    return rows, len(rows)
+
+
+@memory_benchmark
+async def table_row(ctx: Context):
+    query = ctx.db.get_session().select(User)
+    rows = [query.map_columns(row) for row in ctx.user_rows]
+    return rows, len(rows)
+
+
+@memory_benchmark
+async def value_change(ctx: Context):
+    changes = [ValueChange(User.score) for _ in range(ctx.rows)]
+    return changes, len(changes)
+
+
+async def _setup(db: DatabaseInterface):
+    db.bind_tables(Table)
+    async with db.get_ddl_session() as sess:
+        for table in TABLES:
+            await sess.create_table(table.__tablename__, *table.iter_columns(),
+                                    if_not_exists=True)
+
+    async with db.get_session() as sess:
+        await _insert_users(sess)
+
+
+async def _teardown(db: DatabaseInterface):
+    async with db.get_ddl_session() as sess:
+        for table in reversed(TABLES):
+            await sess.drop_table(table.__tablename__)
+
+
+async def run_benchmarks(dsn: str, pattern: str, rounds: int, rows: int, *,
+                         memory: bool = False) -> dict:
+    db = DatabaseInterface(dsn)
+    await db.connect()
+    try:
+        await _setup(db)
+        ctx = Context(db, rows)
+        results = []
+        for bench in (MEMORY_BENCHMARKS if memory else BENCHMARKS):
+            if pattern is not None and not fnmatch.fnmatch(bench.name, pattern):
+                continue
+
+            result = await bench.run(ctx, rounds)
+            click.echo("{:<45} {}".format(bench.name, bench.summary(result)), err=True)
+            results.append(result)
+
+        await _teardown(db)
+    finally:
+        await db.close()
+
+    return {
+        "meta": {
+            "asyncqlio": getattr(sys.modules["asyncqlio"], "__version__", None),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "dialect": type(db.dialect).__name__,
+            "mode": "memory" if memory else "time",
+            "peak_rss": get_peak_rss(),
+            "rounds": rounds,
+            "rows": rows,
+            "timestamp": time.time(),
+        },
+        "benchmarks": results,
+    }
+
+
+@click.command()
+@click.option("--dsn", envvar="ASQL_DSN", default=None,
+              help="The DSN to benchmark against. Defaults to a temporary SQLite3 database.")
+@click.option("-o", "--output", type=click.File("w"), default="-",
+              help="The file to write the JSON results to.")
+@click.option("-k", "pattern", default=None,
+              help="Only run benchmarks matching this glob, e.g. 'hydrate.*'.")
+@click.option("--rounds", default=5, help="The number of timed rounds per benchmark.")
+@click.option("--rows", default=100000, help="The number of rows to hydrate.")
+@click.option("--memory", is_flag=True, default=False,
+              help="Run the memory benchmarks instead of the timing benchmarks.")
+def cli(dsn: str, output, pattern: str, rounds: int, rows: int, memory: bool):
+    """
+    Runs the asyncqlio benchmarks.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if dsn is None:
+            dsn = "sqlite3:///{}".format(os.path.join(tmp, "bench.db"))
+
+        loop = asyncio.get_event_loop()
+        results = loop.run_until_complete(run_benchmarks(dsn, pattern, rounds, rows,
+                                                         memory=memory))
+
+    json.dump(results, output, indent=2)
+    output.write("\n")
+
+
+if __name__ == "__main__":
+    cli()
@@ -38,7 +38,6 @@ setup(
     ],
     install_requires=[
         "cached_property==1.3.0",
-        "asyncio_extras==1.3.0",
         "click",
         "tqdm"
     ],
@@ -55,6 +54,9 @@ setup(
         ],
         "aiomysql": [
             "aiomysql>=0.0.9",
+        ],
+        "numpy": [
+            "numpy"
         ]
     },
     test_requires=[
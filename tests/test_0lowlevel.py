@@ -1,10 +1,18 @@
 """
 Tests the low-level API.
 """
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 
 import pytest
 
-from asyncqlio import BaseTransaction, DatabaseException, DatabaseInterface
+from asyncqlio import BaseConnector, BaseTransaction, DatabaseException, DatabaseInterface
+from asyncqlio.backends.base import DictRow
+from asyncqlio.hooks import YieldBudget
 
 # mark all test_ functions as coroutines
 pytestmark = pytest.mark.asyncio
@@ -92,3 +100,257 @@ async def test_transaction_with_error(db: DatabaseInterface):
     await tr.rollback()
     await tr.close()
 
+
+async def test_hooks(db: DatabaseInterface):
+    events = []
+    for event in ("after_execute", "on_error", "pool_acquire", "pool_release"):
+        db.hooks.add_listener(event, events.append)
+
+    try:
+        tr = db.get_transaction()
+        await tr.begin()
+        await tr.execute("SELECT 1;")
+        with pytest.raises(DatabaseException):
+            await tr.execute("SELECT nonexistant FROM nosuchtable;")
+        await tr.rollback()
+        await tr.close()
+    finally:
+        for event in ("after_execute", "on_error", "pool_acquire", "pool_release"):
+            db.hooks.remove_listener(event, events.append)
+
+    acquired, executed, errored, released = events
+    assert executed.sql == "SELECT 1;" and executed.duration >= 0
+    assert isinstance(errored.error, DatabaseException)
+    assert acquired.connection_id == executed.connection_id == released.connection_id
+
+
+async def test_hooks_cursor_rows(db: DatabaseInterface):
+    events = []
+    db.hooks.add_listener("after_fetch", events.append)
+    try:
+        async with db.get_transaction() as tr:
+            cursor = await tr.cursor("SELECT 1 AS result UNION ALL SELECT 2 UNION ALL SELECT 3;")
+            assert len(await cursor.flatten()) == 3
+            await cursor.close()
+
+            # closed before being exhausted
+            cursor = await tr.cursor("SELECT 1 AS result UNION ALL SELECT 2;")
+            await cursor.fetch_row()
+            await cursor.close()
+    finally:
+        db.hooks.remove_listener("after_fetch", events.append)
+
+    assert [event.rows for event in events] == [3, 1]
+    assert events[0].sql.startswith("SELECT 1 AS result")
+
+
+async def test_pool_stats(db: DatabaseInterface):
+    acquisitions = db.connector.pool_stats()["acquisitions"]
+
+    tr = db.get_transaction()
+    await tr.begin()
+    await tr.execute("SELECT 1;")
+    stats = db.connector.pool_stats()
+    assert stats["in_use"] >= 1
+    assert stats["size"] >= stats["in_use"]
+    assert stats["acquisitions"] == acquisitions + 1
+    await tr.rollback()
+    await tr.close()
+
+    stats = db.connector.pool_stats()
+    assert 0 <= stats["wait_time_p50"] <= stats["wait_time_p99"] <= stats["max_wait_time"]
+
+
+async def test_pool_stats_waiters(db: DatabaseInterface):
+    tr = db.get_transaction()
+    acquired = asyncio.Future()
+    task = asyncio.ensure_future(tr.acquire_connection(lambda: acquired))
+    await asyncio.sleep(0)
+
+    # waiters are counted by asyncqlio, rather than read from the driver's pool
+    assert BaseConnector.pool_stats(db.connector)["waiters"] == 1
+    acquired.set_result(object())
+    await task
+    assert BaseConnector.pool_stats(db.connector)["waiters"] == 0
+
+
+async def test_slow_query_log():
+    slow_db = DatabaseInterface(os.environ["ASQL_DSN"], slow_query_threshold=0,
+                                explain_slow_queries=True, redact_params=True)
+    await slow_db.connect()
+    try:
+        sql = "SELECT 1 AS result WHERE 1 = {};".format(slow_db.emit_param("one"))
+        async with slow_db.get_transaction() as tr:
+            cursor = await tr.cursor(sql, {"one": 1})
+            await cursor.close()
+        await slow_db.slow_query_log.flush()
+    finally:
+        await slow_db.close()
+
+    record, = slow_db.slow_query_log.records
+    assert record.sql == sql
+    assert record.params == ("one",)
+    assert record.site.filename == __file__
+    assert record.plan
+
+
+async def test_yield_budget():
+    budget_db = DatabaseInterface(os.environ["ASQL_DSN"], yield_rows=2)
+    await budget_db.connect()
+    try:
+        async with budget_db.get_transaction() as tr:
+            cursor = await tr.cursor("SELECT 1 AS result UNION ALL SELECT 2 UNION ALL SELECT 3;")
+            rows = await cursor.flatten(budget=budget_db.yield_budget)
+            await cursor.close()
+
+            # the budget of the database is used by default
+            cursor = await tr.cursor("SELECT 1 AS result UNION ALL SELECT 2 UNION ALL SELECT 3;")
+            await cursor.flatten()
+            await cursor.close()
+    finally:
+        await budget_db.close()
+
+    assert [row["result"] for row in rows] == [1, 2, 3]
+    assert budget_db.yield_budget.yields == 2
+    assert budget_db.yield_budget.longest_stretch > 0
+
+
+async def test_yield_budget_driver_wait():
+    from asyncqlio.orm.query import BufferedResultSet
+
+    class SlowResultSet(BufferedResultSet):
+        async def fetch_row(self):
+            # the loop is free while the driver waits for rows
+            await asyncio.sleep(0.05)
+            self._reset_timer()
+            return await super().fetch_row()
+
+    budget = YieldBudget(interval=1)
+    rows = await SlowResultSet([DictRow(result=1), DictRow(result=2)]).flatten(budget=budget)
+
+    assert [row["result"] for row in rows] == [1, 2]
+    assert budget.longest_stretch < 0.05
+
+
+async def test_lazy_imports():
+    # the ORM, CLI libraries and drivers shouldn't be imported by the low-level API
+    code = "import sys; from asyncqlio import DatabaseInterface; print(' '.join(sys.modules))"
+    modules = subprocess.check_output([sys.executable, "-c", code]).decode().split()
+    for module in ("asyncqlio.orm.session", "asyncqlio.orm.schema.table", "pkg_resources",
+                   "click", "tqdm", "asyncpg", "aiomysql", "sqlite3"):
+        assert module not in modules
+
+
+@pytest.mark.skipif(not os.environ["ASQL_DSN"].startswith("sqlite3"), reason="sqlite3 pool only")
+async def test_sqlite_pool_growth():
+    from asyncqlio.backends.sqlite3.aiosqlite3 import _SqlitePool
+
+    pool = _SqlitePool(min_size=1, max_size=2, idle_timeout=60, database=":memory:")
+    await pool.connect()
+    assert pool.size == 1
+
+    first, second = await pool.acquire(), await pool.acquire()
+    assert pool.stats()["in_use"] == 2
+
+    # stale transactions are rolled back rather than reopening the connection
+    await first.run(first.raw.execute, "CREATE TABLE test_pool (id INTEGER);")
+    await first.run(first.raw.execute, "INSERT INTO test_pool VALUES (1);")
+    assert first.raw.in_transaction
+    await pool.release(first)
+    assert not first.raw.in_transaction
+
+    # idle connections are reaped down to the minimum size
+    pool.idle_timeout = 0
+    await pool.release(second)
+    assert pool.size == 1
+    assert pool.stats()["acquisitions"] == 2
+    await pool.close()
+
+
+@pytest.mark.skipif(not os.environ["ASQL_DSN"].startswith("sqlite3"), reason="sqlite3 pool only")
+async def test_sqlite_pool_reaper():
+    from asyncqlio.backends.sqlite3.aiosqlite3 import _SqlitePool
+
+    pool = _SqlitePool(min_size=1, max_size=2, idle_timeout=0.1, database=":memory:")
+    await pool.connect()
+    first, second = await pool.acquire(), await pool.acquire()
+    await pool.release(first)
+    await pool.release(second)
+    assert pool.size == 2
+
+    # idle connections are reaped without another release
+    await asyncio.sleep(0.3)
+    assert pool.size == 1
+    await pool.close()
+
+
+@pytest.mark.skipif(not os.environ["ASQL_DSN"].startswith("sqlite3"), reason="sqlite3 only")
+async def test_sqlite_pool_dsn_params():
+    db = DatabaseInterface("sqlite3:///:memory:?max_size=3&idle_timeout=60"
+                           "&health_check_interval=5")
+    await db.connect()
+    try:
+        assert db.connector.pool.health_check_interval == 5.0
+        assert db.connector.pool.max_size == 3
+    finally:
+        await db.close()
+
+
+@pytest.mark.skipif(not os.environ["ASQL_DSN"].startswith("sqlite3"), reason="sqlite3 only")
+async def test_sqlite_script_rollback(db: DatabaseInterface):
+    tr = db.get_transaction()
+    await tr.begin()
+    await tr.execute("CREATE TABLE test_script (id INTEGER); "
+                     "INSERT INTO test_script VALUES (1); INSERT INTO test_script VALUES (2);")
+    cursor = await tr.cursor("SELECT COUNT(*) FROM test_script;")
+    assert (await cursor.fetch_row())[0] == 2
+    await cursor.close()
+
+    # the whole script is still part of the transaction
+    await tr.rollback()
+    with pytest.raises(DatabaseException):
+        await tr.cursor("SELECT * FROM test_script;")
+    await tr.close()
+
+
+@pytest.mark.skipif(not os.environ["ASQL_DSN"].startswith("sqlite3"), reason="sqlite3 only")
+async def test_sqlite_wal_split():
+    wal_dir = tempfile.mkdtemp()
+    wal_db = DatabaseInterface("sqlite3:///{}?journal_mode=wal&synchronous=normal"
+                               .format(os.path.join(wal_dir, "wal_test.db")))
+    await wal_db.connect()
+    connector = wal_db.connector
+    try:
+        tr = wal_db.get_transaction()
+        await tr.begin()
+        cursor = await tr.cursor("PRAGMA journal_mode;")
+        assert (await cursor.fetch_row())[0] == "wal"
+        await tr.close()
+
+        # reads use a reader, until the transaction writes
+        tr = wal_db.get_transaction()
+        await tr.begin()
+        cursor = await tr.cursor("SELECT 1;")
+        assert connector.reader_pool.stats()["in_use"] == 1
+        await tr.execute("CREATE TABLE IF NOT EXISTS wal_test (id INTEGER);")
+        assert connector.pool.stats()["in_use"] == 1
+        # the reader is kept until the cursor from it is closed
+        assert connector.reader_pool.stats()["in_use"] == 1
+        assert (await cursor.fetch_row())[0] == 1
+        await cursor.close()
+        assert connector.reader_pool.stats()["in_use"] == 0
+        await tr.rollback()
+        await tr.close()
+
+        # or until the transaction is closed
+        tr = wal_db.get_transaction()
+        await tr.begin()
+        await tr.cursor("SELECT 1;")
+        await tr.execute("CREATE TABLE IF NOT EXISTS wal_test (id INTEGER);")
+        assert connector.reader_pool.stats()["in_use"] == 1
+        await tr.rollback()
+        await tr.close()
+        assert connector.reader_pool.stats()["in_use"] == 0
+    finally:
+        await wal_db.close()
+        shutil.rmtree(wal_dir, ignore_errors=True)
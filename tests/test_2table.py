@@ -88,3 +88,31 @@ async def test_generate_schema():
 async def test_drop_table():
     for table in tables:
         await table.drop(cascade=True)
+
+
+async def test_join_plan(db: DatabaseInterface):
+    JoinTable = table_base()
+
+    class Owner(JoinTable):
+        id = Column(Integer(), primary_key=True)
+        pets = Relationship(left="Owner.id", right="Pet.owner_id", load="joined")
+
+    class Pet(JoinTable):
+        id = Column(Integer(), primary_key=True)
+        owner_id = Column(Integer(), foreign_key=ForeignKey("Owner.id"))
+
+    db.bind_tables(JoinTable)
+    plan = JoinTable.metadata.get_join_plan(Owner)
+    pets = Owner.get_relationship("pets")
+    assert plan.foreign_tables == (pets.foreign_table,)
+    assert plan.relationships == (pets,)
+    assert len(plan.joins) == 1 and len(plan.selected_columns) == 3
+
+    # rows are folded into the joined relationships using the plan
+    query = db.get_session().select(Owner)
+    records = [{"t_owner_id": 1, "t_r_Owner_pets_id": i, "t_r_Owner_pets_owner_id": 1}
+               for i in (1, 2, 2)]
+    owner = query.map_many(*records)
+    assert [pet.id for pet in owner._relationship_mapping[pets]] == [1, 2]
+    # the records aren't consumed by folding
+    assert all(len(record) == 3 for record in records)
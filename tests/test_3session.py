@@ -1,11 +1,22 @@
 """
 Tests methods of Session.
 """
+import array
+import asyncio
+import concurrent.futures
+import os
 
 import pytest
 
-from asyncqlio import DatabaseInterface
-from asyncqlio.orm.schema.table import Table
+from asyncqlio import DatabaseException, DatabaseInterface
+from asyncqlio.backends.postgresql import PostgresqlDialect
+from asyncqlio.orm import functions as func
+from asyncqlio.orm.columnar import ColumnBuffer
+from asyncqlio.orm.operators import exists, not_exists
+from asyncqlio.orm.query import ChunkedResultSet
+from asyncqlio.orm.schema.column import Column
+from asyncqlio.orm.schema.table import Table, table_base
+from asyncqlio.orm.schema.types import Integer
 
 # mark all test_ functions as coroutines
 pytestmark = pytest.mark.asyncio
@@ -26,6 +37,24 @@ async def test_insert(db: DatabaseInterface, table: Table):
         await sess.insert.rows(*rows)
 
 
+@pytest.mark.skipif(os.environ["ASQL_DSN"].startswith("postgresql"), reason="uses RETURNING")
+async def test_insert_autoincrement(db: DatabaseInterface, table: Table):
+    queries = []
+    db.hooks.add_listener("after_execute", queries.append)
+    try:
+        async with db.get_session() as sess:
+            row, = await sess.insert.rows(table(name="autoincrement", email="autoincrement"))
+    finally:
+        db.hooks.remove_listener("after_execute", queries.append)
+
+    # the id comes from the driver, not another query
+    assert row.id is not None
+    assert len(queries) == 1
+
+    async with db.get_session() as sess:
+        await sess.delete(table).where(table.id == row.id)
+
+
 async def test_fetch(db: DatabaseInterface, table: Table):
     async with db.get_session() as sess:
         res = await sess.fetch('select * from {}'.format(table.__tablename__))
@@ -53,6 +82,209 @@ async def test_select(db: DatabaseInterface, table: Table):
         assert getattr(res, attr, object()) == value.format(res.id)
 
 
+async def test_aggregate(db: DatabaseInterface, table: Table):
+    async with db.get_session() as sess:
+        assert await sess.select(table).where(table.id < 10).count() == 10
+        assert await sess.select(table).where(table.id < 10).limit(3).count() == 3
+        assert await sess.select(table).where(table.id < 10).limit(5).offset(8).count() == 2
+
+        # the aggregates are over the limited rows
+        query = sess.select(table).where(table.id < 10).order_by(table.id.desc()).limit(2)
+        assert await query.aggregate(func.sum(table.id)).scalar() == 17
+
+        query = sess.select(table).where(table.id < 10)
+        row = await query.aggregate(func.sum(table.id), func.min(table.id),
+                                    func.max(table.id).label("highest")).first()
+        assert (row["sum_id"], row["min_id"], row["highest"]) == (45, 0, 9)
+
+        query = sess.select(table).where(table.id < 3)
+        query = query.aggregate(func.count(), group_by=table.name, having=func.count() > 0)
+        rows = await query.order_by(table.name.desc())
+        assert [(row["name"], row["count"]) for row in rows] == \
+            [("test2", 1), ("test1", 1), ("test0", 1)]
+
+
+async def test_subquery(db: DatabaseInterface, table: Table):
+    async with db.get_session() as sess:
+        assert await sess.select(table).where(table.id == 2).exists()
+        assert not await sess.select(table).where(table.id == 1000).exists()
+        assert await sess.select(table).where(table.id < 5).offset(3).exists()
+        assert not await sess.select(table).where(table.id < 5).offset(5).exists()
+
+        ids = sess.select(table).where(table.id < 3).subquery(table.id)
+        query = sess.select(table).where(table.id.in_(ids)).order_by(table.id)
+        assert [row.id for row in await (await query.all()).flatten()] == [0, 1, 2]
+
+        # scalar subquery
+        highest = sess.select(table).where(table.id < 45).aggregate(func.max(table.id))
+        query = sess.select(table).where(table.id > highest.subquery(), table.id < 48)
+        assert await query.count() == 3
+
+        query = sess.select(table).where(table.id < 5)
+        assert await query.where(exists(sess.select(table).where(table.id == 2))).count() == 5
+        assert await query.where(not_exists(sess.select(table))).count() == 0
+
+
+async def test_select_in_large(db: DatabaseInterface, table: Table):
+    ids = list(range(0, db.dialect.max_params + 2, 2))
+    async with db.get_session() as sess:
+        # 0 is repeated at the end, in what would be the second chunk
+        query = sess.select(table).where(table.id.in_(*ids, 0))
+        if db.dialect.has_array_params:
+            # a single array param is used
+            sql, params = query.generate_sql()
+            assert len(params) == 1
+        else:
+            # the IN list is split up to fit in the param limit
+            assert len(query.generate_chunked_sql()) == 2
+
+        rows = await (await query.all()).flatten()
+    assert sorted(row.id for row in rows) == list(range(0, 50, 2))
+
+
+async def test_in_unbound():
+    class Unbound(table_base()):
+        id = Column(Integer(), primary_key=True)
+
+    names = iter(("a", "b"))
+
+    def emitter():
+        name = next(names)
+        return ":" + name, name
+
+    # conditions can be built before the table is bound to a database
+    response = Unbound.id.in_(1, 2).generate_sql(emitter)
+    assert response.sql.endswith("IN (:a, :b)")
+    assert response.parameters == {"a": 1, "b": 2}
+
+    # the array form is picked from the dialect, not from the emitter
+    names = iter(("c",))
+    response = Unbound.id.in_(1, 2).generate_sql(emitter, dialect=PostgresqlDialect())
+    assert response.sql.endswith("= ANY(:c)")
+    assert response.parameters == {"c": [1, 2]}
+
+
+async def test_select_columns(db: DatabaseInterface, table: Table):
+    async with db.get_session() as sess:
+        query = sess.select(table).where(table.id < 5).order_by(table.id)
+        columns = await query.to_columns(table.id, table.name, chunk_size=2)
+    assert columns["id"] == array.array("q", range(5))
+    assert columns["name"] == ["test{}".format(i) for i in range(5)]
+
+    # NULLs can't be stored in a typed array
+    buffer = ColumnBuffer(table.id)
+    buffer.extend([1, 2])
+    buffer.extend([3, None])
+    assert buffer.values == [1, 2, 3, None]
+
+
+async def test_select_columns_numpy(db: DatabaseInterface, table: Table):
+    numpy = pytest.importorskip("numpy")
+    async with db.get_session() as sess:
+        query = sess.select(table).where(table.id < 5)
+        columns = await query.to_columns(table.id, table.name, numpy=True)
+    assert columns["id"].dtype == numpy.int64 and columns["id"].sum() == 10
+    assert columns["name"].dtype == object
+
+
+async def test_select_records(db: DatabaseInterface, table: Table):
+    async with db.get_session() as sess:
+        query = sess.select(table).where(table.id < 5).order_by(table.id)
+        records = await query.records(chunk_size=2).flatten()
+        assert [record["name"] for record in records] == ["test{}".format(i) for i in range(5)]
+
+        # records buffered by iterating aren't lost
+        records = query.records(chunk_size=5)
+        first = await records.__anext__()
+        assert [record["id"] for record in [first] + await records.flatten()] == list(range(5))
+
+        # the chunk size is lowered when a chunk takes longer than the time budget
+        records = query.records(chunk_size=4, time_budget=0)
+        await records.__anext__()
+        assert records.chunk_size == 2
+
+        # a large IN list is split into chunks like with all()
+        ids = list(range(0, db.dialect.max_params * 2 + 2, 2))
+        records = sess.select(table).where(table.id.in_(*ids)).records()
+        first = await records.__anext__()
+        if not db.dialect.has_array_params:
+            assert isinstance(records._results, ChunkedResultSet)
+        records = [first] + await records.flatten()
+        assert sorted(record["id"] for record in records) == list(range(0, 50, 2))
+
+        with concurrent.futures.ProcessPoolExecutor(1) as pool:
+            query = sess.select(table).where(table.id < 5).order_by(table.id)
+            ids = [record["id"] async for record in query.records(executor=pool)]
+        assert ids == list(range(5))
+
+
+async def test_gather(db: DatabaseInterface, table: Table):
+    queries = []
+    db.hooks.add_listener("after_execute", queries.append)
+    try:
+        async with db.get_session() as sess:
+            first, missing, counts = await sess.gather(
+                sess.select(table).where(table.id < 3).order_by(table.id),
+                sess.select(table).where(table.id == 1000),
+                sess.select(table).where(table.id < 4).aggregate(func.count()),
+            )
+    finally:
+        db.hooks.remove_listener("after_execute", queries.append)
+
+    assert [row.name for row in first] == ["test0", "test1", "test2"]
+    assert missing == []
+    assert counts[0]["count"] == 4
+    if not os.environ["ASQL_DSN"].startswith("postgresql"):
+        # the statements are sent together
+        assert len(queries) == 1
+
+
+async def test_map(db: DatabaseInterface, table: Table):
+    queries = [lambda sess, i=i: sess.select(table).where(table.id == i).first()
+               for i in range(10)]
+    acquisitions = db.connector.pool_stats()["acquisitions"]
+    rows = await db.map(queries, concurrency=3).flatten()
+    assert [row.id for row in rows] == list(range(10))
+    # each session is re-used for several queries
+    assert db.connector.pool_stats()["acquisitions"] - acquisitions <= 3
+
+    async with db.map([lambda sess: sess.select(table).where(table.id < 3),
+                       lambda sess: sess.select(table).aggregate(func.count())]) as results:
+        results = dict([result async for result in results])
+    assert len(results[0]) == 3 and results[1][0]["count"] > 0
+
+    # an error stops the other sessions
+    def bad(sess):
+        return sess.execute("SELECT nonexistant FROM nosuchtable;")
+
+    with pytest.raises(DatabaseException):
+        await db.map([bad] + queries, concurrency=2).flatten()
+    assert db.connector.pool_stats()["in_use"] == 0
+
+    # so does cancelling the task iterating over the results
+    task = asyncio.ensure_future(db.map(queries * 10, concurrency=2).flatten())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert db.connector.pool_stats()["in_use"] == 0
+
+
+async def test_explain(db: DatabaseInterface, table: Table):
+    async with db.get_session() as sess:
+        plan = await sess.select(table).where(table.name == "test1").explain()
+        assert plan.seq_scan
+        assert table.__tablename__ in plan.scanned_tables
+
+        plan = await sess.delete(table).where(table.name == "test1").explain()
+        assert plan.seq_scan
+
+        # other planners may still pick a seq scan for such a small table
+        if os.environ["ASQL_DSN"].startswith("sqlite3"):
+            plan = await sess.select(table).where(table.id == 1).explain()
+            assert not plan.seq_scan
+
+
 async def test_update(db: DatabaseInterface, table: Table):
     name = "test2"
     async with db.get_session() as sess:
@@ -96,6 +328,54 @@ async def test_upsert_multiple_constriants(db: DatabaseInterface, table: Table):
     assert res is None
 
 
+async def test_upsert_batch(db: DatabaseInterface, table: Table):
+    async with db.get_session() as sess:
+        rows = [table(id=i, name="batch", email="batch{}@example.com".format(i))
+                for i in range(60, 65)]
+        await sess.insert.rows(*rows).on_conflict(table.id).update(table.name)
+
+    async with db.get_session() as sess:
+        # the second row with id 64 conflicts with the first, so needs another statement
+        # MySQL applies the rows of a statement in order, so doesn't
+        rows = [table(id=i, name="upserted", email="batch{}@example.com".format(i))
+                for i in (63, 64, 65, 64)]
+        query = sess.insert.rows(*rows).on_conflict(table.id).update(table.name)
+        if db.dialect.has_batch_upsert:
+            expected = [4] if os.environ["ASQL_DSN"].startswith("mysql") else [3, 1]
+            assert [len(batch) for batch, sql, params in query.generate_batches()] == expected
+        await query.run()
+
+    async with db.get_session() as sess:
+        res = await sess.select(table).where(table.id >= 60).where(table.id <= 65).all()
+        names = {row.id: row.name async for row in res}
+        await sess.delete(table).where(table.id >= 60).where(table.id <= 65)
+
+    assert names == {60: "batch", 61: "batch", 62: "batch",
+                     63: "upserted", 64: "upserted", 65: "upserted"}
+
+
+async def test_upsert_no_conflict_columns(db: DatabaseInterface, table: Table):
+    async with db.get_session() as sess:
+        await sess.insert.rows(table(id=60, name="batch", email="batch60@example.com"))
+
+    async with db.get_session() as sess:
+        rows = [table(id=i, name="upserted", email="batch{}@example.com".format(i))
+                for i in (60, 61)]
+        query = sess.insert.rows(*rows).on_conflict()
+        if db.dialect.has_batch_upsert:
+            # any conflict is ignored, so no conflict target is named
+            for batch, sql, params in query.generate_batches():
+                assert "()" not in sql
+        await query.run()
+
+    async with db.get_session() as sess:
+        res = await sess.select(table).where(table.id >= 60).where(table.id <= 61).all()
+        names = {row.id: row.name async for row in res}
+        await sess.delete(table).where(table.id >= 60).where(table.id <= 61)
+
+    assert names == {60: "batch", 61: "upserted"}
+
+
 async def test_merge(db: DatabaseInterface, table: Table):
     id_ = 100
     async with db.get_session() as sess:
@@ -0,0 +1,193 @@
+"""
+Tests the sharded database interface.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from asyncqlio.exc import UnsupportedOperationException
+from asyncqlio.orm import functions as func
+from asyncqlio.orm.schema.column import Column
+from asyncqlio.orm.schema.table import table_base
+from asyncqlio.orm.schema.types import Integer, String
+from asyncqlio.sharding import ShardedDatabaseInterface
+
+# shards are separate databases, which are only free to create on sqlite3
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(not os.environ["ASQL_DSN"].startswith("sqlite3"),
+                       reason="Sharding tests need several databases")
+]
+
+Table = table_base()
+
+
+class Member(Table, shard_key="guild_id"):
+    guild_id = Column(Integer(), primary_key=True)
+    user_id = Column(Integer(), primary_key=True)
+    name = Column(String(64))
+
+
+shard_dir = tempfile.mkdtemp()
+sharded_db = ShardedDatabaseInterface(*("sqlite3:///{}".format(os.path.join(shard_dir, name))
+                                        for name in ("shard_0.db", "shard_1.db")))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def remove_shards():
+    yield
+    shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+async def test_create_shards():
+    await sharded_db.connect()
+    sharded_db.bind_tables(Table)
+    for shard in sharded_db.shards:
+        async with shard.get_ddl_session() as sess:
+            await sess.create_table(Member.__tablename__, *Member.iter_columns())
+
+
+async def test_insert_routed():
+    async with sharded_db.get_session() as sess:
+        rows = [Member(guild_id=guild_id, user_id=user_id, name="m{}".format(user_id))
+                for guild_id in range(4) for user_id in range(3)]
+        await sess.insert.rows(*rows)
+
+    for index, shard in enumerate(sharded_db.shards):
+        async with shard.get_session() as sess:
+            rows = await sess.select(Member).all()
+            async for row in rows:
+                assert sharded_db.get_shard_index(row.guild_id) == index
+
+
+async def test_select_routed():
+    async with sharded_db.get_session() as sess:
+        rows = await (await sess.select(Member).where(Member.guild_id == 3).all()).flatten()
+        assert list(sess.shard_sessions) == [1]
+
+    assert len(rows) == 3
+    assert all(row.guild_id == 3 for row in rows)
+
+
+async def test_select_scatter_ordered():
+    async with sharded_db.get_session() as sess:
+        query = sess.select(Member).order_by(Member.guild_id, sort_order="desc").offset(2).limit(5)
+        rows = await (await query.all()).flatten()
+
+    assert [row.guild_id for row in rows] == [3, 2, 2, 2, 1]
+
+
+async def test_gather_routed():
+    async with sharded_db.get_session() as sess:
+        routed, scattered = await sess.gather(
+            sess.select(Member).where(Member.guild_id == 3),
+            sess.select(Member).where(Member.user_id == 0).order_by(Member.guild_id),
+        )
+
+    assert sorted(row.user_id for row in routed) == [0, 1, 2]
+    assert [row.guild_id for row in scattered] == [0, 1, 2, 3]
+
+
+async def test_subquery_scattered():
+    async with sharded_db.get_session() as sess:
+        guilds = sess.select(Member).where(Member.user_id == 0).subquery(Member.guild_id)
+        # the subquery is run on each shard, so the key can't be routed by its value
+        assert sess._route_conditions(Member, [Member.guild_id == guilds]) == [0, 1]
+
+
+async def test_shard_session_started_once():
+    async with sharded_db.get_session() as sess:
+        first, second = await asyncio.gather(sess.get_shard_session(1),
+                                             sess.get_shard_session(3))
+        assert first is second
+        assert list(sess.shard_sessions) == [1]
+
+
+async def test_shard_key_change_rejected():
+    async with sharded_db.get_session() as sess:
+        row = await sess.select(Member).where(Member.guild_id == 2, Member.user_id == 0).first()
+        row.guild_id = 3
+        with pytest.raises(UnsupportedOperationException):
+            await sess.merge(row)
+
+
+async def test_aggregate_scattered():
+    async with sharded_db.get_session() as sess:
+        assert await sess.select(Member).count() == 12
+
+        query = sess.select(Member).aggregate(func.sum(Member.user_id), func.max(Member.user_id),
+                                              group_by=Member.guild_id)
+        rows = await query.order_by(Member.guild_id.desc())
+        assert [(row["guild_id"], row["sum_user_id"], row["max_user_id"]) for row in rows] == \
+            [(3, 3, 2), (2, 3, 2), (1, 3, 2), (0, 3, 2)]
+
+        with pytest.raises(UnsupportedOperationException):
+            await sess.select(Member).limit(2).count()
+
+        with pytest.raises(UnsupportedOperationException):
+            await sess.select(Member).aggregate(func.count(Member.user_id, distinct=True)).all()
+
+    async with sharded_db.get_session() as sess:
+        assert await sess.select(Member).where(Member.guild_id == 3).limit(2).count() == 2
+        assert list(sess.shard_sessions) == [1]
+
+
+async def test_exists_scattered():
+    async with sharded_db.get_session() as sess:
+        assert await sess.select(Member).where(Member.user_id == 2).exists()
+        assert not await sess.select(Member).where(Member.user_id == 5).exists()
+        assert await sess.select(Member).order_by(Member.guild_id).offset(11).exists()
+        assert not await sess.select(Member).order_by(Member.guild_id).offset(12).exists()
+
+
+async def test_columns_scattered():
+    async with sharded_db.get_session() as sess:
+        columns = await sess.select(Member).where(Member.user_id == 1).to_columns(Member.guild_id)
+        assert sorted(columns["guild_id"]) == [0, 1, 2, 3]
+
+        columns = await sess.select(Member).limit(5).to_columns(Member.user_id, chunk_size=2)
+        assert len(columns["user_id"]) == 5
+
+        with pytest.raises(UnsupportedOperationException):
+            await sess.select(Member).order_by(Member.guild_id).to_columns(Member.guild_id)
+
+    async with sharded_db.get_session() as sess:
+        columns = await sess.select(Member).where(Member.guild_id == 3).to_columns(Member.name)
+        assert sorted(columns["name"]) == ["m0", "m1", "m2"]
+        assert list(sess.shard_sessions) == [1]
+
+
+async def test_bulk_delete_routed():
+    async with sharded_db.get_session() as sess:
+        await sess.delete(Member).where(Member.guild_id == 0)
+        assert list(sess.shard_sessions) == [0]
+
+    async with sharded_db.get_session() as sess:
+        assert await sess.select(Member).where(Member.guild_id == 0).first() is None
+
+
+async def test_upsert_routed():
+    async with sharded_db.get_session() as sess:
+        rows = [Member(guild_id=guild_id, user_id=user_id, name="upserted")
+                for guild_id, user_id in ((1, 0), (2, 5), (3, 5))]
+        query = sess.insert.rows(*rows).on_conflict(Member.guild_id, Member.user_id)
+        await query.update(Member.name)
+
+    for index, shard in enumerate(sharded_db.shards):
+        async with shard.get_session() as sess:
+            query = sess.select(Member).where(Member.name == "upserted")
+            rows = await (await query.all()).flatten()
+
+        expected = {(guild_id, user_id) for guild_id, user_id in ((1, 0), (2, 5), (3, 5))
+                    if sharded_db.get_shard_index(guild_id) == index}
+        assert {(row.guild_id, row.user_id) for row in rows} == expected
+
+
+async def test_drop_shards():
+    for shard in sharded_db.shards:
+        async with shard.get_ddl_session() as sess:
+            await sess.drop_table(Member.__tablename__)
+    await sharded_db.close()